@@ -0,0 +1,135 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+from .availability import time_grid
+from ..schemas.timetable import GeneratedTimetable, TimetableAnalytics, TimetableConstraints
+
+
+class TimetableAnalyzer:
+    """
+    Utilization, gap, daily spread and room change statistics of a timetable.
+
+    Classes, teachers and rooms are stacked along the first axis of one
+    [entity, day, slot] occupancy tensor, built with a single bincount over
+    the entries; every statistic is then a reduction over that tensor, and a
+    parallel tensor of the room each class and teacher is in gives the room
+    changes. Utilization is relative to the timetable's real days and slots.
+    """
+
+    def __init__(
+        self,
+        constraints: Optional[TimetableConstraints] = None,
+        class_ids: Iterable[str] = (),
+        teacher_ids: Iterable[str] = (),
+        room_ids: Iterable[str] = ()
+    ):
+        """
+        Args:
+            constraints: Constraints the timetable was generated with, which
+                define its days and slots. Defaults to the default constraints;
+                days and slots used by entries are always included.
+            class_ids, teacher_ids, room_ids: Entities to report on even if
+                the timetable never uses them, such as idle rooms
+        """
+        self.constraints = constraints
+        self.class_ids = list(class_ids)
+        self.teacher_ids = list(teacher_ids)
+        self.room_ids = list(room_ids)
+
+    def _index(self, known: List[str], view: Iterable[str]) -> Dict[str, int]:
+        """Index of the known entities and those of a timetable view"""
+        ids = dict.fromkeys(known)
+        ids.update(dict.fromkeys(view))
+        return {entity_id: idx for idx, entity_id in enumerate(ids)}
+
+    def analyze(self, timetable: GeneratedTimetable) -> TimetableAnalytics:
+        # The class view holds every entry once
+        entries = [entry for class_tt in timetable.class_timetables.values() for entry in class_tt.entries]
+        num_days, time_slots = time_grid(entries, self.constraints)
+        num_slots = len(time_slots)
+        slot_index = {slot.start_time: idx for idx, slot in enumerate(time_slots)}
+
+        class_index = self._index(self.class_ids, timetable.class_timetables)
+        teacher_index = self._index(self.teacher_ids, timetable.teacher_timetables)
+        room_index = self._index(self.room_ids, timetable.room_allocations)
+
+        # Entities missing from the views are indexed as they are met
+        columns = np.array([
+            (entry.day, slot_index[entry.slot.start_time],
+             class_index.setdefault(entry.class_id, len(class_index)),
+             teacher_index.setdefault(entry.teacher_id, len(teacher_index)),
+             room_index.setdefault(entry.room_id, len(room_index)))
+            for entry in entries
+        ], dtype=np.int64).reshape(-1, 5)
+        day, slot, class_idx, teacher_idx, room_idx = columns.T
+
+        class_ids, teacher_ids, room_ids = list(class_index), list(teacher_index), list(room_index)
+        num_classes, num_teachers, num_rooms = len(class_ids), len(teacher_ids), len(room_ids)
+        num_entities = num_classes + num_teachers + num_rooms
+
+        # One occupancy tensor for classes, then teachers, then rooms; a cell
+        # booked twice still counts as one busy period
+        entity = np.concatenate([class_idx, num_classes + teacher_idx, num_classes + num_teachers + room_idx])
+        cells = (entity * num_days + np.tile(day, 3)) * num_slots + np.tile(slot, 3)
+        shape = (num_entities, num_days, num_slots)
+        busy = np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape) > 0
+
+        daily = busy.sum(axis=2)
+        weekly = daily.sum(axis=1)
+        total_slots = num_days * num_slots
+        utilization = weekly / total_slots if total_slots else np.zeros(num_entities)
+
+        # Free periods between the first and last lesson of each day
+        taught = busy.any(axis=2)
+        first = busy.argmax(axis=2)
+        last = num_slots - 1 - busy[:, :, ::-1].argmax(axis=2)
+        gaps = np.where(taught, last - first + 1 - daily, 0).sum(axis=1)
+        spread = daily.max(axis=1) - daily.min(axis=1) if num_days else np.zeros(num_entities, dtype=np.int64)
+
+        # Room of every class and teacher period, -1 when free
+        room_at = np.full((num_classes + num_teachers, num_days, num_slots), -1, dtype=np.int64)
+        room_at[class_idx, day, slot] = room_idx
+        room_at[num_classes + teacher_idx, day, slot] = room_idx
+        before, after = room_at[:, :, :-1], room_at[:, :, 1:]
+        room_changes = ((before >= 0) & (after >= 0) & (before != after)).sum(axis=(1, 2))
+
+        classes = slice(0, num_classes)
+        teachers = slice(num_classes, num_classes + num_teachers)
+        rooms = slice(num_classes + num_teachers, num_entities)
+
+        def per(ids: List[str], values: np.ndarray) -> Dict:
+            return dict(zip(ids, values.tolist()))
+
+        teacher_utilization = per(teacher_ids, utilization[teachers])
+        room_utilization = per(room_ids, utilization[rooms])
+        # Mean utilization of every teacher and room
+        efficiency_score = float(utilization[num_classes:].mean()) if num_teachers and num_rooms else 0.0
+
+        # Built from plain ints and floats, so validation is skipped
+        return TimetableAnalytics.model_construct(
+            teacher_utilization=teacher_utilization,
+            room_utilization=room_utilization,
+            free_periods_distribution=per(class_ids, total_slots - weekly[classes]),
+            efficiency_score=efficiency_score,
+            days=num_days,
+            slots_per_day=num_slots,
+            class_utilization=per(class_ids, utilization[classes]),
+            free_periods_by_slot={
+                slot.start_time.strftime("%H:%M"): int(free)
+                for slot, free in zip(time_slots, (~busy[classes]).sum(axis=(0, 1)).tolist())
+            },
+            class_gaps=per(class_ids, gaps[classes]),
+            teacher_gaps=per(teacher_ids, gaps[teachers]),
+            class_daily_hours=per(class_ids, daily[classes]),
+            teacher_daily_hours=per(teacher_ids, daily[teachers]),
+            room_daily_hours=per(room_ids, daily[rooms]),
+            class_daily_spread=per(class_ids, spread[classes]),
+            teacher_daily_spread=per(teacher_ids, spread[teachers]),
+            class_room_changes=per(class_ids, room_changes[:num_classes]),
+            teacher_room_changes=per(teacher_ids, room_changes[num_classes:]),
+            stats={
+                "entries": float(len(entries)),
+                "total_gaps": float(gaps[:num_classes + num_teachers].sum()),
+                "total_room_changes": float(room_changes.sum()),
+            }
+        )
@@ -0,0 +1,73 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+from ..schemas.timetable import TimeSlot, TimeWindow, TimetableConstraints, TimetableEntry
+
+
+def create_time_slots(constraints: TimetableConstraints) -> List[TimeSlot]:
+    """Generate time slots based on constraints"""
+    # This is a placeholder - in a real implementation, we would generate
+    # actual time slots based on the school's schedule
+    slots = []
+    for hour in range(8, 8 + constraints.max_hours_per_day):
+        start = TimeSlot(start_time=f"{hour:02d}:00", end_time=f"{hour:02d}:50")
+        slots.append(start)
+    return slots
+
+
+def time_grid(
+    entries: List[TimetableEntry], constraints: Optional[TimetableConstraints] = None
+) -> Tuple[int, List[TimeSlot]]:
+    """
+    Number of days and the time slots of a timetable: those of the
+    constraints it was generated with (the defaults if unknown), plus any
+    day or slot its entries use.
+    """
+    constraints = constraints or TimetableConstraints()
+    slots = {entry.slot.start_time: entry.slot for entry in entries}
+    slots.update({slot.start_time: slot for slot in create_time_slots(constraints)})
+    num_days = max(constraints.days_per_week, max((entry.day + 1 for entry in entries), default=0))
+    return num_days, [slots[start] for start in sorted(slots)]
+
+
+def _window_cells(
+    windows: List[TimeWindow],
+    time_slots: List[TimeSlot],
+    num_days: int,
+    contained: bool
+) -> np.ndarray:
+    """(days, slots) mask of the time slots that touch, or lie within, a window"""
+    starts = [slot.start_time for slot in time_slots]
+    ends = [slot.end_time for slot in time_slots]
+    cells = np.zeros((num_days, len(time_slots)), dtype=bool)
+    for window in windows:
+        if window.day is not None and not 0 <= window.day < num_days:
+            continue
+        if contained:
+            hit = [window.start_time <= start and end <= window.end_time for start, end in zip(starts, ends)]
+        else:
+            hit = [start < window.end_time and window.start_time < end for start, end in zip(starts, ends)]
+        days = slice(None) if window.day is None else window.day
+        cells[days] |= np.array(hit, dtype=bool)
+    return cells
+
+
+def unavailable_cells(windows: List[TimeWindow], time_slots: List[TimeSlot], num_days: int) -> np.ndarray:
+    """
+    (days, slots) mask of the time slots lost to unavailability windows.
+
+    A slot is lost when it overlaps any window, even by a minute.
+    """
+    return _window_cells(windows, time_slots, num_days, contained=False)
+
+
+def outside_cells(windows: List[TimeWindow], time_slots: List[TimeSlot], num_days: int) -> np.ndarray:
+    """
+    (days, slots) mask of the time slots outside availability windows.
+
+    A slot is available only when it lies entirely within a window; no
+    windows at all means always available.
+    """
+    if not windows:
+        return np.zeros((num_days, len(time_slots)), dtype=bool)
+    return ~_window_cells(windows, time_slots, num_days, contained=True)
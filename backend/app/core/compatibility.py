@@ -0,0 +1,122 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+from ..schemas.timetable import Teacher, Room, Subject, Class
+
+
+class CompatibilityMatrix:
+    """
+    Precomputed class x subject x teacher x room compatibility.
+
+    The four-way structure is stored in factored form as boolean masks:
+    - class_subject[c, s]: class c takes subject s
+    - teacher_ok[s, t]: teacher t is preferred for and qualified to teach s
+    - room_ok[c, s, r]: room r has the features subject s needs and can seat class c
+
+    A (class, subject, teacher, room) combination is compatible when all three
+    masks hold, so the optimizer only ever creates variables that can be true.
+    """
+
+    def __init__(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class]
+    ):
+        self.class_ids = [class_.id for class_ in classes]
+        self.subject_ids = [subject.id for subject in subjects]
+        self.teacher_ids = [teacher.id for teacher in teachers]
+        self.room_ids = [room.id for room in rooms]
+
+        subject_index = {subject_id: idx for idx, subject_id in enumerate(self.subject_ids)}
+        teacher_index = {teacher_id: idx for idx, teacher_id in enumerate(self.teacher_ids)}
+
+        num_classes, num_subjects = len(classes), len(subjects)
+        num_teachers, num_rooms = len(teachers), len(rooms)
+
+        # Which subjects each class takes
+        self.class_subject = np.zeros((num_classes, num_subjects), dtype=bool)
+        for class_idx, class_ in enumerate(classes):
+            for subject_id in class_.subjects:
+                if subject_id in subject_index:
+                    self.class_subject[class_idx, subject_index[subject_id]] = True
+
+        # Preferred teachers for each subject
+        preferred = np.zeros((num_subjects, num_teachers), dtype=bool)
+        for subject_idx, subject in enumerate(subjects):
+            for teacher_id in subject.preferred_teachers:
+                if teacher_id in teacher_index:
+                    preferred[subject_idx, teacher_index[teacher_id]] = True
+
+        # Teacher qualifications may list subjects by ID or by name
+        qualified = np.zeros((num_subjects, num_teachers), dtype=bool)
+        for teacher_idx, teacher in enumerate(teachers):
+            taught = set(teacher.subjects)
+            for subject_idx, subject in enumerate(subjects):
+                qualified[subject_idx, teacher_idx] = subject.id in taught or subject.name in taught
+
+        self.preferred = preferred
+        self.qualified = qualified
+        self.teacher_ok = preferred & qualified
+
+        # Room features as a boolean matrix over a shared feature vocabulary
+        vocabulary = sorted(
+            {f for room in rooms for f in room.features}
+            | {f for subject in subjects for f in subject.requires_features}
+        )
+        feature_index = {feature: idx for idx, feature in enumerate(vocabulary)}
+        room_features = np.zeros((num_rooms, len(vocabulary)), dtype=bool)
+        for room_idx, room in enumerate(rooms):
+            room_features[room_idx, [feature_index[f] for f in room.features]] = True
+        required_features = np.zeros((num_subjects, len(vocabulary)), dtype=bool)
+        for subject_idx, subject in enumerate(subjects):
+            required_features[subject_idx, [feature_index[f] for f in subject.requires_features]] = True
+
+        # feature_ok[s, r]: no feature required by s is missing from r
+        self.feature_ok = ~(required_features[:, None, :] & ~room_features[None, :, :]).any(axis=2)
+
+        # capacity_ok[c, r]: room r seats every student of class c
+        capacities = np.array([room.capacity for room in rooms], dtype=np.int64)
+        students = np.array([class_.students_count for class_ in classes], dtype=np.int64)
+        self.capacity_ok = capacities[None, :] >= students[:, None]
+
+        self.room_ok = (
+            self.class_subject[:, :, None]
+            & self.feature_ok[None, :, :]
+            & self.capacity_ok[:, None, :]
+        )
+
+    def candidates(self, class_idx: int, subject_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the compatible teacher and room indices for a class and subject"""
+        return (
+            np.flatnonzero(self.teacher_ok[subject_idx]),
+            np.flatnonzero(self.room_ok[class_idx, subject_idx])
+        )
+
+    def lessons(self) -> np.ndarray:
+        """All (class, subject) index pairs the classes take, as an (n, 2) array"""
+        return np.argwhere(self.class_subject)
+
+    def stats(self) -> Dict[str, float]:
+        """Counts and pruning ratios of compatible combinations per time slot"""
+        # Combinations the unpruned model would create: preferred teachers x feature-compatible rooms
+        feature_rooms = (self.class_subject[:, :, None] & self.feature_ok[None, :, :]).sum(axis=2)
+        baseline = int((feature_rooms * self.preferred.sum(axis=1)[None, :]).sum())
+
+        kept_rooms = self.room_ok.sum(axis=2)
+        kept = int((kept_rooms * self.teacher_ok.sum(axis=1)[None, :]).sum())
+
+        preferred_pairs = int(self.preferred.sum())
+        room_pairs = int(feature_rooms.sum())
+
+        def ratio(removed: int, total: int) -> float:
+            return removed / total if total else 0.0
+
+        return {
+            "compat_candidates_per_slot": float(kept),
+            "compat_unpruned_candidates_per_slot": float(baseline),
+            "compat_pruning_ratio": ratio(baseline - kept, baseline),
+            "compat_teacher_pruning_ratio": ratio(preferred_pairs - int(self.teacher_ok.sum()), preferred_pairs),
+            "compat_room_pruning_ratio": ratio(room_pairs - int(kept_rooms.sum()), room_pairs),
+        }
@@ -0,0 +1,269 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from .compatibility import CompatibilityMatrix
+from .lns import LNSOptimizer
+from .model_cache import model_cache
+from .optimizer import TimetableOptimizer
+from ..schemas.timetable import (
+    Teacher, Room, Subject, Class, TimetableConstraints, GeneratedTimetable,
+    SolveMode, SolverParameters
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class Component:
+    """
+    Classes that share teachers or rooms, with every subject they take and
+    every teacher and room they can use. The teachers include those their
+    subjects prefer without being qualified, so the part keeps every
+    teacher its subjects refer to.
+    """
+
+    def __init__(
+        self,
+        class_idxs: np.ndarray,
+        subject_idxs: np.ndarray,
+        teacher_idxs: np.ndarray,
+        room_idxs: np.ndarray
+    ):
+        self.class_idxs = class_idxs
+        self.subject_idxs = subject_idxs
+        self.teacher_idxs = teacher_idxs
+        self.room_idxs = room_idxs
+
+
+def find_components(compatibility: CompatibilityMatrix) -> List[Component]:
+    """
+    Split the classes into connected components of the sharing graph.
+
+    Two classes are connected when some teacher could teach both or some
+    room could seat both. Lessons of different components never compete
+    for a teacher or a room, so each component can be solved on its own.
+    Components are ordered by their first class.
+    """
+    num_classes = len(compatibility.class_ids)
+    # class_teacher[c, t]: teacher t can teach a subject class c takes
+    class_teacher = (compatibility.class_subject.astype(np.int64) @ compatibility.teacher_ok.astype(np.int64)) > 0
+    # class_room[c, r]: room r can seat class c for a subject
+    class_room = compatibility.room_ok.any(axis=1)
+
+    label = np.full(num_classes, -1, dtype=np.int64)
+    components = []
+    for seed in range(num_classes):
+        if label[seed] >= 0:
+            continue
+        members = np.zeros(num_classes, dtype=bool)
+        frontier = members.copy()
+        frontier[seed] = True
+        while frontier.any():
+            members |= frontier
+            # Grow through the teachers and rooms the frontier can use
+            teachers = class_teacher[frontier].any(axis=0)
+            rooms = class_room[frontier].any(axis=0)
+            frontier = (class_teacher[:, teachers].any(axis=1) | class_room[:, rooms].any(axis=1)) & ~members
+        label[members] = len(components)
+        subjects = compatibility.class_subject[members].any(axis=0)
+        # Unqualified preferred teachers teach nothing and join no classes
+        teachers = class_teacher[members].any(axis=0) | compatibility.preferred[subjects].any(axis=0)
+        components.append(Component(
+            class_idxs=np.flatnonzero(members),
+            subject_idxs=np.flatnonzero(subjects),
+            teacher_idxs=np.flatnonzero(teachers),
+            room_idxs=np.flatnonzero(class_room[members].any(axis=0))
+        ))
+    return components
+
+
+def solve_component(
+    teachers: List[Teacher],
+    rooms: List[Room],
+    subjects: List[Subject],
+    classes: List[Class],
+    constraints: TimetableConstraints,
+    time_limit_seconds: float,
+    mode: SolveMode,
+    solver_parameters: Optional[SolverParameters],
+    base_timetable: Optional[GeneratedTimetable],
+    repair_hint: bool
+) -> GeneratedTimetable:
+    """Solve one component inside a worker process"""
+    optimizer_class = LNSOptimizer if mode == SolveMode.LNS else TimetableOptimizer
+    optimizer = optimizer_class(model_cache=model_cache)
+    return optimizer.solve(
+        teachers=teachers,
+        rooms=rooms,
+        subjects=subjects,
+        classes=classes,
+        constraints=constraints,
+        time_limit_seconds=time_limit_seconds,
+        mode=mode,
+        solver_parameters=solver_parameters,
+        base_timetable=base_timetable,
+        repair_hint=repair_hint
+    )
+
+
+class ComponentSolver:
+    """
+    Solves the independent parts of a request in parallel worker processes.
+
+    The request is split into connected components of the class-teacher-room
+    sharing graph (see find_components). A request with one component is
+    solved in-process; otherwise every component is solved in a pool of at
+    most max_workers processes and the timetables are merged. The pool is
+    started on first use and shared by all requests.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Number of components solved at once. Defaults to the
+                TIMETABLE_COMPONENT_WORKERS environment variable, or the CPU count.
+        """
+        self.max_workers = max_workers or int(os.getenv("TIMETABLE_COMPONENT_WORKERS", os.cpu_count() or 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> ProcessPoolExecutor:
+        """Start the worker pool"""
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers do not inherit the server's threads and locks
+                context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                logger.info(f"Started component solver pool with {self.max_workers} workers")
+            return self._executor
+
+    def solve(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC,
+        solver_parameters: Optional[SolverParameters] = None,
+        base_timetable: Optional[GeneratedTimetable] = None,
+        repair_hint: bool = False
+    ) -> GeneratedTimetable:
+        """
+        Solve every component of a request and merge the timetables
+
+        Components queue for the pool's workers, so each gets the time limit
+        divided by the number of rounds the pool needs to run them all.
+
+        Args:
+            teachers: List of teachers
+            rooms: List of rooms
+            subjects: List of subjects
+            classes: List of classes
+            constraints: Timetable constraints
+            time_limit_seconds: Time limit for the whole request
+            mode: Solve mode used for every component
+            solver_parameters: CP-SAT search parameters (workers, seed, ...)
+            base_timetable: Timetable to warm-start from, if any
+            repair_hint: Let the solver repair hints that became infeasible
+
+        Returns:
+            GeneratedTimetable object with the merged solution
+        """
+        start_time = time.time()
+        compatibility = CompatibilityMatrix(teachers, rooms, subjects, classes)
+        components = find_components(compatibility)
+
+        parts = []
+        for component in components:
+            parts.append({
+                "teachers": [teachers[idx] for idx in component.teacher_idxs.tolist()],
+                "rooms": [rooms[idx] for idx in component.room_idxs.tolist()],
+                "subjects": [subjects[idx] for idx in component.subject_idxs.tolist()],
+                "classes": [classes[idx] for idx in component.class_idxs.tolist()],
+            })
+        if len(parts) <= 1:
+            parts = [{"teachers": teachers, "rooms": rooms, "subjects": subjects, "classes": classes}]
+
+        options = {
+            "constraints": constraints,
+            "mode": mode,
+            "solver_parameters": solver_parameters,
+            "base_timetable": base_timetable,
+            "repair_hint": repair_hint,
+        }
+        if len(parts) == 1:
+            results = [solve_component(time_limit_seconds=time_limit_seconds, **parts[0], **options)]
+            workers = 1
+        else:
+            workers = min(self.max_workers, len(parts))
+            rounds = math.ceil(len(parts) / workers)
+            executor = self._start()
+            futures = [
+                executor.submit(
+                    solve_component, time_limit_seconds=time_limit_seconds / rounds, **part, **options
+                )
+                for part in parts
+            ]
+            results = [future.result() for future in futures]
+
+        return self._merge(parts, results, time.time() - start_time, workers, mode)
+
+    def _merge(
+        self,
+        parts: List[Dict[str, Any]],
+        results: List[GeneratedTimetable],
+        solve_time: float,
+        workers: int,
+        mode: SolveMode
+    ) -> GeneratedTimetable:
+        """Merge the timetables of the components into one"""
+        merged = GeneratedTimetable(class_timetables={}, teacher_timetables={}, room_allocations={})
+        for idx, (part, result) in enumerate(zip(parts, results), start=1):
+            merged.class_timetables.update(result.class_timetables)
+            merged.teacher_timetables.update(result.teacher_timetables)
+            merged.room_allocations.update(result.room_allocations)
+            if len(parts) > 1:
+                label = ", ".join(class_.id for class_ in part["classes"])
+                merged.conflicts.extend(f"Component {idx} (classes {label}): {conflict}" for conflict in result.conflicts)
+            else:
+                merged.conflicts.extend(result.conflicts)
+
+        if merged.conflicts and SolveMode(mode) != SolveMode.PREVIEW:
+            # A component without a solution leaves the request without one;
+            # a preview keeps the hours it placed
+            merged.class_timetables, merged.teacher_timetables, merged.room_allocations = {}, {}, {}
+
+        def total(stat: str) -> float:
+            return float(sum(result.stats.get(stat) or 0 for result in results))
+
+        merged.stats = {
+            "solve_time": solve_time,
+            "conflicts": len(merged.conflicts),
+            "objective_value": total("objective_value"),
+            "num_variables": total("num_variables"),
+            "components": float(len(parts)),
+            "component_workers": float(workers),
+            "largest_component_classes": float(max(len(part["classes"]) for part in parts)),
+            "component_stats": [result.stats for result in results],
+        }
+        return merged
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide component solver shared by all requests
+component_solver = ComponentSolver()
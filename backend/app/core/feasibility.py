@@ -0,0 +1,223 @@
+import numpy as np
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .compatibility import CompatibilityMatrix
+from ..schemas.timetable import Teacher, Room, Subject, Class, TimetableConstraints
+
+
+def _candidate_sets(rows: np.ndarray) -> np.ndarray:
+    """
+    Distinct non-empty rows of a boolean matrix and every union of two of them.
+
+    These are the resource sets worth checking with Hall's condition: the
+    demand confined to a set may not exceed what the set can supply.
+    """
+    rows = rows[rows.any(axis=1)]
+    if not len(rows):
+        return rows
+    sets = np.unique(rows, axis=0)
+    unions = (sets[:, None, :] | sets[None, :, :]).reshape(-1, sets.shape[1])
+    return np.unique(np.concatenate([sets, unions]), axis=0)
+
+
+def _overloaded_sets(
+    needs: np.ndarray, demand: np.ndarray, sets: np.ndarray, supply: np.ndarray
+) -> List[Tuple[np.ndarray, np.ndarray, int, int]]:
+    """
+    Find resource sets that cannot cover the demand confined to them.
+
+    Args:
+        needs: (items, resources) mask of the resources each item can use
+        demand: Hours each item needs
+        sets: (sets, resources) candidate resource sets
+        supply: Hours each resource can give
+
+    Returns:
+        (resource mask, item mask, demand, supply) of every overloaded set
+        that has no overloaded proper subset
+    """
+    # inside[k, i]: item i can only use resources of set k
+    outside = (~sets).astype(np.int64) @ needs.T.astype(np.int64)
+    inside = (outside == 0) & needs.any(axis=1)[None, :]
+    set_demand = inside.astype(np.int64) @ demand
+    set_supply = sets.astype(np.int64) @ supply
+    overloaded = np.flatnonzero(set_demand > set_supply)
+
+    # Report the smallest overloaded sets only
+    chosen = sets[overloaded]
+    # subset[k, j]: overloaded set j lies within overloaded set k
+    subset = ((~chosen).astype(np.int64) @ chosen.T.astype(np.int64)) == 0
+    proper = subset & (chosen.sum(axis=1)[None, :] < chosen.sum(axis=1)[:, None])
+    minimal = overloaded[~proper.any(axis=1)]
+    return [(sets[k], inside[k], int(set_demand[k]), int(set_supply[k])) for k in minimal.tolist()]
+
+
+class FeasibilityChecker:
+    """
+    Screens a generation request for necessary conditions before a model is built.
+
+    Each check is an aggregate over the compatibility masks, so an impossible
+    request is rejected in milliseconds with a precise diagnosis instead of
+    after the solver's full time limit:
+    - every subject a class takes exists
+    - every class's weekly hours fit into its slots
+    - every lesson has a qualified teacher and a suitable room
+    - no set of teachers is asked for more hours than their daily caps and
+      availability allow
+    - no set of rooms is asked to host more lessons than it has available slots
+
+    Passing the screen does not make a request feasible; failing it makes it
+    certainly infeasible. Suspicious input that does not make the request
+    infeasible, such as preferred teachers that do not exist, is listed in
+    warnings instead.
+    """
+
+    def __init__(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        compatibility: CompatibilityMatrix,
+        slots_per_day: int,
+        teacher_unavailable: Optional[np.ndarray] = None,
+        room_unavailable: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            teacher_unavailable, room_unavailable: Optional [entity, day, slot]
+                masks of cells the teachers and rooms are not available in;
+                supplies only count the other cells
+        """
+        start_time = time.time()
+        self.teachers = teachers
+        self.rooms = rooms
+        self.subjects = subjects
+        self.classes = classes
+        self.compatibility = compatibility
+        self.days = constraints.days_per_week
+        self.slots_per_day = slots_per_day
+        self.teacher_unavailable = teacher_unavailable
+        self.room_unavailable = room_unavailable
+        self.problems: List[str] = []
+        self.warnings: List[str] = []
+
+        self._check_unknown_subjects()
+        self._check_unknown_teachers()
+        self._check_class_hours()
+        self._check_lessons()
+        self._check_teacher_supply()
+        self._check_room_supply()
+        self.check_time = time.time() - start_time
+
+    def _check_unknown_subjects(self):
+        known = set(self.compatibility.subject_ids)
+        for class_ in self.classes:
+            for subject_id in class_.subjects:
+                if subject_id not in known:
+                    self.problems.append(f"{class_.name} ({class_.id}) takes unknown subject {subject_id}")
+
+    def _check_unknown_teachers(self):
+        # The solver ignores unknown IDs; a subject left without any teacher
+        # is a problem reported by _check_lessons
+        known = set(self.compatibility.teacher_ids)
+        taken = self.compatibility.class_subject.any(axis=0)
+        for subject_idx in np.flatnonzero(taken).tolist():
+            subject = self.subjects[subject_idx]
+            unknown = [teacher_id for teacher_id in subject.preferred_teachers if teacher_id not in known]
+            if unknown:
+                self.warnings.append(
+                    f"Subject {subject.name} ({subject.id}) has unknown preferred teachers {', '.join(unknown)}"
+                )
+
+    def _check_class_hours(self):
+        hours = np.array([subject.hours_per_week for subject in self.subjects], dtype=np.int64)
+        class_hours = self.compatibility.class_subject.astype(np.int64) @ hours
+        slots = self.days * self.slots_per_day
+        for class_idx in np.flatnonzero(class_hours > slots).tolist():
+            class_ = self.classes[class_idx]
+            self.problems.append(
+                f"{class_.name} ({class_.id}) needs {class_hours[class_idx]} hours a week "
+                f"but has only {slots} slots ({self.days} days x {self.slots_per_day} slots)"
+            )
+
+    def _check_lessons(self):
+        compat = self.compatibility
+        known_teachers = set(compat.teacher_ids)
+
+        # Subjects without a qualified preferred teacher
+        taught = compat.teacher_ok.any(axis=1)
+        for subject_idx in np.flatnonzero(~taught & compat.class_subject.any(axis=0)).tolist():
+            subject = self.subjects[subject_idx]
+            known = [t for t in subject.preferred_teachers if t in known_teachers]
+            if not subject.preferred_teachers:
+                reason = "it has no preferred teachers"
+            elif not known:
+                reason = "none of its preferred teachers exists"
+            else:
+                reason = f"none of its preferred teachers {', '.join(known)} is qualified to teach it"
+            self.problems.append(f"Subject {subject.name} ({subject.id}) has no teacher: {reason}")
+
+        # Lessons without a room that has the features and seats
+        for class_idx, subject_idx in np.argwhere(compat.class_subject & ~compat.room_ok.any(axis=2)).tolist():
+            class_, subject = self.classes[class_idx], self.subjects[subject_idx]
+            features = f" with {', '.join(subject.requires_features)}" if subject.requires_features else ""
+            self.problems.append(
+                f"Subject {subject.name} ({subject.id}) for {class_.name} ({class_.id}) "
+                f"has no room{features} seating {class_.students_count} students"
+            )
+
+    def _check_teacher_supply(self):
+        compat = self.compatibility
+        # Weekly hours each subject needs across classes and each teacher can give
+        hours = np.array([subject.hours_per_week for subject in self.subjects], dtype=np.int64)
+        demand = hours * compat.class_subject.sum(axis=0)
+        daily_caps = np.array([teacher.max_hours_per_day for teacher in self.teachers], dtype=np.int64)
+        if self.teacher_unavailable is not None:
+            free_slots = (~self.teacher_unavailable).sum(axis=2)
+            supply = np.minimum(daily_caps[:, None], free_slots).sum(axis=1)
+        else:
+            supply = self.days * np.minimum(daily_caps, self.slots_per_day)
+        needs = compat.teacher_ok & (demand > 0)[:, None]
+        for teacher_mask, subject_mask, needed, available in _overloaded_sets(
+            needs, demand, _candidate_sets(needs), supply
+        ):
+            teacher_ids = [compat.teacher_ids[idx] for idx in np.flatnonzero(teacher_mask)]
+            subject_names = [
+                f"{self.subjects[idx].name} ({self.subjects[idx].id})" for idx in np.flatnonzero(subject_mask)
+            ]
+            self.problems.append(
+                f"Teachers {', '.join(teacher_ids)} can give at most {available} hours a week "
+                f"but lessons of {', '.join(subject_names)} need {needed}"
+            )
+
+    def _check_room_supply(self):
+        compat = self.compatibility
+        lessons = compat.lessons()
+        if not len(lessons):
+            return
+        hours = np.array([subject.hours_per_week for subject in self.subjects], dtype=np.int64)
+        demand = hours[lessons[:, 1]]
+        needs = compat.room_ok[lessons[:, 0], lessons[:, 1]]
+        if self.room_unavailable is not None:
+            supply = (~self.room_unavailable).sum(axis=(1, 2))
+        else:
+            supply = np.full(len(compat.room_ids), self.days * self.slots_per_day, dtype=np.int64)
+        for room_mask, lesson_mask, needed, available in _overloaded_sets(
+            needs, demand, _candidate_sets(needs), supply
+        ):
+            room_ids = [compat.room_ids[idx] for idx in np.flatnonzero(room_mask)]
+            subject_ids = sorted({compat.subject_ids[idx] for idx in lessons[lesson_mask, 1].tolist()})
+            self.problems.append(
+                f"Rooms {', '.join(room_ids)} can host at most {available} lessons a week "
+                f"but {needed} hours of {', '.join(subject_ids)} can only use them"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "feasibility_check_time": self.check_time,
+            "feasibility_problems": float(len(self.problems)),
+            "feasibility_warnings": list(self.warnings),
+        }
@@ -0,0 +1,130 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+from .compatibility import CompatibilityMatrix
+from .variable_store import VariableKey
+from ..schemas.timetable import Teacher
+
+
+class GreedyScheduler:
+    """
+    Constructive most-constrained-first heuristic for a draft timetable.
+
+    Lessons are placed one hour at a time on integer and boolean arrays,
+    never through a model. Lessons with the fewest rooms and teachers go
+    first; each hour takes the open (day, slot) that spreads the lesson over
+    the week and keeps the class's days even, then the teacher with the most
+    hours left that day and the least versatile free room. Every placement
+    respects the hard constraints, so hours that find no open slot are left
+    unplaced rather than double-booked.
+    """
+
+    def __init__(
+        self,
+        compatibility: CompatibilityMatrix,
+        teachers: List[Teacher],
+        max_hours_per_day: int,
+        lesson_hours: np.ndarray,
+        class_blocked: np.ndarray,
+        teacher_blocked: np.ndarray,
+        room_blocked: np.ndarray,
+        class_hours: np.ndarray,
+        teacher_hours: np.ndarray
+    ):
+        """
+        Args:
+            compatibility: Compatibility masks of the set-up entities
+            teachers: Teachers in index order
+            max_hours_per_day: Daily lesson cap of every class
+            lesson_hours: [class, subject] weekly hours still to place
+            class_blocked, teacher_blocked, room_blocked: [entity, day, slot]
+                cells where nothing new may be scheduled
+            class_hours, teacher_hours: [entity, day] hours already taken
+        """
+        self.compatibility = compatibility
+        self.lesson_hours = lesson_hours
+
+        # Hours each class and teacher may still take per day
+        self.class_left = max_hours_per_day - class_hours
+        teacher_caps = np.array([teacher.max_hours_per_day for teacher in teachers], dtype=np.int64)
+        self.teacher_left = teacher_caps[:, None] - teacher_hours
+
+        # Open cells: free, and under the daily cap
+        self.class_open = ~class_blocked & (self.class_left > 0)[:, :, None]
+        self.teacher_open = ~teacher_blocked & (self.teacher_left > 0)[:, :, None]
+        self.room_open = ~room_blocked
+
+        # Rooms that suit the fewest lessons are handed out first
+        self.room_versatility = compatibility.room_ok.sum(axis=(0, 1))
+
+        self.assignments: List[VariableKey] = []
+        self.unplaced: Dict[Tuple[int, int], int] = {}
+
+    def _lessons(self) -> List[Tuple[int, int, np.ndarray, np.ndarray]]:
+        """Lessons with hours to place, most constrained first"""
+        lessons = []
+        for class_idx, subject_idx in self.compatibility.lessons().tolist():
+            if self.lesson_hours[class_idx, subject_idx] <= 0:
+                continue
+            teacher_idxs, room_idxs = self.compatibility.candidates(class_idx, subject_idx)
+            room_idxs = room_idxs[np.argsort(self.room_versatility[room_idxs], kind="stable")]
+            lessons.append((class_idx, subject_idx, teacher_idxs, room_idxs))
+        lessons.sort(key=lambda lesson: (
+            len(lesson[3]), len(lesson[2]), -int(self.lesson_hours[lesson[0], lesson[1]]), lesson[0], lesson[1]
+        ))
+        return lessons
+
+    def schedule(self) -> List[VariableKey]:
+        """
+        Place every lesson hour that fits.
+
+        Returns the (day, slot, class, subject, teacher, room) assignments;
+        hours left over are recorded in unplaced by (class, subject).
+        """
+        num_days, num_slots = self.class_open.shape[1:]
+        slot_order = np.arange(num_slots)[None, :]
+
+        for class_idx, subject_idx, teacher_idxs, room_idxs in self._lessons():
+            hours = int(self.lesson_hours[class_idx, subject_idx])
+            day_hours = np.zeros(num_days, dtype=np.int64)
+            class_left = self.class_left[class_idx]
+            for placed in range(hours):
+                teacher_open = self.teacher_open[teacher_idxs]
+                room_open = self.room_open[room_idxs]
+                open_cells = self.class_open[class_idx] & teacher_open.any(axis=0) & room_open.any(axis=0)
+                if not open_cells.any():
+                    self.unplaced[(class_idx, subject_idx)] = hours - placed
+                    break
+
+                # Fewest hours of this lesson that day, then the class's
+                # emptiest day, then the earliest slot
+                score = (day_hours[:, None] * (num_slots + 1) - class_left[:, None]) * num_slots + slot_order
+                score = np.where(open_cells, score, np.iinfo(np.int64).max)
+                day, slot_idx = np.unravel_index(score.argmin(), score.shape)
+
+                free_teachers = teacher_idxs[teacher_open[:, day, slot_idx]]
+                teacher_idx = int(free_teachers[self.teacher_left[free_teachers, day].argmax()])
+                room_idx = int(room_idxs[np.flatnonzero(room_open[:, day, slot_idx])[0]])
+                self._place(int(day), int(slot_idx), class_idx, subject_idx, teacher_idx, room_idx)
+                day_hours[day] += 1
+        return self.assignments
+
+    def _place(self, day: int, slot_idx: int, class_idx: int, subject_idx: int, teacher_idx: int, room_idx: int):
+        """Record an assignment and close the cells it takes"""
+        self.assignments.append((day, slot_idx, class_idx, subject_idx, teacher_idx, room_idx))
+        self.class_open[class_idx, day, slot_idx] = False
+        self.teacher_open[teacher_idx, day, slot_idx] = False
+        self.room_open[room_idx, day, slot_idx] = False
+
+        self.class_left[class_idx, day] -= 1
+        if self.class_left[class_idx, day] <= 0:
+            self.class_open[class_idx, day] = False
+        self.teacher_left[teacher_idx, day] -= 1
+        if self.teacher_left[teacher_idx, day] <= 0:
+            self.teacher_open[teacher_idx, day] = False
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "greedy_placed_hours": float(len(self.assignments)),
+            "greedy_unplaced_hours": float(sum(self.unplaced.values())),
+        }
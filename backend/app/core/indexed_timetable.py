@@ -0,0 +1,232 @@
+import numpy as np
+from datetime import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .availability import time_grid
+from ..schemas.timetable import (
+    GeneratedTimetable, TeacherTimetable, TimeSlot, TimetableConstraints, TimetableEntry
+)
+
+# Occupancy value of a cell no entry takes
+FREE = -1
+
+
+class IndexedTimetable:
+    """
+    A generated timetable indexed for constant-time edits.
+
+    Every lesson is stored once: the class, teacher and room views of the
+    timetable are relinked to hold the same entry objects, so an entry moved
+    in one view is moved in all of them. Dense [entity, day, slot] arrays for
+    classes, teachers and rooms hold the index of the entry taking each cell,
+    or FREE, and are updated together on every move and swap, so finding a
+    lesson and checking a target cell for clashes are array lookups.
+
+    The timetable is edited in place.
+    """
+
+    def __init__(self, timetable: GeneratedTimetable, constraints: Optional[TimetableConstraints] = None):
+        """
+        Args:
+            timetable: The timetable to index and edit
+            constraints: Constraints it was generated with, which define the
+                days and time slots lessons can move to. Defaults to the
+                default constraints; days and slots used by entries are
+                always included.
+
+        Raises:
+            ValueError: If the timetable double-books a class, teacher or room
+        """
+        self.timetable = timetable
+        # The class view is authoritative; the other views are rebuilt from it
+        self.entries: List[TimetableEntry] = [
+            entry for class_tt in timetable.class_timetables.values() for entry in class_tt.entries
+        ]
+
+        self.num_days, self.time_slots = time_grid(self.entries, constraints)
+        self.slot_index = {slot.start_time: idx for idx, slot in enumerate(self.time_slots)}
+
+        self.class_ids = self._ids(timetable.class_timetables, "class_id")
+        self.teacher_ids = self._ids(timetable.teacher_timetables, "teacher_id")
+        self.room_ids = self._ids(timetable.room_allocations, "room_id")
+        self.class_index = {class_id: idx for idx, class_id in enumerate(self.class_ids)}
+        self.teacher_index = {teacher_id: idx for idx, teacher_id in enumerate(self.teacher_ids)}
+        self.room_index = {room_id: idx for idx, room_id in enumerate(self.room_ids)}
+
+        shape = (self.num_days, len(self.time_slots))
+        self.class_cells = np.full((len(self.class_ids),) + shape, FREE, dtype=np.int64)
+        self.teacher_cells = np.full((len(self.teacher_ids),) + shape, FREE, dtype=np.int64)
+        self.room_cells = np.full((len(self.room_ids),) + shape, FREE, dtype=np.int64)
+
+        # Per-entry positions, kept in step with the entries
+        self.entry_slot = np.zeros(len(self.entries), dtype=np.int64)
+        self.entry_class = np.array([self.class_index[entry.class_id] for entry in self.entries], dtype=np.int64)
+        self.entry_teacher = np.array([self.teacher_index[entry.teacher_id] for entry in self.entries], dtype=np.int64)
+        self.entry_room = np.array([self.room_index[entry.room_id] for entry in self.entries], dtype=np.int64)
+
+        for entry_idx, entry in enumerate(self.entries):
+            slot_idx = self.slot_index[entry.slot.start_time]
+            clashes = self.clashes(entry_idx, entry.day, slot_idx)
+            if clashes:
+                raise ValueError("; ".join(clashes))
+            self.entry_slot[entry_idx] = slot_idx
+            self._occupy(entry_idx, entry_idx)
+        self._link_views()
+
+    def _ids(self, view: Dict[str, Any], field: str) -> List[str]:
+        """Entity IDs of a view, followed by any only entries refer to"""
+        ids = dict.fromkeys(view)
+        ids.update(dict.fromkeys(getattr(entry, field) for entry in self.entries))
+        return list(ids)
+
+    def _link_views(self):
+        """Rebuild the teacher and room views from the class view's entries"""
+        teacher_names = {
+            teacher_id: teacher_tt.teacher_name for teacher_id, teacher_tt in self.timetable.teacher_timetables.items()
+        }
+        teacher_timetables = {
+            teacher_id: TeacherTimetable(
+                teacher_id=teacher_id, teacher_name=teacher_names.get(teacher_id, teacher_id), entries=[]
+            )
+            for teacher_id in self.teacher_ids
+        }
+        room_allocations: Dict[str, List[TimetableEntry]] = {room_id: [] for room_id in self.room_ids}
+        for entry in self.entries:
+            teacher_timetables[entry.teacher_id].entries.append(entry)
+            room_allocations[entry.room_id].append(entry)
+        self.timetable.teacher_timetables = teacher_timetables
+        self.timetable.room_allocations = room_allocations
+
+    def slot_position(self, slot: Any) -> int:
+        """
+        Index of a time slot given as an index, a start time such as
+        "09:00", or a time slot with a start_time.
+
+        Raises:
+            ValueError: If the slot is not part of the timetable
+        """
+        if isinstance(slot, dict):
+            slot = slot.get("start_time")
+        if isinstance(slot, TimeSlot):
+            slot = slot.start_time
+        if isinstance(slot, str):
+            try:
+                slot = time.fromisoformat(slot)
+            except ValueError:
+                raise ValueError(f"Invalid time slot {slot}")
+        if isinstance(slot, time):
+            if slot not in self.slot_index:
+                raise ValueError(f"No time slot starts at {slot.strftime('%H:%M')}")
+            return self.slot_index[slot]
+        if isinstance(slot, int) and not isinstance(slot, bool) and 0 <= slot < len(self.time_slots):
+            return slot
+        raise ValueError(f"Invalid time slot {slot}")
+
+    def _cell(self, day: Any, slot_idx: int) -> str:
+        return f"day {day} at {self.time_slots[slot_idx].start_time.strftime('%H:%M')}"
+
+    def find(self, class_id: str, day: int, slot_idx: int) -> Optional[int]:
+        """Index of the entry a class has in a cell, or None"""
+        class_idx = self.class_index.get(class_id)
+        if class_idx is None or not 0 <= day < self.num_days:
+            return None
+        entry_idx = int(self.class_cells[class_idx, day, slot_idx])
+        return None if entry_idx == FREE else entry_idx
+
+    def clashes(self, entry_idx: int, day: int, slot_idx: int, ignore: Tuple[int, ...] = ()) -> List[str]:
+        """
+        Why an entry cannot take a cell: the class, teacher or room is
+        already busy there with another entry. Entries in ignore are treated
+        as having left the cell.
+        """
+        if not 0 <= day < self.num_days:
+            return [f"Day {day} is not part of the timetable"]
+        entry = self.entries[entry_idx]
+        clashes = []
+        for kind, entity_id, cells, entity_idx in (
+            ("Class", entry.class_id, self.class_cells, self.entry_class[entry_idx]),
+            ("Teacher", entry.teacher_id, self.teacher_cells, self.entry_teacher[entry_idx]),
+            ("Room", entry.room_id, self.room_cells, self.entry_room[entry_idx]),
+        ):
+            other_idx = int(cells[entity_idx, day, slot_idx])
+            if other_idx in (FREE, entry_idx) or other_idx in ignore:
+                continue
+            other = self.entries[other_idx]
+            clashes.append(
+                f"{kind} {entity_id} already has {other.subject_id} of class {other.class_id} "
+                f"on {self._cell(day, slot_idx)}"
+            )
+        return clashes
+
+    def _occupy(self, entry_idx: int, value: int):
+        """Mark an entry's cells, at its current position, with value"""
+        day, slot_idx = self.entries[entry_idx].day, self.entry_slot[entry_idx]
+        self.class_cells[self.entry_class[entry_idx], day, slot_idx] = value
+        self.teacher_cells[self.entry_teacher[entry_idx], day, slot_idx] = value
+        self.room_cells[self.entry_room[entry_idx], day, slot_idx] = value
+
+    def _place(self, entry_idx: int, day: int, slot_idx: int):
+        entry = self.entries[entry_idx]
+        entry.day = day
+        entry.slot = self.time_slots[slot_idx]
+        self.entry_slot[entry_idx] = slot_idx
+
+    def move(self, entry_idx: int, day: int, slot_idx: int):
+        """
+        Move an entry to another cell, keeping its teacher and room.
+
+        Raises:
+            ValueError: If the class, teacher or room is busy in that cell
+        """
+        clashes = self.clashes(entry_idx, day, slot_idx)
+        if clashes:
+            raise ValueError("; ".join(clashes))
+        self._occupy(entry_idx, FREE)
+        self._place(entry_idx, day, slot_idx)
+        self._occupy(entry_idx, entry_idx)
+
+    def swap(self, first_idx: int, second_idx: int):
+        """
+        Exchange the cells of two entries.
+
+        Raises:
+            ValueError: If either entry's class, teacher or room is busy in
+                the other's cell
+        """
+        first_cell = (self.entries[first_idx].day, int(self.entry_slot[first_idx]))
+        second_cell = (self.entries[second_idx].day, int(self.entry_slot[second_idx]))
+        ignore = (first_idx, second_idx)
+        clashes = self.clashes(first_idx, *second_cell, ignore=ignore) + self.clashes(second_idx, *first_cell, ignore=ignore)
+        if clashes:
+            raise ValueError("; ".join(clashes))
+        self._occupy(first_idx, FREE)
+        self._occupy(second_idx, FREE)
+        self._place(first_idx, *second_cell)
+        self._place(second_idx, *first_cell)
+        self._occupy(first_idx, first_idx)
+        self._occupy(second_idx, second_idx)
+
+    def lesson_at(self, class_id: str, position: Dict[str, Any]) -> int:
+        """
+        Index of the entry a class has at a {"day", "slot"} position.
+
+        Raises:
+            ValueError: If the position is invalid or the class has no lesson there
+        """
+        day, slot_idx = self.position(position)
+        entry_idx = self.find(class_id, day, slot_idx)
+        if entry_idx is None:
+            raise ValueError(f"Class {class_id} has no lesson on {self._cell(day, slot_idx)}")
+        return entry_idx
+
+    def position(self, position: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        (day, slot index) of a {"day", "slot"} position.
+
+        Raises:
+            ValueError: If the day or slot is not part of the timetable
+        """
+        day = (position or {}).get("day")
+        if not isinstance(day, int) or isinstance(day, bool) or not 0 <= day < self.num_days:
+            raise ValueError(f"Invalid day {day}")
+        return day, self.slot_position((position or {}).get("slot"))
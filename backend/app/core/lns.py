@@ -0,0 +1,218 @@
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from .model_cache import ModelCache
+from .optimizer import SolutionListener, TimetableOptimizer, _SolutionTimer
+from .room_pools import RoomPools
+from .solve_control import SolveControl, solve_with_control
+from .variable_store import VariableKey
+from ..schemas.timetable import (
+    Teacher, Room, Subject, Class, TimetableConstraints, GeneratedTimetable,
+    SolveMode, SolverParameters
+)
+
+
+class LNSOptimizer(TimetableOptimizer):
+    """
+    Large neighbourhood search around the CP-SAT model.
+
+    A first timetable is found quickly with the decomposed solve, which stops
+    at its first solution so the neighbourhoods get the rest of the time
+    limit. The search then repeatedly releases one neighbourhood of it - the lessons of one day,
+    of one group of teachers sharing subjects, or in one room pool - freezes
+    every other lesson in place and re-optimizes the small sub-model under a
+    tight time limit. A sub-solution replaces the current timetable when it
+    keeps classes in their rooms at least as often.
+    """
+
+    NEIGHBOURHOODS = ("day", "teacher_group", "room_pool")
+
+    def __init__(
+        self,
+        sub_time_limit_seconds: float = 1.0,
+        max_released_entries: int = 200,
+        seed: int = 0,
+        on_solution: Optional[SolutionListener] = None,
+        control: Optional[SolveControl] = None,
+        model_cache: Optional[ModelCache] = None
+    ):
+        super().__init__(on_solution, control, model_cache)
+        self.sub_time_limit_seconds = sub_time_limit_seconds
+        self.max_released_entries = max_released_entries
+        self.seed = seed
+
+    def solve(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.LNS,
+        room_pooling: bool = True,
+        symmetry_breaking: bool = True,
+        solver_parameters: Optional[SolverParameters] = None,
+        base_timetable: Optional[GeneratedTimetable] = None,
+        repair_hint: bool = False
+    ) -> GeneratedTimetable:
+        """
+        Solve the timetable optimization problem by large neighbourhood search
+
+        Takes the same arguments as TimetableOptimizer.solve. The first
+        timetable comes from mode (decomposed unless monolithic is asked
+        for); symmetry breaking only applies to that first solve, since frozen
+        lessons make interchangeable entities distinguishable. The solution
+        listener sees the first solve's solutions and then every improvement.
+
+        Returns:
+            GeneratedTimetable object with the best solution found; its stats
+            hold the objective after every improvement as (elapsed, value)
+            pairs in lns_objective_trace
+        """
+        start_time = time.time()
+        first_mode = SolveMode.MONOLITHIC if SolveMode(mode) == SolveMode.MONOLITHIC else SolveMode.DECOMPOSED
+
+        # Stop at the first timetable; improving it is the neighbourhoods' job
+        first_parameters = (solver_parameters or SolverParameters()).model_copy(
+            update={"stop_after_first_solution": True}
+        )
+        initial = super().solve(
+            teachers, rooms, subjects, classes, constraints, time_limit_seconds,
+            mode=first_mode, room_pooling=room_pooling, symmetry_breaking=symmetry_breaking,
+            solver_parameters=first_parameters, base_timetable=base_timetable,
+            repair_hint=repair_hint
+        )
+        if initial.conflicts:
+            return initial
+        initial_time = time.time() - start_time
+        # Sub-models are searched with the parameters as given
+        self.solver_parameters = solver_parameters or SolverParameters()
+        self.start_time = start_time
+        self.deadline = start_time + time_limit_seconds
+
+        current = [
+            self._entry_assignment(entry)
+            for class_tt in initial.class_timetables.values()
+            for entry in class_tt.entries
+        ]
+        objective = self._room_stickiness(current)
+        trace = [(time.time() - start_time, float(objective))]
+
+        rng = random.Random(self.seed)
+        pools = RoomPools(self.compatibility, pooling=room_pooling)
+        iterations = 0
+        while self._time_left() > 0:
+            iterations += 1
+            released = self._pick_neighbourhood(rng, current, pools)
+            if not released:
+                continue
+            candidate = self._solve_neighbourhood(
+                current, released, room_pooling, min(self.sub_time_limit_seconds, self._time_left())
+            )
+            if candidate is None:
+                continue
+            value = self._room_stickiness(candidate)
+            if value >= objective:
+                if value > objective:
+                    trace.append((time.time() - start_time, float(value)))
+                    self._publish_assignments(candidate, value, len(trace))
+                current, objective = candidate, value
+
+        stats = {
+            key: value for key, value in initial.stats.items()
+            if key.startswith("compat_") or key in ("build_time", "first_solution_time")
+        }
+        stats.update({
+            "objective_value": float(objective),
+            "lns_initial_objective": trace[0][1],
+            "lns_initial_time": initial_time,
+            "lns_iterations": float(iterations),
+            "lns_improvements": float(len(trace) - 1),
+            "lns_objective_trace": trace,
+            "solve_cancelled": float(self.control is not None and self.control.cancelled),
+        })
+        return self._timetable(current, stats)
+
+    def _timetable(self, assignments: List[VariableKey], stats) -> GeneratedTimetable:
+        """Build a timetable from complete assignments, handed out as a fully frozen solution"""
+        self._reset_fixed()
+        self._fix_assignments(assignments)
+        return self._process_solution(time.time() - self.start_time, [], stats)
+
+    def _publish_assignments(self, assignments: List[VariableKey], objective: int, solution_count: int):
+        if self.on_solution is not None:
+            timetable = self._timetable(assignments, {"objective_value": float(objective)})
+            self._publish(timetable, float(objective), None, solution_count)
+
+    def _pick_neighbourhood(
+        self, rng: random.Random, current: List[VariableKey], pools: RoomPools
+    ) -> List[VariableKey]:
+        """Choose a random neighbourhood and return the assignments it releases"""
+        kind = rng.choice(self.NEIGHBOURHOODS)
+        if kind == "day":
+            day = rng.choice(self.days)
+            released = [key for key in current if key[0] == day]
+        elif kind == "teacher_group":
+            # A teacher and every teacher sharing one of their subjects
+            teacher_idx = rng.randrange(len(self.teacher_ids))
+            teacher_ok = self.compatibility.teacher_ok
+            group = set(np.flatnonzero((teacher_ok & teacher_ok[:, [teacher_idx]]).any(axis=0)).tolist())
+            group.add(teacher_idx)
+            released = [key for key in current if key[4] in group]
+        else:
+            pool_idx = rng.randrange(len(pools))
+            released = [key for key in current if pools.pool_of_room[key[5]] == pool_idx]
+        return self._limit(rng, released)
+
+    def _limit(self, rng: random.Random, released: List[VariableKey]) -> List[VariableKey]:
+        """Keep the lessons of randomly chosen classes until the size limit is reached"""
+        if len(released) <= self.max_released_entries:
+            return released
+        by_class = {}
+        for key in released:
+            by_class.setdefault(key[2], []).append(key)
+        class_order = list(by_class)
+        rng.shuffle(class_order)
+        limited = []
+        for class_idx in class_order:
+            if limited and len(limited) + len(by_class[class_idx]) > self.max_released_entries:
+                break
+            limited.extend(by_class[class_idx])
+        return limited
+
+    def _solve_neighbourhood(
+        self,
+        current: List[VariableKey],
+        released: List[VariableKey],
+        room_pooling: bool,
+        time_limit_seconds: float
+    ) -> Optional[List[VariableKey]]:
+        """
+        Re-optimize the released assignments with everything else frozen.
+
+        Returns the complete new set of assignments, or None if the sub-model
+        found no solution in time.
+        """
+        released_set = set(released)
+        self._reset_fixed()
+        self._fix_assignments([key for key in current if key not in released_set])
+        self._build_model(room_pooling, symmetry_breaking=False)
+
+        # Start from the current assignment of the released lessons
+        self.model.ClearHints()
+        for key in released:
+            var = self.variables.get(key[:5] + (int(self.room_pools.pool_of_room[key[5]]),))
+            if var is not None:
+                self.model.AddHint(var, 1)
+            self.preferred_rooms[(key[0], key[1], key[2])] = key[5]
+
+        self.solver = self._create_solver(max(time_limit_seconds, 0.01))
+        status = solve_with_control(self.solver, self.model, _SolutionTimer(), self.control)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None
+        return self.fixed_assignments + self._assign_pool_rooms(self._selected_keys())
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import ortools
+from ortools.sat.python import cp_model
+
+from .private_directory import default_directory, private_directory
+from .variable_store import VariableKey, VariableStore
+from ..schemas.timetable import Teacher, Room, Subject, Class, TimetableConstraints
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of a cache entry or the model built from the inputs changes
+CACHE_FORMAT_VERSION = 2
+
+
+def model_key(
+    teachers: List[Teacher],
+    rooms: List[Room],
+    subjects: List[Subject],
+    classes: List[Class],
+    constraints: TimetableConstraints,
+    **options: Any
+) -> str:
+    """
+    Canonical content hash of the inputs a model is built from.
+
+    Entities keep their order, since it decides the integer indexes of the
+    model's variables; fields within each entity are sorted.
+    """
+    content = {
+        "version": CACHE_FORMAT_VERSION,
+        "ortools": ortools.__version__,
+        "teachers": [teacher.model_dump(mode="json") for teacher in teachers],
+        "rooms": [room.model_dump(mode="json") for room in rooms],
+        "subjects": [subject.model_dump(mode="json") for subject in subjects],
+        "classes": [class_.model_dump(mode="json") for class_ in classes],
+        "constraints": constraints.model_dump(mode="json"),
+        "options": options,
+    }
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CachedModel:
+    """A built model, restored from its serialized proto and variable index mapping"""
+
+    def __init__(self, model: cp_model.CpModel, variables: VariableStore, extra: Dict[str, Any]):
+        self.model = model
+        self.variables = variables
+        self.extra = extra
+
+
+class ModelCache:
+    """
+    On-disk LRU cache of compiled CP-SAT models.
+
+    Each entry is an .npz file holding the serialized model proto and, for
+    every decision variable, its (day, slot, class, subject, teacher, room)
+    key and proto index, so a model is rehydrated by parsing the proto and
+    re-registering its variables instead of being built again. Entries hold
+    plain arrays and JSON only, and are read without unpickling anything.
+    Reading an entry marks it as recently used; beyond max_entries the least
+    recently used are removed.
+
+    The directory is private to the user running the server: it is created
+    with mode 0700, and a directory owned by another user is not used.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            directory: Where entries are stored. Defaults to the
+                TIMETABLE_MODEL_CACHE_DIR environment variable, or a
+                per-user directory under the system temp directory.
+            max_entries: Number of models kept. Defaults to the
+                TIMETABLE_MODEL_CACHE_SIZE environment variable, or 32.
+        """
+        self.directory = (
+            directory or os.getenv("TIMETABLE_MODEL_CACHE_DIR") or default_directory("timetable_model_cache")
+        )
+        self.max_entries = max_entries or int(os.getenv("TIMETABLE_MODEL_CACHE_SIZE", 32))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[CachedModel]:
+        """Rehydrate the model stored under a key, or None if there is none"""
+        if not private_directory(self.directory, create=False):
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                proto = entry["model"].tobytes()
+                keys = entry["keys"].tolist()
+                indices = entry["indices"].tolist()
+                extra = json.loads(str(entry["extra"]))
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable model cache entry {key}: {str(e)}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        model = cp_model.CpModel()
+        model.Proto().ParseFromString(proto)
+        variables = VariableStore()
+        for key_tuple, index in zip(keys, indices):
+            variables.add(tuple(key_tuple), model.GetBoolVarFromProtoIndex(index))
+        self.hits += 1
+        return CachedModel(model, variables, extra)
+
+    def put(
+        self,
+        key: str,
+        model: cp_model.CpModel,
+        variables: VariableStore,
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Store a built model under a key.
+
+        Args:
+            key: Content hash of the model's inputs (see model_key)
+            model: The built model, before any solution hints are added
+            variables: Its decision variables
+            extra: Small JSON-serializable values needed alongside the model
+        """
+        keys: List[VariableKey] = list(variables)
+        entry = {
+            "model": np.frombuffer(model.Proto().SerializeToString(), dtype=np.uint8),
+            "keys": np.array(keys, dtype=np.int64).reshape(-1, 6),
+            "indices": np.array([variables.get(key_tuple).Index() for key_tuple in keys], dtype=np.int64),
+            "extra": np.array(json.dumps(extra or {})),
+        }
+        with self._lock:
+            if not private_directory(self.directory, create=True):
+                return
+            # Write to a temporary file first so readers never see half an entry
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **entry)
+                os.replace(temp_path, self._path(key))
+            except Exception:
+                self._remove(temp_path)
+                raise
+            self._evict()
+
+    def _evict(self):
+        """Remove the least recently used entries beyond max_entries"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except FileNotFoundError:
+                    continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            self._remove(path)
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every entry"""
+        if private_directory(self.directory, create=False):
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    self._remove(os.path.join(self.directory, name))
+
+
+# Process-wide model cache shared by all optimizers that opt in
+model_cache = ModelCache()
@@ -1,36 +1,80 @@
 from ortools.sat.python import cp_model
 import numpy as np
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Callable, Dict, List, Tuple, Set, Optional, Any
 import time
+from .availability import create_time_slots, outside_cells, unavailable_cells
+from .compatibility import CompatibilityMatrix
+from .feasibility import FeasibilityChecker
+from .greedy import GreedyScheduler
+from .model_cache import ModelCache, model_key
+from .room_assignment import match_rooms
+from .room_pools import RoomPools
+from .solve_control import SolveControl, solve_with_control
+from .symmetry import SymmetryDetector, add_lex_greater_equal
+from .variable_store import VariableStore, VariableKey
 from ..schemas.timetable import (
     Teacher, Room, Subject, Class, TimeSlot, 
     TimetableConstraints, TimetableEntry, GeneratedTimetable,
-    ClassTimetable, TeacherTimetable
+    ClassTimetable, TeacherTimetable, SolveMode, SolverParameters,
+    TimetableChange, ChangeType, SolveProgress
 )
 
+# Receives every improving solution while a solve is running
+SolutionListener = Callable[[SolveProgress], None]
+
+class _SolutionTimer(cp_model.CpSolverSolutionCallback):
+    """
+    Records when the solver finds its first and subsequent solutions, and
+    hands each of them to an optional handler.
+    """
+    
+    def __init__(self, handler: Optional[Callable[["_SolutionTimer"], None]] = None):
+        super().__init__()
+        self.start_time = time.time()
+        self.first_solution_time = None
+        self.solution_count = 0
+        self.handler = handler
+    
+    def on_solution_callback(self):
+        self.solution_count += 1
+        if self.first_solution_time is None:
+            self.first_solution_time = time.time() - self.start_time
+        if self.handler is not None:
+            self.handler(self)
+
 class TimetableOptimizer:
     """
     Core optimization engine that uses constraint programming to generate timetables
     based on various constraints and requirements.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        on_solution: Optional[SolutionListener] = None,
+        control: Optional[SolveControl] = None,
+        model_cache: Optional[ModelCache] = None
+    ):
         self.model = None
         self.solver = None
-        self.variables = {}
+        self.on_solution = on_solution
+        self.control = control
+        self.model_cache = model_cache
+        self.start_time = time.time()
+        self.deadline = self.start_time
+        self.variables = VariableStore()
+        self.room_pools = None
+        self.symmetry = None
+        self.feasibility = None
+        self.enforcement = None
+        self.solver_parameters = SolverParameters()
+        self.repair_hint = False
         self.solution = None
         
     def _create_time_slots(self, constraints: TimetableConstraints) -> List[TimeSlot]:
         """Generate time slots based on constraints"""
-        # This is a placeholder - in a real implementation, we would generate
-        # actual time slots based on the school's schedule
-        slots = []
-        for hour in range(8, 8 + constraints.max_hours_per_day):
-            start = TimeSlot(start_time=f"{hour}:00", end_time=f"{hour}:50")
-            slots.append(start)
-        return slots
-        
-    def _initialize_model(
+        return create_time_slots(constraints)
+        
+    def _setup_entities(
         self,
         teachers: List[Teacher],
         rooms: List[Room],
@@ -38,20 +82,131 @@ class TimetableOptimizer:
         classes: List[Class],
         constraints: TimetableConstraints
     ):
-        """Initialize the constraint programming model"""
-        self.model = cp_model.CpModel()
+        """Index the input entities and precompute their compatibility"""
         self.teachers = {teacher.id: teacher for teacher in teachers}
         self.rooms = {room.id: room for room in rooms}
         self.subjects = {subject.id: subject for subject in subjects}
         self.classes = {class_.id: class_ for class_ in classes}
         self.constraints = constraints
         
+        # Integer indexes for every entity, used as variable keys
+        self.class_ids = list(self.classes)
+        self.subject_ids = list(self.subjects)
+        self.teacher_ids = list(self.teachers)
+        self.room_ids = list(self.rooms)
+        self.class_index = {class_id: idx for idx, class_id in enumerate(self.class_ids)}
+        self.subject_index = {subject_id: idx for idx, subject_id in enumerate(self.subject_ids)}
+        self.teacher_index = {teacher_id: idx for idx, teacher_id in enumerate(self.teacher_ids)}
+        self.room_index = {room_id: idx for idx, room_id in enumerate(self.room_ids)}
+        
+        # Precompute which (class, subject, teacher, room) combinations can be true
+        self.compatibility = CompatibilityMatrix(
+            list(self.teachers.values()),
+            list(self.rooms.values()),
+            list(self.subjects.values()),
+            list(self.classes.values())
+        )
+        
         # Generate days and time slots
         self.days = list(range(constraints.days_per_week))
         self.time_slots = self._create_time_slots(constraints)
         self.num_slots = len(self.time_slots)
+        self.slot_index = {slot.start_time: idx for idx, slot in enumerate(self.time_slots)}
+        
+        # Cells teachers and rooms are never available in; no variable is
+        # created for them
+        num_days = len(self.days)
+        self.teacher_unavailable = np.array([
+            unavailable_cells(teacher.unavailable_slots, self.time_slots, num_days)
+            for teacher in self.teachers.values()
+        ], dtype=bool).reshape(len(self.teacher_ids), num_days, self.num_slots)
+        self.room_unavailable = np.array([
+            outside_cells(room.available_slots, self.time_slots, num_days)
+            for room in self.rooms.values()
+        ], dtype=bool).reshape(len(self.room_ids), num_days, self.num_slots)
+        self.symmetry = None
+        self.feasibility = None
+        self._reset_fixed()
+    
+    def _reset_fixed(self):
+        """Reset blocked time slots to teacher and room availability, and clear frozen assignments"""
+        num_days = len(self.days)
+        num_classes, num_teachers = len(self.class_ids), len(self.teacher_ids)
+        
+        # Blocked (day, slot) cells: nothing new may be scheduled there
+        self.class_blocked = np.zeros((num_classes, num_days, self.num_slots), dtype=bool)
+        self.teacher_blocked = self.teacher_unavailable.copy()
+        self.room_blocked = self.room_unavailable.copy()
+        
+        # Frozen assignments and the hours they already account for
+        self.fixed_assignments: List[VariableKey] = []
+        self.fixed_lesson_hours = np.zeros((num_classes, len(self.subject_ids)), dtype=np.int64)
+        self.fixed_class_hours = np.zeros((num_classes, num_days), dtype=np.int64)
+        self.fixed_teacher_hours = np.zeros((num_teachers, num_days), dtype=np.int64)
+        
+        # Room each (day, slot, class) should get when rooms are handed out
+        self.preferred_rooms: Dict[Tuple[int, int, int], int] = {}
+    
+    def _fix_assignments(self, assignments: List[VariableKey]):
+        """
+        Freeze assignments in place: their class, teacher and room are blocked
+        in that slot and their hours count towards every hour requirement.
+        """
+        for day, slot_idx, class_idx, subject_idx, teacher_idx, room_idx in assignments:
+            self.class_blocked[class_idx, day, slot_idx] = True
+            self.teacher_blocked[teacher_idx, day, slot_idx] = True
+            self.room_blocked[room_idx, day, slot_idx] = True
+            self.fixed_lesson_hours[class_idx, subject_idx] += 1
+            self.fixed_class_hours[class_idx, day] += 1
+            self.fixed_teacher_hours[teacher_idx, day] += 1
+        self.fixed_assignments.extend(assignments)
+    
+    def _remaining_hours(self, class_idx: int, subject_idx: int) -> int:
+        """Weekly hours of a lesson not yet covered by frozen assignments"""
+        subject = self.subjects[self.subject_ids[subject_idx]]
+        return subject.hours_per_week - int(self.fixed_lesson_hours[class_idx, subject_idx])
+    
+    def _check_feasibility(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        start_time: float
+    ) -> Optional[GeneratedTimetable]:
+        """
+        Screen the set-up entities for necessary conditions before any model
+        is built. Returns a timetable listing the problems if the request
+        cannot be solved, None otherwise.
+        """
+        self.feasibility = FeasibilityChecker(
+            teachers, rooms, subjects, classes, constraints, self.compatibility, self.num_slots,
+            self.teacher_unavailable, self.room_unavailable
+        )
+        if not self.feasibility.problems:
+            return None
+        self.variables = VariableStore()
+        self.room_pools = None
+        timetable = self._no_solution(time.time() - start_time, {})
+        timetable.conflicts = list(self.feasibility.problems)
+        return timetable
+    
+    def _build_model(
+        self,
+        room_pooling: bool = True,
+        symmetry_breaking: bool = True,
+        room_objective: bool = True
+    ):
+        """Build the model over the set-up entities, around any blocked or frozen slots"""
+        self.model = cp_model.CpModel()
+        
+        # Schedule against pools of interchangeable rooms
+        self.room_pools = RoomPools(self.compatibility, pooling=room_pooling)
+        self.pool_capacity = self.room_pools.free_rooms(self.room_blocked)
         
         # Create decision variables
+        self.variables = VariableStore()
         self._create_variables()
         
         # Add constraints
@@ -60,149 +215,218 @@ class TimetableOptimizer:
         self._add_room_constraints()
         self._add_class_constraints()
         self._add_subject_constraints()
+        if symmetry_breaking:
+            self._add_symmetry_breaking()
         
         # Add optimization objectives
-        self._set_optimization_objectives()
+        if room_objective:
+            self._set_optimization_objectives()
     
     def _create_variables(self):
         """Create decision variables for the CP model"""
-        # Main decision variables: (day, slot, class, subject, teacher, room)
-        # 1 if this combination is selected, 0 otherwise
-        for day in self.days:
-            for slot_idx, _ in enumerate(self.time_slots):
-                for class_id, class_obj in self.classes.items():
-                    for subject_id in class_obj.subjects:
-                        subject = self.subjects[subject_id]
-                        for teacher_id in subject.preferred_teachers:
-                            for room_id, room in self.rooms.items():
-                                # Check if room has necessary features
-                                if all(feature in room.features for feature in subject.requires_features):
-                                    var_name = f"d{day}s{slot_idx}c{class_id}subj{subject_id}t{teacher_id}r{room_id}"
-                                    self.variables[var_name] = self.model.NewBoolVar(var_name)
+        # Main decision variables: (day, slot, class, subject, teacher, room pool)
+        # 1 if this combination is selected, 0 otherwise. Only combinations
+        # allowed by the compatibility matrix get a variable, and none in slots
+        # where the class or teacher is blocked or the pool has no free room.
+        for class_idx, subject_idx in self.compatibility.lessons().tolist():
+            if self._remaining_hours(class_idx, subject_idx) <= 0:
+                continue
+            teacher_idxs, _ = self.compatibility.candidates(class_idx, subject_idx)
+            pool_idxs = self.room_pools.candidates(class_idx, subject_idx)
+            class_id = self.class_ids[class_idx]
+            subject_id = self.subject_ids[subject_idx]
+            
+            # free[day, slot, teacher, pool]
+            free = (
+                ~self.class_blocked[class_idx][:, :, None, None]
+                & ~self.teacher_blocked[teacher_idxs].transpose(1, 2, 0)[:, :, :, None]
+                & (self.pool_capacity[pool_idxs] > 0).transpose(1, 2, 0)[:, :, None, :]
+            )
+            for day, slot_idx, teacher_pos, pool_pos in np.argwhere(free).tolist():
+                teacher_idx = int(teacher_idxs[teacher_pos])
+                pool_idx = int(pool_idxs[pool_pos])
+                key = (day, slot_idx, class_idx, subject_idx, teacher_idx, pool_idx)
+                var_name = f"d{day}s{slot_idx}c{class_id}subj{subject_id}t{self.teacher_ids[teacher_idx]}p{pool_idx}"
+                self.variables.add(key, self.model.NewBoolVar(var_name))
+    
+    def _build_or_load_model(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        room_pooling: bool,
+        symmetry_breaking: bool
+    ) -> Dict[str, float]:
+        """
+        Build the model over the set-up entities, or rehydrate it from the
+        model cache when the same inputs were built before
+        """
+        if self.model_cache is None:
+            self._build_model(room_pooling, symmetry_breaking)
+            return {}
+        
+        key = model_key(
+            teachers, rooms, subjects, classes, constraints,
+            room_pooling=room_pooling, symmetry_breaking=symmetry_breaking
+        )
+        cached = self.model_cache.get(key)
+        if cached is None:
+            self._build_model(room_pooling, symmetry_breaking)
+            symmetry_constraints = self.symmetry.constraint_count if self.symmetry is not None else None
+            self.model_cache.put(key, self.model, self.variables, {"symmetry_constraints": symmetry_constraints})
+            return {"model_cache_hit": 0.0}
+        
+        # Only the cheap NumPy state around the model is recomputed
+        self.model = cached.model
+        self.variables = cached.variables
+        self.room_pools = RoomPools(self.compatibility, pooling=room_pooling)
+        self.pool_capacity = self.room_pools.free_rooms(self.room_blocked)
+        if cached.extra["symmetry_constraints"] is not None:
+            self._detect_symmetry()
+            self.symmetry.constraint_count = cached.extra["symmetry_constraints"]
+        return {"model_cache_hit": 1.0}
+    
+    def _enforce(self, constraint: cp_model.Constraint, group: Tuple):
+        """
+        Attach a constraint to the enforcement literal of its constraint group
+        while the model is built to explain infeasibility
+        """
+        if self.enforcement is None:
+            return
+        if group not in self.enforcement:
+            self.enforcement[group] = self.model.NewBoolVar("enforce_" + "_".join(map(str, group)))
+        constraint.OnlyEnforceIf(self.enforcement[group])
     
     def _add_basic_constraints(self):
         """Add basic constraints that must always be satisfied"""
         # A class can only have one subject at a time
-        for day in self.days:
-            for slot_idx in range(self.num_slots):
-                for class_id in self.classes:
-                    # Get all variables for this day, slot, class
-                    slot_vars = []
-                    for var_name, var in self.variables.items():
-                        if f"d{day}s{slot_idx}c{class_id}" in var_name:
-                            slot_vars.append(var)
-                    
-                    # At most one subject per slot for a class
-                    if slot_vars:
-                        self.model.Add(sum(slot_vars) <= 1)
+        for (_, _, class_idx), slot_vars in self.variables.by_day_slot_class.items():
+            self._enforce(
+                self.model.Add(cp_model.LinearExpr.Sum(slot_vars) <= 1), ("class_single", class_idx)
+            )
         
         # A teacher can only teach one class at a time
-        for day in self.days:
-            for slot_idx in range(self.num_slots):
-                for teacher_id in self.teachers:
-                    # Get all variables for this day, slot, teacher
-                    teacher_vars = []
-                    for var_name, var in self.variables.items():
-                        if f"d{day}s{slot_idx}" in var_name and f"t{teacher_id}" in var_name:
-                            teacher_vars.append(var)
-                    
-                    # At most one class per slot for a teacher
-                    if teacher_vars:
-                        self.model.Add(sum(teacher_vars) <= 1)
-        
-        # A room can only be used by one class at a time
-        for day in self.days:
-            for slot_idx in range(self.num_slots):
-                for room_id in self.rooms:
-                    # Get all variables for this day, slot, room
-                    room_vars = []
-                    for var_name, var in self.variables.items():
-                        if f"d{day}s{slot_idx}" in var_name and f"r{room_id}" in var_name:
-                            room_vars.append(var)
-                    
-                    # At most one class per slot for a room
-                    if room_vars:
-                        self.model.Add(sum(room_vars) <= 1)
+        for (_, _, teacher_idx), teacher_vars in self.variables.by_day_slot_teacher.items():
+            self._enforce(
+                self.model.Add(cp_model.LinearExpr.Sum(teacher_vars) <= 1), ("teacher_single", teacher_idx)
+            )
     
     def _add_teacher_constraints(self):
         """Add constraints related to teachers"""
         # Teachers shouldn't exceed max hours per day
-        for teacher_id, teacher in self.teachers.items():
-            for day in self.days:
-                # Get all variables for this teacher on this day
-                day_vars = []
-                for var_name, var in self.variables.items():
-                    if f"d{day}" in var_name and f"t{teacher_id}" in var_name:
-                        day_vars.append(var)
-                
-                # Limit hours per day
-                if day_vars:
-                    self.model.Add(sum(day_vars) <= teacher.max_hours_per_day)
-        
-        # Teachers can only teach subjects they're qualified for
-        for var_name, var in self.variables.items():
-            # Parse the variable name to extract components
-            parts = var_name.split('subj')
-            if len(parts) > 1:
-                subject_part = parts[1].split('t')[0]
-                subject_id = subject_part
-                
-                teacher_part = parts[1].split('t')[1].split('r')[0]
-                teacher_id = teacher_part
-                
-                # Check if this subject is in the teacher's subject list
-                if subject_id not in self.teachers[teacher_id].subjects:
-                    # If not qualified, constrain this variable to 0
-                    self.model.Add(var == 0)
+        for (teacher_idx, day), day_vars in self.variables.by_teacher_day.items():
+            teacher = self.teachers[self.teacher_ids[teacher_idx]]
+            max_hours = teacher.max_hours_per_day - int(self.fixed_teacher_hours[teacher_idx, day])
+            self._enforce(
+                self.model.Add(cp_model.LinearExpr.Sum(day_vars) <= max_hours), ("teacher_daily", teacher_idx)
+            )
+        
+        # Teachers can only teach subjects they're qualified for: variables for
+        # unqualified teachers are never created (see CompatibilityMatrix)
     
     def _add_room_constraints(self):
         """Add constraints related to rooms"""
-        # Room capacity must be sufficient for the class
-        for var_name, var in self.variables.items():
-            # Parse variable name
-            if 'c' in var_name and 'r' in var_name:
-                # Extract class_id and room_id
-                class_parts = var_name.split('c')[1].split('subj')[0]
-                class_id = class_parts
-                
-                room_parts = var_name.split('r')[1]
-                room_id = room_parts
-                
-                # If room capacity is less than class size, constrain to 0
-                if self.rooms[room_id].capacity < self.classes[class_id].students_count:
-                    self.model.Add(var == 0)
+        # A room can only be used by one class at a time, so a pool of
+        # interchangeable rooms hosts at most as many classes as it has free rooms
+        for (day, slot_idx, pool_idx), room_vars in self.variables.by_day_slot_room.items():
+            free_rooms = int(self.pool_capacity[pool_idx, day, slot_idx])
+            if len(room_vars) > free_rooms:
+                self._enforce(
+                    self.model.Add(cp_model.LinearExpr.Sum(room_vars) <= free_rooms), ("room_pool", pool_idx)
+                )
+        
+        # Room capacity and features must suit the class and subject: variables
+        # for unsuitable rooms are never created (see CompatibilityMatrix)
     
     def _add_class_constraints(self):
         """Add constraints related to classes"""
         # No more than max_hours_per_day for each class
-        for class_id in self.classes:
-            for day in self.days:
-                # Get all variables for this class on this day
-                day_vars = []
-                for var_name, var in self.variables.items():
-                    if f"d{day}" in var_name and f"c{class_id}" in var_name:
-                        day_vars.append(var)
-                
-                # Limit hours per day
-                if day_vars:
-                    self.model.Add(sum(day_vars) <= self.constraints.max_hours_per_day)
+        for (class_idx, day), day_vars in self.variables.by_class_day.items():
+            max_hours = self.constraints.max_hours_per_day - int(self.fixed_class_hours[class_idx, day])
+            self._enforce(
+                self.model.Add(cp_model.LinearExpr.Sum(day_vars) <= max_hours), ("class_daily", class_idx)
+            )
     
     def _add_subject_constraints(self):
         """Add constraints related to subjects"""
         # Each subject must have the required number of hours per week
-        for class_id, class_obj in self.classes.items():
-            for subject_id in class_obj.subjects:
-                subject = self.subjects[subject_id]
+        for class_idx, class_id in enumerate(self.class_ids):
+            for subject_id in self.classes[class_id].subjects:
+                if subject_id not in self.subjects:
+                    continue
+                subject_idx = self.subject_index[subject_id]
                 
                 # Get all variables for this class and subject
-                subject_vars = []
-                for var_name, var in self.variables.items():
-                    if f"c{class_id}" in var_name and f"subj{subject_id}" in var_name:
-                        subject_vars.append(var)
+                subject_vars = self.variables.by_class_subject.get((class_idx, subject_idx))
                 
-                # Ensure the right number of hours
-                if subject_vars:
-                    self.model.Add(sum(subject_vars) == subject.hours_per_week)
+                # Ensure the right number of hours on top of frozen ones; a
+                # lesson with no compatible teacher or room makes the model
+                # infeasible
+                hours = self._remaining_hours(class_idx, subject_idx)
+                if not subject_vars and hours == 0:
+                    continue
+                self._enforce(
+                    self.model.Add(cp_model.LinearExpr.Sum(subject_vars or []) == hours),
+                    ("lesson_hours", class_idx, subject_idx)
+                )
+    
+    def _detect_symmetry(self):
+        """Find interchangeable classes, teachers and rooms in their current state"""
+        num_classes, num_teachers = len(self.class_ids), len(self.teacher_ids)
+        self.symmetry = SymmetryDetector(
+            self.compatibility,
+            [self.teachers[teacher_id] for teacher_id in self.teacher_ids],
+            class_state=np.concatenate([
+                self.class_blocked.reshape(num_classes, -1), self.fixed_lesson_hours, self.fixed_class_hours
+            ], axis=1),
+            teacher_state=np.concatenate([
+                self.teacher_blocked.reshape(num_teachers, -1), self.fixed_teacher_hours
+            ], axis=1),
+            room_state=self.room_blocked
+        )
+    
+    def _add_symmetry_breaking(self):
+        """Order interchangeable classes, teachers and rooms lexicographically"""
+        self._detect_symmetry()
+        times = [(day, slot_idx) for day in self.days for slot_idx in range(self.num_slots)]
+        
+        def add_chain(vectors):
+            for first, second in zip(vectors, vectors[1:]):
+                add_lex_greater_equal(self.model, first, second)
+                self.symmetry.constraint_count += 1
+        
+        # Interchangeable classes: order by when they take their first subject
+        first_subject = {}
+        for group in self.symmetry.class_groups:
+            subject_idx = int(np.flatnonzero(self.compatibility.class_subject[group[0]])[0])
+            for class_idx in group:
+                first_subject[class_idx] = subject_idx
+        class_slot_vars = {}
+        for (day, slot_idx, class_idx, subject_idx, _, _), var in self.variables.items():
+            if first_subject.get(class_idx) == subject_idx:
+                class_slot_vars.setdefault((class_idx, day, slot_idx), []).append(var)
+        for group in self.symmetry.class_groups:
+            add_chain([
+                [cp_model.LinearExpr.Sum(class_slot_vars.get((class_idx, day, slot_idx), [])) for day, slot_idx in times]
+                for class_idx in group
+            ])
+        
+        # Interchangeable teachers: order by their weekly occupancy
+        for group in self.symmetry.teacher_groups:
+            add_chain([
+                [cp_model.LinearExpr.Sum(self.variables.by_day_slot_teacher.get((day, slot_idx, teacher_idx), [])) for day, slot_idx in times]
+                for teacher_idx in group
+            ])
+        
+        # Interchangeable rooms: already merged when rooms are pooled
+        if self.room_pools is not None and len(self.room_pools) == len(self.room_ids):
+            for group in self.symmetry.room_groups:
+                add_chain([
+                    [cp_model.LinearExpr.Sum(self.variables.by_day_slot_room.get((day, slot_idx, room_idx), [])) for day, slot_idx in times]
+                    for room_idx in group
+                ])
     
     def _set_optimization_objectives(self):
         """Set optimization objectives for the model"""
@@ -212,35 +436,231 @@ class TimetableOptimizer:
         # Initialize the objective
         objective_terms = []
         
-        # Add terms to minimize room changes for each class
-        for class_id in self.classes:
-            for day in self.days:
-                for slot_idx in range(self.num_slots - 1):
-                    # For each consecutive pair of slots
-                    current_slot_room_vars = {}
-                    next_slot_room_vars = {}
-                    
-                    # Get room assignments for current slot
-                    for var_name, var in self.variables.items():
-                        if f"d{day}s{slot_idx}c{class_id}" in var_name:
-                            room_id = var_name.split('r')[1]
-                            current_slot_room_vars[room_id] = var
-                    
-                    # Get room assignments for next slot
-                    for var_name, var in self.variables.items():
-                        if f"d{day}s{slot_idx+1}c{class_id}" in var_name:
-                            room_id = var_name.split('r')[1]
-                            next_slot_room_vars[room_id] = var
-                    
-                    # Create penalty variables for room changes
-                    for room_id in self.rooms:
-                        if room_id in current_slot_room_vars and room_id in next_slot_room_vars:
-                            # Encourage staying in the same room with a reward
-                            objective_terms.append(current_slot_room_vars[room_id] * next_slot_room_vars[room_id])
+        # Add terms to minimize room changes for each class: staying in the
+        # same pool lets the class keep its room when rooms are handed out.
+        # occupied[c, d, s, p] is 1 when class c has a lesson in pool p in
+        # slot (d, s); a stay reward for two consecutive slots is bounded by
+        # both indicators, which keeps the objective linear and tight (the
+        # rewards of one slot can never add up to more than one).
+        room_vars = self.variables.by_class_day_slot_room
+        occupied = {}
+        stays = {}
+        
+        def indicator(key):
+            if key not in occupied:
+                var = self.model.NewBoolVar(f"occ_c{key[0]}d{key[1]}s{key[2]}r{key[3]}")
+                self.model.Add(var == cp_model.LinearExpr.Sum(room_vars[key]))
+                occupied[key] = var
+            return occupied[key]
+        
+        for class_idx, day, slot_idx, room_idx in list(room_vars):
+            # For each consecutive pair of slots in the same room
+            next_key = (class_idx, day, slot_idx + 1, room_idx)
+            if next_key not in room_vars:
+                continue
+            
+            # Encourage staying in the same room with a reward
+            stay = self.model.NewBoolVar(f"stay_c{class_idx}d{day}s{slot_idx}r{room_idx}")
+            self.model.Add(stay <= indicator((class_idx, day, slot_idx, room_idx)))
+            self.model.Add(stay <= indicator(next_key))
+            stays.setdefault((class_idx, day, slot_idx), []).append(stay)
+            objective_terms.append(stay)
+        
+        # A class stays in at most one pool between two slots
+        for slot_stays in stays.values():
+            if len(slot_stays) > 1:
+                self.model.Add(cp_model.LinearExpr.Sum(slot_stays) <= 1)
+        
+        # Staying next to a frozen lesson in the same pool counts as well
+        for day, slot_idx, class_idx, _, _, room_idx in self.fixed_assignments:
+            pool_idx = int(self.room_pools.pool_of_room[room_idx])
+            for neighbour_idx in (slot_idx - 1, slot_idx + 1):
+                objective_terms.extend(room_vars.get((class_idx, day, neighbour_idx, pool_idx), []))
         
         # Set the objective to maximize the sum of these terms (minimizing room changes)
         if objective_terms:
-            self.model.Maximize(sum(objective_terms))
+            self.model.Maximize(cp_model.LinearExpr.Sum(objective_terms))
+    
+    def _initialize_time_model(self):
+        """
+        Initialize the phase-one model of a decomposed solve.
+        
+        Lessons are assigned to (day, slot) with a teacher but without a room.
+        The room position of each variable key holds the lesson's room group:
+        the set of rooms compatible with its class and subject. Room usage is
+        bounded by counting constraints over those groups instead.
+        
+        No symmetry breaking is added here: phase one is a pure feasibility
+        search, and ordering constraints slowed it down in benchmarks.
+        """
+        self.model = cp_model.CpModel()
+        self.variables = VariableStore()
+        self.room_pools = None
+        
+        # Lessons with the same set of compatible rooms share a room group
+        lessons = self.compatibility.lessons()
+        room_rows = self.compatibility.room_ok[lessons[:, 0], lessons[:, 1]] if len(lessons) else np.zeros((0, len(self.room_ids)), dtype=bool)
+        self.room_groups, group_of_lesson = np.unique(room_rows, axis=0, return_inverse=True)
+        group_of_lesson = np.asarray(group_of_lesson).reshape(-1)
+        self.lesson_group = {
+            (class_idx, subject_idx): group_idx
+            for (class_idx, subject_idx), group_idx in zip(lessons.tolist(), group_of_lesson.tolist())
+        }
+        
+        for (class_idx, subject_idx), group_idx in self.lesson_group.items():
+            teacher_idxs, room_idxs = self.compatibility.candidates(class_idx, subject_idx)
+            if not len(room_idxs) or self._remaining_hours(class_idx, subject_idx) <= 0:
+                continue
+            class_id = self.class_ids[class_idx]
+            subject_id = self.subject_ids[subject_idx]
+            
+            # free[day, slot, teacher]: class and teacher free, some room of the group free
+            free = (
+                ~self.class_blocked[class_idx][:, :, None]
+                & ~self.teacher_blocked[teacher_idxs].transpose(1, 2, 0)
+                & (~self.room_blocked[room_idxs]).any(axis=0)[:, :, None]
+            )
+            for day, slot_idx, teacher_pos in np.argwhere(free).tolist():
+                teacher_idx = int(teacher_idxs[teacher_pos])
+                key = (day, slot_idx, class_idx, subject_idx, teacher_idx, group_idx)
+                var_name = f"d{day}s{slot_idx}c{class_id}subj{subject_id}t{self.teacher_ids[teacher_idx]}g{group_idx}"
+                self.variables.add(key, self.model.NewBoolVar(var_name))
+        
+        self._add_basic_constraints()
+        self._add_teacher_constraints()
+        self._add_class_constraints()
+        self._add_subject_constraints()
+        
+        # Counting constraints over each room group and each union of two
+        # groups: the lessons that can only use a set of rooms may not
+        # outnumber those rooms (Hall's condition for the phase-two matching)
+        room_sets = {tuple(np.flatnonzero(group).tolist()) for group in self.room_groups}
+        for first in range(len(self.room_groups)):
+            for second in range(first + 1, len(self.room_groups)):
+                union = self.room_groups[first] | self.room_groups[second]
+                room_sets.add(tuple(np.flatnonzero(union).tolist()))
+        self.room_set_count = 0
+        for room_set in room_sets:
+            self._add_room_set_constraint(set(room_set))
+    
+    def _add_room_set_constraint(self, room_set: Set[int]):
+        """Limit lessons confined to a set of rooms to its free rooms, in every slot"""
+        mask = np.zeros(len(self.room_ids), dtype=bool)
+        mask[list(room_set)] = True
+        
+        # Room groups that are subsets of the room set
+        inside = np.flatnonzero(~(self.room_groups & ~mask).any(axis=1)).tolist()
+        if not inside:
+            return
+        self.room_set_count += 1
+        free_rooms = (~self.room_blocked[mask]).sum(axis=0)
+        for day in self.days:
+            for slot_idx in range(self.num_slots):
+                slot_vars = []
+                for group_idx in inside:
+                    slot_vars.extend(self.variables.by_day_slot_room.get((day, slot_idx, group_idx), []))
+                if len(slot_vars) > free_rooms[day, slot_idx]:
+                    self.model.Add(cp_model.LinearExpr.Sum(slot_vars) <= int(free_rooms[day, slot_idx]))
+    
+    def _assign_rooms(self, time_assignments: List[VariableKey]) -> Tuple[Optional[List[VariableKey]], Set[int]]:
+        """
+        Phase two of a decomposed solve: give every timed lesson a concrete room.
+        
+        Each (day, slot) is an independent bipartite matching. Returns the
+        completed assignments, or None and a room set whose lessons cannot all
+        be seated.
+        """
+        by_slot = {}
+        for key in time_assignments:
+            by_slot.setdefault((key[0], key[1]), []).append(key)
+        
+        assignments = []
+        previous_room = {}
+        for day, slot_idx in sorted(by_slot):
+            keys = by_slot[(day, slot_idx)]
+            open_rooms = self.room_groups & ~self.room_blocked[:, day, slot_idx]
+            candidates = [np.flatnonzero(open_rooms[key[5]]).tolist() for key in keys]
+            preferred = [previous_room.get((day, slot_idx - 1, key[2])) for key in keys]
+            rooms, violated = match_rooms(candidates, preferred)
+            if rooms is None:
+                return None, violated
+            for key, room_idx in zip(keys, rooms):
+                assignments.append(key[:5] + (room_idx,))
+                previous_room[(day, slot_idx, key[2])] = room_idx
+        return assignments, set()
+    
+    def _entry_assignment(self, entry: TimetableEntry) -> Optional[VariableKey]:
+        """
+        Map a timetable entry onto (day, slot, class, subject, teacher, room)
+        indices. Returns None if the entry refers to unknown entities or times.
+        """
+        try:
+            slot_idx = self.slot_index[entry.slot.start_time]
+            class_idx = self.class_index[entry.class_id]
+            subject_idx = self.subject_index[entry.subject_id]
+            teacher_idx = self.teacher_index[entry.teacher_id]
+            room_idx = self.room_index[entry.room_id]
+        except KeyError:
+            return None
+        if entry.day not in self.days:
+            return None
+        return (entry.day, slot_idx, class_idx, subject_idx, teacher_idx, room_idx)
+    
+    def _entry_key(self, entry: TimetableEntry) -> Optional[VariableKey]:
+        """
+        Map a timetable entry onto the key of the matching model variable.
+        
+        The room position is translated into the model's room dimension: the
+        room pool in monolithic mode, the room group in phase one of a
+        decomposed solve. Returns None if the entry refers to unknown entities.
+        """
+        assignment = self._entry_assignment(entry)
+        if assignment is None:
+            return None
+        day, slot_idx, class_idx, subject_idx, teacher_idx, room_idx = assignment
+        
+        if self.room_pools is not None:
+            room_position = int(self.room_pools.pool_of_room[room_idx])
+        else:
+            room_position = self.lesson_group.get((class_idx, subject_idx))
+        return (day, slot_idx, class_idx, subject_idx, teacher_idx, room_position)
+    
+    def _add_solution_hints(self, base_timetable: GeneratedTimetable) -> Dict[str, float]:
+        """
+        Hint the solver with the assignments of an existing timetable.
+        
+        Every decision variable gets a hint: 1 if the base timetable contains
+        the matching entry, 0 otherwise.
+        """
+        entries = [
+            entry
+            for class_tt in base_timetable.class_timetables.values()
+            for entry in class_tt.entries
+        ]
+        hinted = {self._entry_key(entry) for entry in entries}
+        hinted.discard(None)
+        hinted &= set(self.variables.variables)
+        
+        self.model.ClearHints()
+        for key, var in self.variables.items():
+            self.model.AddHint(var, 1 if key in hinted else 0)
+        
+        return {
+            "hint_entries": float(len(entries)),
+            "hint_coverage": len(hinted) / len(entries) if entries else 0.0,
+        }
+    
+    def _selected_keys(self) -> List[VariableKey]:
+        """Keys of all variables set to 1 in the current solution"""
+        return [key for key, var in self.variables.items() if self.solver.Value(var) == 1]
+    
+    def _room_stickiness(self, assignments: List[VariableKey]) -> int:
+        """Count consecutive lessons of a class held in the same room"""
+        rooms = {(key[2], key[0], key[1]): key[5] for key in assignments}
+        return sum(
+            1 for (class_idx, day, slot_idx), room_idx in rooms.items()
+            if rooms.get((class_idx, day, slot_idx + 1)) == room_idx
+        )
     
     def solve(
         self,
@@ -249,7 +669,13 @@ class TimetableOptimizer:
         subjects: List[Subject],
         classes: List[Class],
         constraints: TimetableConstraints,
-        time_limit_seconds: int = 60
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC,
+        room_pooling: bool = True,
+        symmetry_breaking: bool = True,
+        solver_parameters: Optional[SolverParameters] = None,
+        base_timetable: Optional[GeneratedTimetable] = None,
+        repair_hint: bool = False
     ) -> GeneratedTimetable:
         """
         Solve the timetable optimization problem
@@ -261,103 +687,672 @@ class TimetableOptimizer:
             classes: List of classes
             constraints: Timetable constraints
             time_limit_seconds: Time limit for solving
+            mode: Solve the full model at once, or decompose it into time
+                assignment followed by room assignment, or build a greedy
+                preview without a model (LNS mode is run by LNSOptimizer)
+            room_pooling: Schedule interchangeable rooms as one pool and
+                assign concrete rooms afterwards (monolithic mode)
+            symmetry_breaking: Detect interchangeable classes, teachers and
+                rooms and order them lexicographically (monolithic mode)
+            solver_parameters: CP-SAT search parameters (workers, seed, ...)
+            base_timetable: Previous timetable whose assignments are used as
+                solution hints to warm-start the search
+            repair_hint: Let the solver repair a hint that is no longer
+                feasible instead of abandoning it
             
         Returns:
             GeneratedTimetable object with the solution
         """
-        start_time = time.time()
+        self.solver_parameters = solver_parameters or SolverParameters()
+        self.repair_hint = repair_hint and base_timetable is not None
         
-        # Initialize the model with constraints
-        self._initialize_model(teachers, rooms, subjects, classes, constraints)
+        if SolveMode(mode) == SolveMode.LNS:
+            raise ValueError("Large neighbourhood search is run by LNSOptimizer")
+        if SolveMode(mode) == SolveMode.DECOMPOSED:
+            return self._solve_decomposed(
+                teachers, rooms, subjects, classes, constraints, time_limit_seconds,
+                base_timetable=base_timetable
+            )
+        if SolveMode(mode) == SolveMode.PREVIEW:
+            return self._solve_preview(teachers, rooms, subjects, classes, constraints, time_limit_seconds)
+        
+        start_time = self._start_clock(time_limit_seconds)
+        
+        # Initialize the model with constraints, unless the request fails
+        # the pre-solve screen
+        self._setup_entities(teachers, rooms, subjects, classes, constraints)
+        infeasible = self._check_feasibility(teachers, rooms, subjects, classes, constraints, start_time)
+        if infeasible is not None:
+            return infeasible
+        stats = self._build_or_load_model(
+            teachers, rooms, subjects, classes, constraints, room_pooling, symmetry_breaking
+        )
+        if base_timetable is not None:
+            stats.update(self._add_solution_hints(base_timetable))
+        build_time = time.time() - start_time
         
         # Create the solver and solve
-        self.solver = cp_model.CpSolver()
-        self.solver.parameters.max_time_in_seconds = time_limit_seconds
-        status = self.solver.Solve(self.model)
+        self.solver = self._create_solver(self._solver_time_limit(time_limit_seconds))
+        timer = _SolutionTimer(self._publish_callback_solution if self.on_solution else None)
+        status = solve_with_control(self.solver, self.model, timer, self.control)
         
         end_time = time.time()
         solve_time = end_time - start_time
+        stats.update({"build_time": build_time, **self._solver_stats(status, timer)})
         
         # Process the solution
         if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-            return self._process_solution(solve_time)
+            stats["objective_value"] = self.solver.ObjectiveValue()
+            return self._process_solution(solve_time, self._selected_keys(), stats)
+        else:
+            return self._no_solution(solve_time, stats, self._explain_infeasibility(status, stats))
+    
+    def _solve_decomposed(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        time_limit_seconds: int,
+        base_timetable: Optional[GeneratedTimetable] = None,
+        max_iterations: int = 20
+    ) -> GeneratedTimetable:
+        """
+        Two-phase solve: assign lessons to time slots, then rooms to lessons.
+        
+        When a slot's lessons cannot all be seated, the violated room set is
+        added to phase one as another counting constraint and phase one is
+        solved again, starting from the previous time assignment.
+        """
+        start_time = self._start_clock(time_limit_seconds)
+        
+        self._setup_entities(teachers, rooms, subjects, classes, constraints)
+        infeasible = self._check_feasibility(teachers, rooms, subjects, classes, constraints, start_time)
+        if infeasible is not None:
+            return infeasible
+        self._initialize_time_model()
+        stats = {}
+        if base_timetable is not None:
+            stats.update(self._add_solution_hints(base_timetable))
+        build_time = time.time() - start_time
+        
+        stats.update({"build_time": build_time, "room_groups": float(len(self.room_groups))})
+        phase_one_time = 0.0
+        phase_two_time = 0.0
+        
+        for iteration in range(1, max_iterations + 1):
+            # Phase one: time assignment
+            phase_start = time.time()
+            self.solver = self._create_solver(self._solver_time_limit(max(self._time_left(), 0.01)))
+            timer = _SolutionTimer()
+            status = solve_with_control(self.solver, self.model, timer, self.control)
+            phase_one_time += time.time() - phase_start
+            stats.update(self._solver_stats(status, timer))
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                # Phase one is a relaxation: explain with the full model
+                stats.update({"phase_one_time": phase_one_time, "phase_two_time": phase_two_time})
+                return self._no_solution(
+                    time.time() - start_time, stats, self._explain_infeasibility(status, stats)
+                )
+            time_assignments = self._selected_keys()
+            
+            # Phase two: room assignment
+            phase_start = time.time()
+            assignments, violated = self._assign_rooms(time_assignments)
+            phase_two_time += time.time() - phase_start
+            
+            stats.update({
+                "decomposition_iterations": float(iteration),
+                "phase_one_time": phase_one_time,
+                "phase_two_time": phase_two_time,
+                "room_set_constraints": float(self.room_set_count)
+            })
+            if assignments is not None:
+                stats["objective_value"] = float(self._room_stickiness(assignments))
+                timetable = self._process_solution(time.time() - start_time, assignments, stats)
+                # Phase one has no objective, so there is no bound to report
+                self._publish(timetable, stats["objective_value"], None, 1)
+                return timetable
+            if self._time_left() <= 0:
+                break
+            
+            # Cut off this time assignment and warm-start from it
+            self._add_room_set_constraint(violated)
+            self.model.ClearHints()
+            for key, var in self.variables.items():
+                self.model.AddHint(var, self.solver.Value(var))
+        
+        stats.update({"phase_one_time": phase_one_time, "phase_two_time": phase_two_time})
+        return self._no_solution(time.time() - start_time, stats)
+    
+    def _solve_preview(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        time_limit_seconds: int
+    ) -> GeneratedTimetable:
+        """
+        Build a draft timetable with the greedy scheduler, without a model.
+        
+        The draft respects every hard constraint; lesson hours it could not
+        place are reported as conflicts while the placed ones are kept, so a
+        client can show the draft until a full solve finishes.
+        """
+        start_time = self._start_clock(time_limit_seconds)
+        self._setup_entities(teachers, rooms, subjects, classes, constraints)
+        self.variables = VariableStore()
+        self.room_pools = None
+        
+        lesson_hours = np.zeros((len(self.class_ids), len(self.subject_ids)), dtype=np.int64)
+        for class_idx, subject_idx in self.compatibility.lessons().tolist():
+            lesson_hours[class_idx, subject_idx] = self._remaining_hours(class_idx, subject_idx)
+        scheduler = GreedyScheduler(
+            self.compatibility,
+            [self.teachers[teacher_id] for teacher_id in self.teacher_ids],
+            constraints.max_hours_per_day,
+            lesson_hours,
+            self.class_blocked,
+            self.teacher_blocked,
+            self.room_blocked,
+            self.fixed_class_hours,
+            self.fixed_teacher_hours
+        )
+        assignments = scheduler.schedule()
+        
+        stats = scheduler.stats()
+        stats["objective_value"] = float(self._room_stickiness(assignments))
+        timetable = self._process_solution(time.time() - start_time, assignments, stats)
+        timetable.conflicts = [
+            self._describe_unplaced(class_idx, subject_idx, hours)
+            for (class_idx, subject_idx), hours in sorted(scheduler.unplaced.items())
+        ]
+        timetable.stats["conflicts"] = len(timetable.conflicts)
+        self._publish(timetable, stats["objective_value"], None, 1)
+        return timetable
+    
+    def _describe_unplaced(self, class_idx: int, subject_idx: int, hours: int) -> str:
+        """Describe lesson hours the greedy scheduler left unplaced"""
+        class_id, subject_id = self.class_ids[class_idx], self.subject_ids[subject_idx]
+        teacher_idxs, room_idxs = self.compatibility.candidates(class_idx, subject_idx)
+        if not len(teacher_idxs):
+            reason = "no qualified teacher"
+        elif not len(room_idxs):
+            reason = "no suitable room"
+        else:
+            reason = "no free slot"
+        return (
+            f"{self.classes[class_id].name} ({class_id}): {hours} of "
+            f"{self._remaining_hours(class_idx, subject_idx)} hours of "
+            f"{self.subjects[subject_id].name} ({subject_id}) left unplaced, {reason}"
+        )
+    
+    def resolve(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        base_timetable: GeneratedTimetable,
+        changes: List[TimetableChange],
+        time_limit_seconds: float = 10,
+        solver_parameters: Optional[SolverParameters] = None
+    ) -> GeneratedTimetable:
+        """
+        Repair a timetable after availability changes, moving as few entries as possible
+        
+        Entries that clash with a change are released together with a
+        neighbourhood around them, and every other entry is frozen in place.
+        The neighbourhood starts at the days of the affected classes, and
+        widens to their whole week and then to the whole timetable while the
+        released entries cannot be placed again. Among the repairs of a
+        neighbourhood the one keeping most released entries unchanged wins.
+        
+        Args:
+            teachers: List of teachers
+            rooms: List of rooms
+            subjects: List of subjects
+            classes: List of classes
+            constraints: Timetable constraints
+            base_timetable: Timetable to repair
+            changes: Teacher and room unavailability to apply
+            time_limit_seconds: Time limit for all neighbourhoods together
+            solver_parameters: CP-SAT search parameters (workers, seed, ...)
+            
+        Returns:
+            GeneratedTimetable object with the repaired timetable
+        """
+        start_time = self._start_clock(time_limit_seconds)
+        self.solver_parameters = solver_parameters or SolverParameters()
+        self.repair_hint = False
+        
+        self._setup_entities(teachers, rooms, subjects, classes, constraints)
+        teacher_closed, room_closed = self._closed_slots(changes)
+        base_assignments = [
+            assignment
+            for class_tt in base_timetable.class_timetables.values()
+            for assignment in map(self._entry_assignment, class_tt.entries)
+            if assignment is not None
+        ]
+        affected = [
+            key for key in base_assignments
+            if teacher_closed[key[4], key[0], key[1]] or room_closed[key[5], key[0], key[1]]
+        ]
+        affected_classes = {key[2] for key in affected}
+        affected_class_days = {(key[2], key[0]) for key in affected}
+        neighbourhoods = [
+            ("class_days", lambda key: (key[2], key[0]) in affected_class_days),
+            ("classes", lambda key: key[2] in affected_classes),
+            ("all", lambda key: True),
+        ]
+        
+        stats = {"affected_entries": float(len(affected))}
+        for level, (name, released_by) in enumerate(neighbourhoods):
+            released = [key for key in base_assignments if released_by(key)]
+            frozen = [key for key in base_assignments if not released_by(key)]
+            
+            # Freeze everything outside the neighbourhood and close the slots
+            # named by the changes
+            self._reset_fixed()
+            self.teacher_blocked |= teacher_closed
+            self.room_blocked |= room_closed
+            self._fix_assignments(frozen)
+            self._build_model(symmetry_breaking=False, room_objective=False)
+            self._set_minimal_change_objective(released)
+            
+            # Later neighbourhoods get a larger share of the remaining time
+            remaining = max(self._time_left(), 0.01)
+            self.solver = self._create_solver(remaining / (len(neighbourhoods) - level))
+            timer = _SolutionTimer()
+            status = solve_with_control(self.solver, self.model, timer, self.control)
+            stats.update(self._solver_stats(status, timer))
+            stats.update({
+                "neighbourhood": name,
+                "released_entries": float(len(released)),
+                "frozen_entries": float(len(frozen)),
+            })
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                stats["objective_value"] = self.solver.ObjectiveValue()
+                timetable = self._process_solution(time.time() - start_time, self._selected_keys(), stats)
+                repaired = {
+                    self._entry_assignment(entry)
+                    for class_tt in timetable.class_timetables.values()
+                    for entry in class_tt.entries
+                }
+                timetable.stats["changed_entries"] = float(len(set(base_assignments) - repaired))
+                return timetable
+        
+        return self._no_solution(time.time() - start_time, stats)
+    
+    def _closed_slots(self, changes: List[TimetableChange]) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn availability changes into blocked (day, slot) masks for teachers and rooms"""
+        teacher_closed = np.zeros_like(self.teacher_blocked)
+        room_closed = np.zeros_like(self.room_blocked)
+        for change in changes:
+            if change.type == ChangeType.TEACHER_UNAVAILABLE:
+                if change.teacher_id not in self.teacher_index:
+                    raise ValueError(f"Teacher with ID {change.teacher_id} not found")
+                closed = teacher_closed[self.teacher_index[change.teacher_id]]
+            else:
+                if change.room_id not in self.room_index:
+                    raise ValueError(f"Room with ID {change.room_id} not found")
+                closed = room_closed[self.room_index[change.room_id]]
+            days = [day for day in change.days if day in self.days] if change.days else self.days
+            slots = [slot for slot in change.slots if 0 <= slot < self.num_slots] if change.slots else range(self.num_slots)
+            closed[np.ix_(list(days), list(slots))] = True
+        return teacher_closed, room_closed
+    
+    def _set_minimal_change_objective(self, released: List[VariableKey]):
+        """Keep as many released assignments unchanged as possible"""
+        kept = []
+        self.model.ClearHints()
+        for key in released:
+            pool_key = key[:5] + (int(self.room_pools.pool_of_room[key[5]]),)
+            var = self.variables.get(pool_key)
+            if var is None:
+                continue
+            kept.append(var)
+            self.model.AddHint(var, 1)
+            self.preferred_rooms[(key[0], key[1], key[2])] = key[5]
+        if kept:
+            self.model.Maximize(cp_model.LinearExpr.Sum(kept))
+    
+    def _start_clock(self, time_limit_seconds: float) -> float:
+        """Start timing a solve and set its deadline; returns the start time"""
+        self.start_time = time.time()
+        self.deadline = self.start_time + time_limit_seconds
+        if self.control is not None and self.control.deadline is None:
+            self.control.set_deadline(self.deadline)
+        return self.start_time
+    
+    def _time_left(self) -> float:
+        """Seconds until the deadline, which a solve control may move or cut short"""
+        if self.control is not None:
+            return self.control.time_left()
+        return max(self.deadline - time.time(), 0.0)
+    
+    def _solver_time_limit(self, time_limit_seconds: float) -> float:
+        """
+        Time limit to give CP-SAT for a solve that may run until the deadline.
+        
+        Under a solve control the deadline can still move, so the solver gets
+        the control's cap and is stopped by the control instead.
+        """
+        if self.control is not None:
+            return max(time_limit_seconds, self.control.time_limit_cap)
+        return time_limit_seconds
+    
+    def _publish(
+        self,
+        timetable: GeneratedTimetable,
+        objective: float,
+        best_bound: Optional[float],
+        solution_count: int
+    ):
+        """Hand a solution to the solution listener, if there is one"""
+        if self.on_solution is None:
+            return
+        gap = abs(objective - best_bound) / max(1.0, abs(objective)) if best_bound is not None else None
+        self.on_solution(SolveProgress(
+            objective=objective,
+            best_bound=best_bound,
+            gap=gap,
+            elapsed=time.time() - self.start_time,
+            solution_count=solution_count,
+            timetable=timetable
+        ))
+    
+    def _publish_callback_solution(self, callback: _SolutionTimer):
+        """Publish the solution the solver just found, from inside its callback"""
+        keys = [key for key, var in self.variables.items() if callback.Value(var) == 1]
+        objective = callback.ObjectiveValue()
+        timetable = self._process_solution(
+            time.time() - self.start_time, keys, {"objective_value": objective}
+        )
+        self._publish(timetable, objective, callback.BestObjectiveBound(), callback.solution_count)
+    
+    def _create_solver(self, time_limit_seconds: float) -> cp_model.CpSolver:
+        """Create a CP-SAT solver configured from the solver parameters"""
+        params = self.solver_parameters
+        solver = cp_model.CpSolver()
+        
+        if params.deterministic:
+            # Deterministic time does not depend on machine load, and
+            # interleaved workers make multi-worker runs reproducible
+            solver.parameters.max_deterministic_time = time_limit_seconds
+            solver.parameters.interleave_search = True
         else:
-            # Return an empty solution with conflict information
-            return GeneratedTimetable(
-                class_timetables={},
-                teacher_timetables={},
-                room_allocations={},
-                conflicts=["No feasible solution found with current constraints"],
-                stats={"solve_time": solve_time}
+            solver.parameters.max_time_in_seconds = time_limit_seconds
+        
+        solver.parameters.num_workers = params.num_workers
+        if params.random_seed is not None:
+            solver.parameters.random_seed = params.random_seed
+        if params.relative_gap_limit is not None:
+            solver.parameters.relative_gap_limit = params.relative_gap_limit
+        if params.linearization_level is not None:
+            solver.parameters.linearization_level = params.linearization_level
+        solver.parameters.search_branching = getattr(
+            type(solver.parameters), f"{params.search_branching.name}_SEARCH"
+        )
+        solver.parameters.log_search_progress = params.log_search_progress
+        solver.parameters.stop_after_first_solution = params.stop_after_first_solution
+        if self.repair_hint:
+            solver.parameters.repair_hint = True
+        return solver
+    
+    def _solver_stats(self, status, timer: _SolutionTimer) -> Dict[str, Any]:
+        """Parameters the solver ran with and its search statistics"""
+        parameters = self.solver.parameters
+        return {
+            "solver_num_workers": float(parameters.num_workers),
+            "solver_random_seed": float(parameters.random_seed),
+            "solver_relative_gap_limit": parameters.relative_gap_limit,
+            "solver_linearization_level": float(parameters.linearization_level),
+            "solver_deterministic": float(self.solver_parameters.deterministic),
+            "solver_search_branching": self.solver_parameters.search_branching.value,
+            "solver_status": self.solver.StatusName(status),
+            "solver_solution_info": self.solver.SolutionInfo(),
+            "solver_wall_time": self.solver.WallTime(),
+            "solver_user_time": self.solver.UserTime(),
+            "solver_deterministic_time": self.solver.ResponseProto().deterministic_time,
+            "solver_branches": float(self.solver.NumBranches()),
+            "solver_conflicts": float(self.solver.NumConflicts()),
+            "solver_best_bound": self.solver.BestObjectiveBound(),
+            "solutions_found": float(timer.solution_count),
+            "first_solution_time": timer.first_solution_time,
+            "solve_cancelled": float(self.control is not None and self.control.cancelled),
+        }
+    
+    def _model_stats(self) -> Dict[str, float]:
+        """Size of the built model and how much of it was pruned"""
+        stats = {
+            "num_variables": float(len(self.variables)),
+            "teacher_unavailable_slots": float(self.teacher_unavailable.sum()),
+            "room_unavailable_slots": float(self.room_unavailable.sum()),
+            **self.compatibility.stats()
+        }
+        if self.room_pools is not None:
+            stats.update(self.room_pools.stats())
+        if self.symmetry is not None:
+            stats.update(self.symmetry.stats())
+        if self.feasibility is not None:
+            stats.update(self.feasibility.stats())
+        return stats
+    
+    def _assign_pool_rooms(self, assignments: List[VariableKey]) -> List[VariableKey]:
+        """
+        Replace the room pool of each assignment with a concrete room.
+        
+        Within a slot every pool hosts at most as many lessons as it has free
+        rooms, so rooms can be handed out directly. A lesson gets its preferred
+        room if it has one, and otherwise keeps the room its class had in the
+        previous slot whenever it stays in the same pool.
+        """
+        by_slot = {}
+        for key in assignments:
+            by_slot.setdefault((key[0], key[1]), []).append(key)
+        
+        result = []
+        previous_room = {(key[0], key[1], key[2]): key[5] for key in self.fixed_assignments}
+        for day, slot_idx in sorted(by_slot):
+            keys = by_slot[(day, slot_idx)]
+            free = {
+                pool_idx: [room_idx for room_idx in members if not self.room_blocked[room_idx, day, slot_idx]]
+                for pool_idx, members in enumerate(self.room_pools.members)
+            }
+            
+            # Lessons with a preferred room, then classes that can keep their
+            # previous room go first
+            chosen = {}
+            
+            def take(key, room_idx):
+                if key not in chosen and room_idx is not None and room_idx in free[key[5]]:
+                    free[key[5]].remove(room_idx)
+                    chosen[key] = room_idx
+            
+            for key in keys:
+                take(key, self.preferred_rooms.get((day, slot_idx, key[2])))
+            for key in keys:
+                take(key, previous_room.get((day, slot_idx - 1, key[2])))
+            for key in keys:
+                if key not in chosen:
+                    chosen[key] = free[key[5]].pop(0)
+            
+            for key in keys:
+                result.append(key[:5] + (chosen[key],))
+                previous_room[(day, slot_idx, key[2])] = chosen[key]
+        return result
+    
+    def _no_solution(
+        self, solve_time: float, stats: Dict[str, Any], core: Optional[List[str]] = None
+    ) -> GeneratedTimetable:
+        """Return an empty solution with conflict information"""
+        return GeneratedTimetable(
+            class_timetables={},
+            teacher_timetables={},
+            room_allocations={},
+            conflicts=["No feasible solution found with current constraints"] + (core or []),
+            stats={"solve_time": solve_time, **stats, **self._model_stats()}
+        )
+    
+    def _explain_infeasibility(self, status, stats: Dict[str, Any]) -> List[str]:
+        """
+        Find a small set of constraint groups that cannot hold together.
+        
+        The monolithic model is rebuilt with an enforcement literal per
+        constraint group and solved under the assumption that every group
+        holds. CP-SAT returns the assumptions it needed to prove
+        infeasibility; groups are then dropped from that core one at a time
+        while the rest stays infeasible, within what is left of the time
+        limit. Only a proven infeasibility is explained.
+        
+        Returns:
+            A description of each group in the core, empty if there is none
+        """
+        if status != cp_model.INFEASIBLE or self._time_left() <= 0:
+            return []
+        explain_start = time.time()
+        self.enforcement = {}
+        try:
+            self._build_model(symmetry_breaking=False, room_objective=False)
+            literals = {literal.Index(): literal for literal in self.enforcement.values()}
+            groups = {literal.Index(): group for group, literal in self.enforcement.items()}
+        finally:
+            self.enforcement = None
+        
+        core = self._unsat_core(literals)
+        stats.update({
+            "infeasibility_core_size": float(len(core)),
+            "infeasibility_explain_time": time.time() - explain_start,
+        })
+        return [self._describe_group(groups[index]) for index in core]
+    
+    def _unsat_core(self, literals: Dict[int, cp_model.IntVar]) -> List[int]:
+        """
+        Shrink a set of assumption literals, given by index, to a core that is
+        still infeasible. Returns the indices of the core literals.
+        """
+        def infeasible(subset: List[int]) -> Optional[List[int]]:
+            # Cores are only extracted by a single search worker
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = max(self._time_left(), 0.01)
+            solver.parameters.num_workers = 1
+            self.model.ClearAssumptions()
+            self.model.AddAssumptions([literals[index] for index in subset])
+            status = solve_with_control(solver, self.model, _SolutionTimer(), self.control)
+            if status != cp_model.INFEASIBLE:
+                return None
+            return list(solver.SufficientAssumptionsForInfeasibility())
+        
+        core = infeasible(list(literals))
+        if not core:
+            return []
+        for literal in list(core):
+            if self._time_left() <= 0:
+                break
+            if literal not in core:
+                continue
+            smaller = infeasible([other for other in core if other != literal])
+            if smaller is not None:
+                core = smaller
+        return core
+    
+    def _describe_group(self, group: Tuple) -> str:
+        """Describe a constraint group for a user"""
+        def named(entities: Dict[str, Any], entity_id: str) -> str:
+            return f"{entities[entity_id].name} ({entity_id})"
+        
+        kind = group[0]
+        if kind in ("class_single", "class_daily", "lesson_hours"):
+            class_name = named(self.classes, self.class_ids[group[1]])
+        if kind in ("teacher_single", "teacher_daily"):
+            teacher_id = self.teacher_ids[group[1]]
+            teacher_name = "Teacher " + named(self.teachers, teacher_id)
+        
+        if kind == "class_single":
+            return f"{class_name} takes one lesson at a time"
+        if kind == "class_daily":
+            return f"{class_name} takes at most {self.constraints.max_hours_per_day} lessons a day"
+        if kind == "lesson_hours":
+            subject_id = self.subject_ids[group[2]]
+            hours = self.subjects[subject_id].hours_per_week
+            return (
+                f"{class_name} takes {named(self.subjects, subject_id)} "
+                f"for {hours} hour{'s' if hours != 1 else ''} a week"
             )
+        if kind == "teacher_single":
+            return f"{teacher_name} teaches one class at a time"
+        if kind == "teacher_daily":
+            return f"{teacher_name} teaches at most {self.teachers[teacher_id].max_hours_per_day} hours a day"
+        room_ids = [self.room_ids[room_idx] for room_idx in self.room_pools.members[group[1]]]
+        if len(room_ids) == 1:
+            return f"Room {room_ids[0]} hosts one class at a time"
+        return f"Rooms {', '.join(room_ids)} host one class each at a time"
     
-    def _process_solution(self, solve_time: float) -> GeneratedTimetable:
+    def _process_solution(
+        self, solve_time: float, assignments: List[VariableKey], stats: Dict[str, Any]
+    ) -> GeneratedTimetable:
         """Process the solution and create a GeneratedTimetable object"""
+        # Variables are indexed by room pool; give each lesson a concrete room
+        if self.room_pools is not None:
+            assignments = self._assign_pool_rooms(assignments)
+        assignments = self.fixed_assignments + assignments
+        
         # Initialize data structures for the result
         class_timetables = {}
         teacher_timetables = {}
         room_allocations = {}
         
-        # Process all variables with value 1
-        for var_name, var in self.variables.items():
-            if self.solver.Value(var) == 1:
-                # Parse the variable name to extract components
-                # Format: d{day}s{slot_idx}c{class_id}subj{subject_id}t{teacher_id}r{room_id}
-                parts = var_name.split('d')[1].split('s')
-                day = int(parts[0])
-                
-                slot_parts = parts[1].split('c')
-                slot_idx = int(slot_parts[0])
-                
-                class_parts = slot_parts[1].split('subj')
-                class_id = class_parts[0]
-                
-                subject_parts = class_parts[1].split('t')
-                subject_id = subject_parts[0]
-                
-                teacher_parts = subject_parts[1].split('r')
-                teacher_id = teacher_parts[0]
-                
-                room_id = teacher_parts[1]
-                
-                # Create a TimetableEntry for this assignment
-                entry = TimetableEntry(
-                    day=day,
-                    slot=self.time_slots[slot_idx],
-                    subject_id=subject_id,
+        # Process every selected (day, slot, class, subject, teacher, room)
+        for day, slot_idx, class_idx, subject_idx, teacher_idx, room_idx in assignments:
+            class_id = self.class_ids[class_idx]
+            subject_id = self.subject_ids[subject_idx]
+            teacher_id = self.teacher_ids[teacher_idx]
+            room_id = self.room_ids[room_idx]
+            
+            # Create a TimetableEntry for this assignment
+            entry = TimetableEntry(
+                day=day,
+                slot=self.time_slots[slot_idx],
+                subject_id=subject_id,
+                teacher_id=teacher_id,
+                room_id=room_id,
+                class_id=class_id
+            )
+            
+            # Add to class timetable
+            if class_id not in class_timetables:
+                class_timetables[class_id] = ClassTimetable(
+                    class_id=class_id,
+                    class_name=self.classes[class_id].name,
+                    entries=[]
+                )
+            class_timetables[class_id].entries.append(entry)
+            
+            # Add to teacher timetable
+            if teacher_id not in teacher_timetables:
+                teacher_timetables[teacher_id] = TeacherTimetable(
                     teacher_id=teacher_id,
-                    room_id=room_id,
-                    class_id=class_id
+                    teacher_name=self.teachers[teacher_id].name,
+                    entries=[]
                 )
-                
-                # Add to class timetable
-                if class_id not in class_timetables:
-                    class_timetables[class_id] = ClassTimetable(
-                        class_id=class_id,
-                        class_name=self.classes[class_id].name,
-                        entries=[]
-                    )
-                class_timetables[class_id].entries.append(entry)
-                
-                # Add to teacher timetable
-                if teacher_id not in teacher_timetables:
-                    teacher_timetables[teacher_id] = TeacherTimetable(
-                        teacher_id=teacher_id,
-                        teacher_name=self.teachers[teacher_id].name,
-                        entries=[]
-                    )
-                teacher_timetables[teacher_id].entries.append(entry)
-                
-                # Add to room allocations
-                if room_id not in room_allocations:
-                    room_allocations[room_id] = []
-                room_allocations[room_id].append(entry)
+            teacher_timetables[teacher_id].entries.append(entry)
+            
+            # Add to room allocations
+            if room_id not in room_allocations:
+                room_allocations[room_id] = []
+            room_allocations[room_id].append(entry)
         
         # Calculate statistics
         stats = {
             "solve_time": solve_time,
-            "objective_value": self.solver.ObjectiveValue(),
-            "conflicts": 0  # We'll count conflicts if any
+            "conflicts": 0,  # We'll count conflicts if any
+            **stats,
+            **self._model_stats()
         }
         
         # Return the completed timetable
@@ -367,4 +1362,4 @@ class TimetableOptimizer:
             room_allocations=room_allocations,
             conflicts=[],
             stats=stats
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,41 @@
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def user_id() -> str:
+    """ID of the user running the server, to keep directories of different users apart"""
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    return hashlib.sha256(os.path.expanduser("~").encode()).hexdigest()[:16]
+
+
+def default_directory(name: str) -> str:
+    """Per-user directory under the system temp directory"""
+    return os.path.join(tempfile.gettempdir(), f"{name}-{user_id()}")
+
+
+def private_directory(directory: str, create: bool) -> bool:
+    """
+    Whether a directory exists, or was created, and belongs to this user
+    alone. It is created with mode 0700, and access for other users is
+    removed. A directory owned by another user must not be used, since that
+    user can read and plant files in it.
+    """
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    try:
+        info = os.lstat(directory)
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        logger.warning(f"Not using directory {directory}: it is not a directory of this user")
+        return False
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(directory, 0o700)
+    return True
@@ -0,0 +1,61 @@
+from typing import List, Optional, Sequence, Set, Tuple
+
+
+def match_rooms(
+    candidates: Sequence[Sequence[int]],
+    preferred: Sequence[Optional[int]]
+) -> Tuple[Optional[List[int]], Set[int]]:
+    """
+    Assign a distinct room to every lesson taught in one time slot.
+
+    This is a bipartite matching between lessons and rooms, solved with
+    augmenting paths. Each lesson tries its preferred room first (e.g. the room
+    its class used in the previous slot) so classes tend to stay put.
+
+    Args:
+        candidates: Compatible room indices for each lesson
+        preferred: Preferred room index for each lesson, or None
+
+    Returns:
+        Tuple of (room index per lesson, empty set) when every lesson gets a
+        room, or (None, rooms) where rooms is a set of rooms too small for the
+        lessons that can only use them (a Hall's condition violation).
+    """
+    room_owner = {}
+    ordered = []
+    for lesson_rooms, preferred_room in zip(candidates, preferred):
+        lesson_rooms = list(lesson_rooms)
+        if preferred_room is not None and preferred_room in lesson_rooms:
+            lesson_rooms.remove(preferred_room)
+            lesson_rooms.insert(0, preferred_room)
+        ordered.append(lesson_rooms)
+
+    def augment(lesson: int, visited: Set[int]) -> bool:
+        for room in ordered[lesson]:
+            if room in visited:
+                continue
+            visited.add(room)
+            if room not in room_owner or augment(room_owner[room], visited):
+                room_owner[room] = lesson
+                return True
+        return False
+
+    # Give every lesson its preferred room up front when it is free
+    for lesson, lesson_rooms in enumerate(ordered):
+        if lesson_rooms and preferred[lesson] == lesson_rooms[0] and lesson_rooms[0] not in room_owner:
+            room_owner[lesson_rooms[0]] = lesson
+
+    assigned = set(room_owner.values())
+    for lesson in range(len(ordered)):
+        if lesson in assigned:
+            continue
+        visited: Set[int] = set()
+        if not augment(lesson, visited):
+            # The lesson and the owners of every visited room all compete for
+            # the visited rooms, and there are more of them than rooms
+            return None, visited
+
+    assignment = [0] * len(ordered)
+    for room, lesson in room_owner.items():
+        assignment[lesson] = room
+    return assignment, set()
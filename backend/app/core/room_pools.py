@@ -0,0 +1,75 @@
+import numpy as np
+from typing import Dict, List
+
+from .compatibility import CompatibilityMatrix
+
+
+class RoomPools:
+    """
+    Groups of interchangeable rooms.
+
+    Two rooms are interchangeable when they can seat exactly the same
+    (class, subject) lessons, i.e. their capacity and features put them in the
+    same class for every lesson. The optimizer schedules lessons against a
+    pool and its room count, and concrete rooms are handed out afterwards.
+    With pooling disabled every room is a pool of its own.
+    """
+
+    def __init__(self, compatibility: CompatibilityMatrix, pooling: bool = True):
+        num_rooms = len(compatibility.room_ids)
+        # One row per room: which (class, subject) lessons it can seat
+        profiles = compatibility.room_ok.reshape(-1, num_rooms).T
+
+        if pooling and num_rooms:
+            _, first_room, pool_of_room = np.unique(
+                profiles, axis=0, return_index=True, return_inverse=True
+            )
+            pool_of_room = np.asarray(pool_of_room).reshape(-1)
+            # Number pools in order of their first room to keep output stable
+            order = np.argsort(first_room)
+            renumber = np.empty_like(order)
+            renumber[order] = np.arange(len(order))
+            self.pool_of_room = renumber[pool_of_room]
+        else:
+            self.pool_of_room = np.arange(num_rooms)
+
+        num_pools = int(self.pool_of_room.max()) + 1 if num_rooms else 0
+        self.members: List[List[int]] = [[] for _ in range(num_pools)]
+        for room_idx, pool_idx in enumerate(self.pool_of_room.tolist()):
+            self.members[pool_idx].append(room_idx)
+
+        # pool_ok[c, s, p]: the rooms of pool p can seat class c for subject s
+        representatives = [members[0] for members in self.members]
+        self.pool_ok = compatibility.room_ok[:, :, representatives]
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def size(self, pool_idx: int) -> int:
+        """Number of rooms in a pool"""
+        return len(self.members[pool_idx])
+
+    def free_rooms(self, room_blocked: np.ndarray) -> np.ndarray:
+        """
+        Count the rooms of each pool that are free in every (day, slot).
+
+        Args:
+            room_blocked: (rooms, days, slots) mask of blocked room slots
+
+        Returns:
+            (pools, days, slots) array of free room counts
+        """
+        free = np.zeros((len(self),) + room_blocked.shape[1:], dtype=np.int64)
+        np.add.at(free, self.pool_of_room, (~room_blocked).astype(np.int64))
+        return free
+
+    def candidates(self, class_idx: int, subject_idx: int) -> np.ndarray:
+        """Pools whose rooms can seat the class for the subject"""
+        return np.flatnonzero(self.pool_ok[class_idx, subject_idx])
+
+    def stats(self) -> Dict[str, float]:
+        num_rooms = len(self.pool_of_room)
+        return {
+            "room_pools": float(len(self)),
+            "rooms_per_pool": num_rooms / len(self) if len(self) else 0.0,
+        }
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Optional
+
+from ortools.sat.python import cp_model
+
+
+class SolveControl:
+    """
+    Lets a caller cancel a running solve or move its deadline.
+
+    The optimizer hands its solver a time limit of time_limit_cap seconds and
+    enforces the (movable) deadline itself, so a deadline can be extended up
+    to the cap or shrunk at any time. A cancelled or expired solve stops
+    searching and returns the best solution found so far.
+    """
+
+    def __init__(self, deadline: Optional[float] = None, time_limit_cap: float = 3600):
+        """
+        Args:
+            deadline: Time (as time.time()) at which the solve must stop; set
+                from the solve's time limit when left empty
+            time_limit_cap: Longest a solve may run however far its deadline
+                is moved
+        """
+        self.deadline = deadline
+        self.cancelled = False
+        self.time_limit_cap = time_limit_cap
+
+    def poll(self):
+        """Refresh the cancellation flag and deadline from wherever they are kept"""
+
+    def cancel(self):
+        self.cancelled = True
+
+    def set_deadline(self, deadline: float):
+        self.deadline = deadline
+
+    def should_stop(self) -> bool:
+        self.poll()
+        return self.cancelled or (self.deadline is not None and time.time() >= self.deadline)
+
+    def time_left(self) -> float:
+        """Seconds until the deadline, zero once cancelled or expired"""
+        if self.should_stop():
+            return 0.0
+        if self.deadline is None:
+            return self.time_limit_cap
+        return self.deadline - time.time()
+
+
+def solve_with_control(
+    solver: cp_model.CpSolver,
+    model: cp_model.CpModel,
+    callback: cp_model.CpSolverSolutionCallback,
+    control: Optional[SolveControl],
+    poll_interval: float = 0.05
+):
+    """
+    Run solver.Solve, stopping the search as soon as the control asks for it.
+
+    A watcher thread polls the control and calls StopSearch, which CP-SAT
+    honours asynchronously; the solver then returns its best solution.
+
+    Returns:
+        The solver status
+    """
+    if control is None:
+        return solver.Solve(model, callback)
+
+    done = threading.Event()
+
+    def watch():
+        while not done.wait(poll_interval):
+            if control.should_stop():
+                solver.StopSearch()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        return solver.Solve(model, callback)
+    finally:
+        done.set()
+        watcher.join()
@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+from ortools.sat.python import cp_model
+
+from .compatibility import CompatibilityMatrix
+from ..schemas.timetable import Teacher
+
+
+def _group(signatures: Sequence[bytes]) -> List[List[int]]:
+    """Group indices with identical signatures, keeping groups of two or more"""
+    groups: Dict[bytes, List[int]] = {}
+    for idx, signature in enumerate(signatures):
+        groups.setdefault(signature, []).append(idx)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+class SymmetryDetector:
+    """
+    Finds interchangeable classes, teachers and rooms.
+
+    Entities are interchangeable when swapping them maps every variable and
+    constraint of the model onto another one:
+    - classes that take the same subjects and fit the same rooms
+    - teachers that may teach the same subjects under the same daily cap
+    - rooms that can seat the same (class, subject) lessons
+
+    Optional per-entity state arrays (blocked slots, frozen hours, ...) are
+    part of the signature, so entities only match when their state does too.
+    """
+
+    def __init__(
+        self,
+        compatibility: CompatibilityMatrix,
+        teachers: List[Teacher],
+        class_state: Optional[np.ndarray] = None,
+        teacher_state: Optional[np.ndarray] = None,
+        room_state: Optional[np.ndarray] = None
+    ):
+        def state(array: Optional[np.ndarray], idx: int) -> bytes:
+            return np.ascontiguousarray(array[idx]).tobytes() if array is not None else b""
+
+        # Classes without subjects have no variables, so there is nothing to order
+        self.class_groups = [
+            group for group in _group([
+                compatibility.class_subject[class_idx].tobytes() + compatibility.room_ok[class_idx].tobytes()
+                + state(class_state, class_idx)
+                for class_idx in range(len(compatibility.class_ids))
+            ])
+            if compatibility.class_subject[group[0]].any()
+        ]
+        self.teacher_groups = _group([
+            compatibility.teacher_ok[:, teacher_idx].tobytes() + str(teacher.max_hours_per_day).encode()
+            + state(teacher_state, teacher_idx)
+            for teacher_idx, teacher in enumerate(teachers)
+        ])
+        self.room_groups = _group([
+            np.ascontiguousarray(compatibility.room_ok[:, :, room_idx]).tobytes()
+            + state(room_state, room_idx)
+            for room_idx in range(len(compatibility.room_ids))
+        ])
+        self.constraint_count = 0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "symmetry_class_groups": float(len(self.class_groups)),
+            "symmetry_teacher_groups": float(len(self.teacher_groups)),
+            "symmetry_room_groups": float(len(self.room_groups)),
+            "symmetry_breaking_constraints": float(self.constraint_count),
+        }
+
+
+def add_lex_greater_equal(
+    model: cp_model.CpModel,
+    first: Sequence[cp_model.LinearExpr],
+    second: Sequence[cp_model.LinearExpr]
+):
+    """
+    Require first >= second lexicographically, for vectors of 0/1 expressions.
+
+    equal[k] is forced true while the first k elements of both vectors are
+    equal, and while it is true element k of first may not be smaller than
+    element k of second.
+    """
+    equal = 1
+    for a, b in zip(first, second):
+        # equal => a >= b
+        model.Add(a - b >= equal - 1)
+        next_equal = model.NewBoolVar("")
+        # equal and a == b => next_equal
+        model.Add(next_equal >= equal - a + b)
+        equal = next_equal
@@ -0,0 +1,188 @@
+import numpy as np
+from typing import List, Optional, Tuple
+
+from .availability import create_time_slots, outside_cells, unavailable_cells
+from .compatibility import CompatibilityMatrix
+from ..schemas.timetable import (
+    Teacher, Room, Subject, Class, TimetableConstraints, GeneratedTimetable, TimetableEntry,
+    TimetableChange, ChangeType, TimetableViolation, ViolationType
+)
+
+
+class TimetableValidator:
+    """
+    Checks a timetable against every hard constraint of its inputs.
+
+    Entries are turned into integer (day, slot, class, subject, teacher,
+    room) columns once. Double bookings, weekly subject hours and teacher
+    daily hours are counted with bincount over the flattened occupancy
+    tensors. Qualification, room, capacity and availability checks gather
+    the compatibility and availability masks at every entry in one go, so
+    Python only loops over the violations found.
+    """
+
+    def __init__(
+        self,
+        teachers: List[Teacher],
+        rooms: List[Room],
+        subjects: List[Subject],
+        classes: List[Class],
+        constraints: TimetableConstraints,
+        changes: Optional[List[TimetableChange]] = None
+    ):
+        """
+        Args:
+            teachers, rooms, subjects, classes, constraints: The inputs the
+                timetable was generated from
+            changes: Availability changes applied to the timetable since
+        """
+        self.compatibility = CompatibilityMatrix(teachers, rooms, subjects, classes)
+        self.class_ids = self.compatibility.class_ids
+        self.subject_ids = self.compatibility.subject_ids
+        self.teacher_ids = self.compatibility.teacher_ids
+        self.room_ids = self.compatibility.room_ids
+        self.class_index = {class_id: idx for idx, class_id in enumerate(self.class_ids)}
+        self.subject_index = {subject_id: idx for idx, subject_id in enumerate(self.subject_ids)}
+        self.teacher_index = {teacher_id: idx for idx, teacher_id in enumerate(self.teacher_ids)}
+        self.room_index = {room_id: idx for idx, room_id in enumerate(self.room_ids)}
+
+        self.time_slots = create_time_slots(constraints)
+        self.slot_index = {slot.start_time: idx for idx, slot in enumerate(self.time_slots)}
+        self.num_days = constraints.days_per_week
+        self.num_slots = len(self.time_slots)
+
+        # Weekly hours each class needs of each subject
+        hours_per_week = np.array([subject.hours_per_week for subject in subjects], dtype=np.int64)
+        self.required_hours = self.compatibility.class_subject * hours_per_week[None, :]
+        self.teacher_caps = np.array([teacher.max_hours_per_day for teacher in teachers], dtype=np.int64)
+        self.capacities = np.array([room.capacity for room in rooms], dtype=np.int64)
+        self.students = np.array([class_.students_count for class_ in classes], dtype=np.int64)
+
+        # [entity, day, slot] cells teachers and rooms cannot be used in
+        self.teacher_unavailable = np.array([
+            unavailable_cells(teacher.unavailable_slots, self.time_slots, self.num_days) for teacher in teachers
+        ], dtype=bool).reshape(len(teachers), self.num_days, self.num_slots)
+        self.room_unavailable = np.array([
+            outside_cells(room.available_slots, self.time_slots, self.num_days) for room in rooms
+        ], dtype=bool).reshape(len(rooms), self.num_days, self.num_slots)
+        for change in changes or []:
+            if change.type == ChangeType.TEACHER_UNAVAILABLE:
+                if change.teacher_id not in self.teacher_index:
+                    continue
+                closed = self.teacher_unavailable[self.teacher_index[change.teacher_id]]
+            else:
+                if change.room_id not in self.room_index:
+                    continue
+                closed = self.room_unavailable[self.room_index[change.room_id]]
+            days = [day for day in change.days if 0 <= day < self.num_days] if change.days else range(self.num_days)
+            slots = [slot for slot in change.slots if 0 <= slot < self.num_slots] if change.slots else range(self.num_slots)
+            closed[np.ix_(list(days), list(slots))] = True
+
+    def _cell(self, day: int, slot_idx: int) -> str:
+        return f"day {day} at {self.time_slots[slot_idx].start_time.strftime('%H:%M')}"
+
+    def _columns(
+        self, entries: List[TimetableEntry]
+    ) -> Tuple[np.ndarray, List[TimetableEntry], List[TimetableViolation]]:
+        """
+        (n, 6) array of the entries that can be placed on the grid, as
+        (day, slot, class, subject, teacher, room) indices, those entries,
+        and violations for the entries that cannot
+        """
+        rows = []
+        placed = []
+        violations = []
+        for entry in entries:
+            ids = (
+                ("class", entry.class_id, self.class_index.get(entry.class_id)),
+                ("subject", entry.subject_id, self.subject_index.get(entry.subject_id)),
+                ("teacher", entry.teacher_id, self.teacher_index.get(entry.teacher_id)),
+                ("room", entry.room_id, self.room_index.get(entry.room_id)),
+            )
+            unknown = [f"{kind} {entity_id}" for kind, entity_id, idx in ids if idx is None]
+            slot_idx = self.slot_index.get(entry.slot.start_time)
+            if unknown:
+                violations.append(self._violation(
+                    ViolationType.UNKNOWN_ENTITY, f"Entry refers to unknown {', '.join(unknown)}", entry
+                ))
+            elif slot_idx is None or not 0 <= entry.day < self.num_days:
+                violations.append(self._violation(
+                    ViolationType.INVALID_TIME,
+                    f"Entry of class {entry.class_id} on day {entry.day} at "
+                    f"{entry.slot.start_time.strftime('%H:%M')} is outside the timetable",
+                    entry
+                ))
+            else:
+                rows.append((entry.day, slot_idx) + tuple(idx for _, _, idx in ids))
+                placed.append(entry)
+        return np.array(rows, dtype=np.int64).reshape(-1, 6), placed, violations
+
+    def _violation(self, type: ViolationType, message: str, entry: TimetableEntry) -> TimetableViolation:
+        return TimetableViolation(
+            type=type, message=message, class_id=entry.class_id, subject_id=entry.subject_id,
+            teacher_id=entry.teacher_id, room_id=entry.room_id, day=entry.day,
+            slot=self.slot_index.get(entry.slot.start_time)
+        )
+
+    def validate(self, timetable: GeneratedTimetable) -> List[TimetableViolation]:
+        """Every hard constraint the timetable violates; empty if it is valid"""
+        # The class view holds every entry once
+        entries = [entry for class_tt in timetable.class_timetables.values() for entry in class_tt.entries]
+        columns, placed, violations = self._columns(entries)
+        day, slot, class_idx, subject_idx, teacher_idx, room_idx = columns.T
+        num_days, num_slots = self.num_days, self.num_slots
+
+        # Double bookings: more than one entry in an [entity, day, slot] cell
+        for type, kind, field, ids, entity_idx in (
+            (ViolationType.CLASS_DOUBLE_BOOKED, "Class", "class_id", self.class_ids, class_idx),
+            (ViolationType.TEACHER_DOUBLE_BOOKED, "Teacher", "teacher_id", self.teacher_ids, teacher_idx),
+            (ViolationType.ROOM_DOUBLE_BOOKED, "Room", "room_id", self.room_ids, room_idx),
+        ):
+            shape = (len(ids), num_days, num_slots)
+            counts = np.bincount((entity_idx * num_days + day) * num_slots + slot, minlength=int(np.prod(shape)))
+            for idx, cell_day, cell_slot in np.argwhere(counts.reshape(shape) > 1).tolist():
+                violations.append(TimetableViolation(
+                    type=type,
+                    message=f"{kind} {ids[idx]} has {counts[(idx * num_days + cell_day) * num_slots + cell_slot]} "
+                            f"lessons on {self._cell(cell_day, cell_slot)}",
+                    day=cell_day, slot=cell_slot, **{field: ids[idx]}
+                ))
+
+        # Weekly hours of every subject each class takes, or is given anyway
+        shape = self.required_hours.shape
+        hours = np.bincount(class_idx * shape[1] + subject_idx, minlength=int(np.prod(shape))).reshape(shape)
+        for idx, subject in np.argwhere(hours != self.required_hours).tolist():
+            violations.append(TimetableViolation(
+                type=ViolationType.SUBJECT_HOURS,
+                message=f"Class {self.class_ids[idx]} has {hours[idx, subject]} of "
+                        f"{self.required_hours[idx, subject]} weekly hours of {self.subject_ids[subject]}",
+                class_id=self.class_ids[idx], subject_id=self.subject_ids[subject]
+            ))
+
+        # Daily hours of every teacher
+        shape = (len(self.teacher_ids), num_days)
+        daily = np.bincount(teacher_idx * num_days + day, minlength=int(np.prod(shape))).reshape(shape)
+        for idx, overloaded_day in np.argwhere(daily > self.teacher_caps[:, None]).tolist():
+            violations.append(TimetableViolation(
+                type=ViolationType.TEACHER_DAILY_HOURS,
+                message=f"Teacher {self.teacher_ids[idx]} teaches {daily[idx, overloaded_day]} hours on day "
+                        f"{overloaded_day}, more than {self.teacher_caps[idx]}",
+                teacher_id=self.teacher_ids[idx], day=overloaded_day
+            ))
+
+        # Per-entry checks, gathered from the masks at every entry at once
+        for type, broken, describe in (
+            (ViolationType.TEACHER_NOT_QUALIFIED, ~self.compatibility.qualified[subject_idx, teacher_idx],
+             lambda e: f"Teacher {e.teacher_id} is not qualified to teach {e.subject_id}"),
+            (ViolationType.TEACHER_UNAVAILABLE, self.teacher_unavailable[teacher_idx, day, slot],
+             lambda e: f"Teacher {e.teacher_id} is unavailable on {self._cell(e.day, self.slot_index[e.slot.start_time])}"),
+            (ViolationType.ROOM_CAPACITY, self.students[class_idx] > self.capacities[room_idx],
+             lambda e: f"Room {e.room_id} is too small for class {e.class_id}"),
+            (ViolationType.ROOM_FEATURES, ~self.compatibility.feature_ok[subject_idx, room_idx],
+             lambda e: f"Room {e.room_id} lacks features {e.subject_id} requires"),
+            (ViolationType.ROOM_UNAVAILABLE, self.room_unavailable[room_idx, day, slot],
+             lambda e: f"Room {e.room_id} is unavailable on {self._cell(e.day, self.slot_index[e.slot.start_time])}"),
+        ):
+            for idx in np.flatnonzero(broken).tolist():
+                violations.append(self._violation(type, describe(placed[idx]), placed[idx]))
+        return violations
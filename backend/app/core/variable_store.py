@@ -0,0 +1,58 @@
+from collections import defaultdict
+from typing import Dict, List, Tuple, Iterator, ItemsView, Optional
+
+from ortools.sat.python import cp_model
+
+# Integer key of a decision variable: (day, slot, class, subject, teacher, room)
+VariableKey = Tuple[int, int, int, int, int, int]
+
+
+class VariableStore:
+    """
+    Indexed store for the optimizer's decision variables.
+
+    Variables are keyed by integer tuples instead of encoded strings, and every
+    variable is registered in a set of secondary indexes when it is added, so
+    each constraint group can be built with a single pass over the index it
+    needs rather than a scan of all variables.
+    """
+
+    def __init__(self):
+        self.variables: Dict[VariableKey, cp_model.IntVar] = {}
+
+        # Secondary indexes, all keyed by integer tuples
+        self.by_day_slot_class: Dict[Tuple[int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_day_slot_teacher: Dict[Tuple[int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_day_slot_room: Dict[Tuple[int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_class_day: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_teacher_day: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_class_subject: Dict[Tuple[int, int], List[cp_model.IntVar]] = defaultdict(list)
+        self.by_class_day_slot_room: Dict[Tuple[int, int, int, int], List[cp_model.IntVar]] = defaultdict(list)
+
+    def add(self, key: VariableKey, var: cp_model.IntVar):
+        """Register a variable under its key and in every secondary index"""
+        day, slot, class_idx, subject_idx, teacher_idx, room_idx = key
+        self.variables[key] = var
+        self.by_day_slot_class[(day, slot, class_idx)].append(var)
+        self.by_day_slot_teacher[(day, slot, teacher_idx)].append(var)
+        self.by_day_slot_room[(day, slot, room_idx)].append(var)
+        self.by_class_day[(class_idx, day)].append(var)
+        self.by_teacher_day[(teacher_idx, day)].append(var)
+        self.by_class_subject[(class_idx, subject_idx)].append(var)
+        self.by_class_day_slot_room[(class_idx, day, slot, room_idx)].append(var)
+
+    def get(self, key: VariableKey) -> Optional[cp_model.IntVar]:
+        """Get the variable for a key, or None if it was never created"""
+        return self.variables.get(key)
+
+    def items(self) -> ItemsView[VariableKey, cp_model.IntVar]:
+        return self.variables.items()
+
+    def __contains__(self, key: VariableKey) -> bool:
+        return key in self.variables
+
+    def __iter__(self) -> Iterator[VariableKey]:
+        return iter(self.variables)
+
+    def __len__(self) -> int:
+        return len(self.variables)
@@ -1,7 +1,10 @@
 import csv
+import hashlib
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from pathlib import Path
 
 from ..schemas.timetable import (
@@ -9,6 +12,9 @@ from ..schemas.timetable import (
     TimeSlot
 )
 
+# Day names accepted in time windows, in the order of the school week
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
 class CSVDataLoader:
     """
     Loads and parses CSV data files for the AI Timetable Generator
@@ -18,36 +24,68 @@ class CSVDataLoader:
         self.data_dir = data_dir
         self.logger = logging.getLogger(__name__)
     
+    def _find_csv(self, file_name: str) -> str:
+        """Find a CSV file in the data directory, the datasets directory, or the workspace"""
+        # Try the direct path first
+        file_path = os.path.join(self.data_dir, file_name)
+        if os.path.exists(file_path):
+            return file_path
+        
+        # If not found, try to find it relative to current directory
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        absolute_path = os.path.abspath(os.path.join(current_dir, "../../../datasets", file_name))
+        
+        self.logger.info(f"Attempting to open file: {absolute_path}")
+        if os.path.exists(absolute_path):
+            return absolute_path
+        
+        # Last resort: try to find it anywhere in the workspace
+        for root, _, files in os.walk(os.path.abspath(os.path.join(current_dir, "../../.."))):
+            if file_name in files:
+                found_path = os.path.join(root, file_name)
+                self.logger.info(f"Found file at: {found_path}")
+                return found_path
+                
+        raise FileNotFoundError(f"Could not find {file_name} in any location")
+    
     def _safe_open_csv(self, file_name: str):
         """Safely attempt to open CSV files with proper error handling"""
-        file_path = os.path.join(self.data_dir, file_name)
         try:
-            # Try the direct path first
-            if os.path.exists(file_path):
-                return open(file_path, 'r')
-            
-            # If not found, try to find it relative to current directory
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            absolute_path = os.path.abspath(os.path.join(current_dir, "../../../datasets", file_name))
-            
-            self.logger.info(f"Attempting to open file: {absolute_path}")
-            if os.path.exists(absolute_path):
-                return open(absolute_path, 'r')
-            
-            # Last resort: try to find it anywhere in the workspace
-            for root, _, files in os.walk(os.path.abspath(os.path.join(current_dir, "../../.."))):
-                if file_name in files:
-                    found_path = os.path.join(root, file_name)
-                    self.logger.info(f"Found file at: {found_path}")
-                    return open(found_path, 'r')
-                    
-            raise FileNotFoundError(f"Could not find {file_name} in any location")
-            
+            return open(self._find_csv(file_name), 'r')
         except Exception as e:
             self.logger.error(f"Error opening {file_name}: {str(e)}")
             # Return empty data rather than crashing
             return None
     
+    def _parse_windows(self, value: str) -> List[Dict[str, Any]]:
+        """
+        Parse comma separated "Day-HH:MM-HH:MM" time windows.
+        
+        The day is a day name or a 0-based day index and may be left out
+        ("HH:MM-HH:MM") for a window on every day; hours may have one digit.
+        """
+        windows = []
+        for window_str in value.split(','):
+            parts = [part.strip() for part in window_str.split('-')]
+            if len(parts) == 2:
+                day, (start, end) = None, parts
+            elif len(parts) == 3:
+                day_name, start, end = parts
+                if day_name.isdigit():
+                    day = int(day_name)
+                elif day_name.lower() in DAY_NAMES:
+                    day = DAY_NAMES.index(day_name.lower())
+                else:
+                    raise ValueError(f"Unknown day {day_name!r} in time window {window_str.strip()!r}")
+            else:
+                continue
+            windows.append({
+                'day': day,
+                'start_time': start.zfill(5),
+                'end_time': end.zfill(5)
+            })
+        return windows
+    
     def load_teachers(self) -> List[Teacher]:
         """Load teacher data from CSV"""
         teachers = []
@@ -64,19 +102,12 @@ class CSVDataLoader:
                     # Parse subjects
                     subjects = [s.strip() for s in row.get('subjects', '').split(',') if s.strip()]
                     
-                    # Parse unavailable slots
+                    # Parse unavailable slots; unquoted windows spill into
+                    # extra columns after the last one
                     unavailable_slots = []
-                    if row.get('unavailable_slots'):
-                        for slot_str in row['unavailable_slots'].split(','):
-                            if '-' in slot_str:
-                                parts = slot_str.split('-')
-                                if len(parts) >= 3:
-                                    day, start, end = parts[0], parts[1], parts[2]
-                                    unavailable_slots.append({
-                                        'day': day,
-                                        'start_time': start,
-                                        'end_time': end
-                                    })
+                    windows = [row.get('unavailable_slots') or ''] + (row.get(None) or [])
+                    if any(windows):
+                        unavailable_slots = self._parse_windows(','.join(filter(None, windows)))
                     
                     teacher = Teacher(
                         id=row.get('teacher_id', f"t{len(teachers)+1}"),
@@ -110,11 +141,17 @@ class CSVDataLoader:
                     if row.get('features'):
                         features = [f.strip() for f in row['features'].split(',') if f.strip()]
                     
+                    # Parse the optional availability windows
+                    available_slots = []
+                    if row.get('available_slots'):
+                        available_slots = self._parse_windows(row['available_slots'])
+                    
                     room = Room(
                         id=row.get('room_id', f"r{len(rooms)+1}"),
                         name=row.get('name', f"Room {len(rooms)+1}"),
                         capacity=int(row.get('capacity', 30)),
-                        features=features
+                        features=features,
+                        available_slots=available_slots
                     )
                     rooms.append(room)
                 except Exception as e:
@@ -205,4 +242,103 @@ class CSVDataLoader:
                 'rooms': [],
                 'subjects': [],
                 'classes': []
-            } 
\ No newline at end of file
+            }
+
+
+class DatasetCache:
+    """
+    Parsed CSV datasets, shared until a file changes.
+    
+    Every call stats the four files. While their mtime and size are
+    unchanged the cached entities are returned as they are; when they
+    change, the file's content hash decides whether it is parsed again, so
+    a file that was only touched is not. Files are parsed and invalidated
+    one at a time.
+    
+    The data is a read-only mapping of tuples holding the same entity
+    objects for every caller; callers that keep or modify entities must
+    copy them first.
+    """
+    
+    FILES = {
+        'teachers': "teachers.csv",
+        'rooms': "rooms.csv",
+        'subjects': "subjects.csv",
+        'classes': "classes.csv",
+    }
+    
+    def __init__(self, loader: CSVDataLoader):
+        self.loader = loader
+        self.paths: Dict[str, Optional[str]] = {}
+        self.signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.hashes: Dict[str, Optional[str]] = {}
+        self.entities: Dict[str, Tuple[Any, ...]] = {}
+        self.data: Optional[Mapping[str, Tuple[Any, ...]]] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+    
+    def _signature(self, kind: str) -> Optional[Tuple[int, int]]:
+        """(mtime, size) of a dataset file, or None if it cannot be found"""
+        path = self.paths.get(kind)
+        if path is not None:
+            try:
+                stat = os.stat(path)
+                return stat.st_mtime_ns, stat.st_size
+            except OSError:
+                pass
+        # Look the file up again, e.g. after it was moved or created
+        try:
+            path = self.loader._find_csv(self.FILES[kind])
+            stat = os.stat(path)
+        except OSError:
+            self.paths[kind] = None
+            return None
+        self.paths[kind] = path
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _content_hash(self, kind: str) -> Optional[str]:
+        try:
+            with open(self.paths[kind], 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except (OSError, TypeError):
+            return None
+    
+    def load_all_data(self) -> Mapping[str, Tuple[Any, ...]]:
+        """Load all dataset files, parsing only those whose content changed"""
+        signatures = {kind: self._signature(kind) for kind in self.FILES}
+        data = self.data
+        if data is not None and signatures == self.signatures:
+            self.hits += 1
+            return data
+        
+        with self._lock:
+            self.misses += 1
+            loaders = {
+                'teachers': self.loader.load_teachers,
+                'rooms': self.loader.load_rooms,
+                'subjects': self.loader.load_subjects,
+                'classes': self.loader.load_classes,
+            }
+            changed = self.data is None
+            for kind, signature in signatures.items():
+                if kind in self.entities and signature == self.signatures.get(kind):
+                    continue
+                content_hash = self._content_hash(kind)
+                if kind not in self.entities or content_hash != self.hashes.get(kind):
+                    self.entities[kind] = tuple(loaders[kind]())
+                    self.hashes[kind] = content_hash
+                    self.reloads += 1
+                    changed = True
+                self.signatures[kind] = signature
+            if changed:
+                self.data = MappingProxyType(dict(self.entities))
+            return self.data
+    
+    def stats(self) -> Dict[str, float]:
+        return {
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "file_reloads": float(self.reloads),
+        }
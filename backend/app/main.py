@@ -4,7 +4,10 @@ import uvicorn
 import logging
 import os
 
+from .core.components import component_solver
 from .routes import timetable, ml, database
+from .services.job_manager import job_manager
+from .services.timetable_store import timetable_store
 
 # Configure logging
 logging.basicConfig(
@@ -57,6 +60,12 @@ app.include_router(timetable.router)
 app.include_router(ml.router)
 app.include_router(database.router)
 
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    job_manager.shutdown()
+    component_solver.shutdown()
+    timetable_store.close()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to AI Timetable Generator API"}
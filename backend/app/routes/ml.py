@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any, List
 
 from ..ml.timetable_optimizer_ml import TimetableOptimizerML
-from ..services.timetable_service import TimetableService
+from ..services.timetable_service import TimetableService, timetable_service
 from ..schemas.timetable import Teacher, Room, Subject, Class
 
 router = APIRouter(
@@ -12,8 +12,8 @@ router = APIRouter(
 )
 
 def get_timetable_service():
-    """Dependency injection for TimetableService"""
-    return TimetableService()
+    """Dependency injection for the shared TimetableService"""
+    return timetable_service
 
 def get_ml_optimizer():
     """Dependency injection for TimetableOptimizerML"""
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List
+import json
 
-from ..services.timetable_service import TimetableService
+from ..services.timetable_service import TimetableService, timetable_service
 from ..schemas.timetable import (
     TimetableGenerationRequest, GeneratedTimetable, 
     UpdateTimetableRequest, TimetableAnalytics,
-    Teacher, Room, Subject, Class
+    Teacher, Room, Subject, Class, SolveMode, TimetableJob, JobStatus, TimetableValidation
 )
 
 router = APIRouter(
@@ -15,8 +18,8 @@ router = APIRouter(
 )
 
 def get_timetable_service():
-    """Dependency injection for TimetableService"""
-    return TimetableService()
+    """Dependency injection for the shared TimetableService"""
+    return timetable_service
 
 @router.get("/data", response_model=Dict[str, List[Any]])
 async def get_data(
@@ -31,17 +34,164 @@ async def get_data(
 async def generate_timetable(
     request: TimetableGenerationRequest,
     time_limit_seconds: int = 60,
+    mode: SolveMode = SolveMode.MONOLITHIC,
+    bypass_cache: bool = False,
+    split_components: bool = False,
     service: TimetableService = Depends(get_timetable_service)
 ):
     """
     Generate a new timetable based on the provided constraints and requirements.
     If no data is provided, data will be loaded from CSV files.
+    
+    Use mode=decomposed to assign time slots first and rooms second, which
+    keeps the model small enough for large schools, or mode=lns to keep
+    improving a decomposed first solution one neighbourhood at a time.
+    mode=preview returns a greedy draft in milliseconds, listing any lesson
+    hours it could not place as conflicts. CP-SAT search settings
+    (workers, seed, gap limit, ...) can be given in solver_parameters and are
+    echoed back in the timetable stats. Set base_timetable_id to warm-start
+    the search from a previously generated timetable.
+    
+    A request identical to one solved before, with the same time limit and
+    mode, returns the cached timetable at once; set bypass_cache=true to
+    force a fresh solve.
+    
+    Set split_components=true to solve groups of classes that share no
+    teachers and no rooms (e.g. several schools) as separate models in
+    parallel worker processes; their timetables are merged.
     """
-    result = await service.generate_timetable(request, time_limit_seconds)
+    result = await service.generate_timetable(
+        request, time_limit_seconds, mode, bypass_cache, split_components
+    )
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+@router.post("/generate/stream")
+async def stream_timetable(
+    request: TimetableGenerationRequest,
+    time_limit_seconds: int = 60,
+    mode: SolveMode = SolveMode.MONOLITHIC,
+    bypass_cache: bool = False,
+    split_components: bool = False,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Generate a timetable like /generate, streaming progress as server-sent events.
+    
+    Every improving solution is sent as a "solution" event with its
+    objective, bound, gap, elapsed time and timetable, so clients can show a
+    usable timetable long before the time limit. The stream ends with a
+    "done" event holding the saved timetable and its ID, or an "error" event.
+    """
+    async def events():
+        async for event, payload in service.stream_timetable(
+            request, time_limit_seconds, mode, bypass_cache, split_components
+        ):
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.get("/solution-cache", response_model=Dict[str, float])
+async def get_solution_cache_stats(
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Get the size and hit/miss counters of the solution cache
+    """
+    return await service.get_solution_cache_stats()
+
+@router.get("/store", response_model=Dict[str, float])
+async def get_store_stats(
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Get the size and hit/miss counters of the store of saved timetables
+    """
+    return await service.get_store_stats()
+
+@router.post("/jobs", response_model=TimetableJob, status_code=202)
+async def submit_timetable_job(
+    request: TimetableGenerationRequest,
+    time_limit_seconds: int = 60,
+    mode: SolveMode = SolveMode.MONOLITHIC,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Queue a timetable generation and return its job right away.
+    
+    Jobs run in a bounded pool of worker processes (TIMETABLE_JOB_WORKERS
+    at a time). Poll /timetable/jobs/{job_id} for the status and fetch the
+    timetable from /timetable/jobs/{job_id}/result once it has completed.
+    """
+    result = await service.submit_job(request, time_limit_seconds, mode)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result["job"]
+
+@router.get("/jobs/{job_id}", response_model=TimetableJob)
+async def get_timetable_job(
+    job_id: str,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Get the status of a timetable generation job
+    """
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=TimetableJob)
+async def cancel_timetable_job(
+    job_id: str,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Cancel a timetable generation job
+    
+    A queued job never starts. A running job stops searching and its best
+    timetable so far becomes available from /timetable/jobs/{job_id}/result.
+    """
+    job = await service.cancel_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+@router.put("/jobs/{job_id}/deadline", response_model=TimetableJob)
+async def set_timetable_job_deadline(
+    job_id: str,
+    time_limit_seconds: int = Query(..., ge=0),
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Extend or shrink the time limit of a queued or running job, counted from
+    when the job started. Finished jobs are returned unchanged.
+    """
+    job = await service.set_job_time_limit(job_id, time_limit_seconds)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+@router.get("/jobs/{job_id}/result", response_model=GeneratedTimetable)
+async def get_timetable_job_result(
+    job_id: str,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Get the timetable generated by a completed job, or the best timetable
+    a cancelled job found before it stopped
+    """
+    job = await service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=f"Job {job_id} failed: {job.error}")
+    timetable = await service.get_job_result(job_id)
+    if timetable is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still {job.status.value}")
+    return timetable
+
 @router.get("/{timetable_id}", response_model=GeneratedTimetable)
 async def get_timetable(
     timetable_id: str,
@@ -58,16 +208,37 @@ async def get_timetable(
 @router.put("/update", response_model=Dict[str, Any])
 async def update_timetable(
     request: UpdateTimetableRequest,
+    time_limit_seconds: float = 10,
     service: TimetableService = Depends(get_timetable_service)
 ):
     """
     Update a previously generated timetable
+    
+    Updates of type teacher_unavailable or room_unavailable (with optional
+    days and slots) repair the timetable incrementally: only entries around
+    the change are moved, and as few of them as possible.
     """
-    result = await service.update_timetable(request)
+    result = await service.update_timetable(request, time_limit_seconds)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+@router.get("/{timetable_id}/validate", response_model=TimetableValidation)
+async def validate_timetable(
+    timetable_id: str,
+    service: TimetableService = Depends(get_timetable_service)
+):
+    """
+    Check a timetable against every hard constraint: no class, teacher or
+    room double-booked, the weekly hours of every subject, teacher daily
+    hours and qualifications, room capacity and features, and teacher and
+    room availability
+    """
+    try:
+        return await service.validate_timetable(timetable_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.get("/{timetable_id}/analytics", response_model=TimetableAnalytics)
 async def get_timetable_analytics(
     timetable_id: str,
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Any
 from datetime import time, datetime
+from enum import Enum
 
 class TimeSlot(BaseModel):
     start_time: time
@@ -11,11 +12,14 @@ class TimeSlot(BaseModel):
             time: lambda t: t.strftime("%H:%M")
         }
 
+class TimeWindow(TimeSlot):
+    day: Optional[int] = None  # Day index (0 = first day of the week); None means every day
+
 class Teacher(BaseModel):
     id: str
     name: str
     subjects: List[str]
-    unavailable_slots: List[TimeSlot] = []
+    unavailable_slots: List[TimeWindow] = []
     max_hours_per_day: int = 6
     max_consecutive_classes: int = 3
 
@@ -23,7 +27,7 @@ class Room(BaseModel):
     id: str
     name: str
     capacity: int
-    available_slots: List[TimeSlot] = []
+    available_slots: List[TimeWindow] = []  # Empty means always available
     features: List[str] = []  # like "projector", "lab equipment", etc.
 
 class Subject(BaseModel):
@@ -45,12 +49,39 @@ class TimetableConstraints(BaseModel):
     break_slots: List[TimeSlot] = []
     allow_split_subjects: bool = False  # If hours for a subject can be split across days
     
+class SolveMode(str, Enum):
+    MONOLITHIC = "monolithic"  # One model over day x slot x class x subject x teacher x room
+    DECOMPOSED = "decomposed"  # Time assignment first, room assignment second
+    LNS = "lns"  # Large neighbourhood search from a decomposed first solution
+    PREVIEW = "preview"  # Greedy draft in milliseconds, may leave hours unplaced
+    
+class SearchBranching(str, Enum):
+    AUTOMATIC = "automatic"
+    FIXED = "fixed"
+    PORTFOLIO = "portfolio"
+    LP = "lp"
+    PSEUDO_COST = "pseudo_cost"
+    PORTFOLIO_WITH_QUICK_RESTART = "portfolio_with_quick_restart"
+    
+class SolverParameters(BaseModel):
+    num_workers: int = Field(0, ge=0, description="Parallel search workers; 0 lets CP-SAT use every core")
+    random_seed: Optional[int] = Field(None, ge=0)
+    relative_gap_limit: Optional[float] = Field(None, ge=0)
+    linearization_level: Optional[int] = Field(None, ge=0, le=2)
+    deterministic: bool = False  # Bound by deterministic time and interleave workers for reproducible results
+    log_search_progress: bool = False
+    stop_after_first_solution: bool = False
+    search_branching: SearchBranching = SearchBranching.AUTOMATIC
+    
 class TimetableGenerationRequest(BaseModel):
     teachers: List[Teacher]
     rooms: List[Room]
     subjects: List[Subject]
     classes: List[Class]
     constraints: TimetableConstraints
+    solver_parameters: Optional[SolverParameters] = None
+    base_timetable_id: Optional[str] = None  # Warm-start from a previously generated timetable
+    hint_repair: bool = False  # Let the solver repair base timetable hints that became infeasible
     
 class TimetableEntry(BaseModel):
     day: int
@@ -75,7 +106,43 @@ class GeneratedTimetable(BaseModel):
     teacher_timetables: Dict[str, TeacherTimetable]
     room_allocations: Dict[str, List[TimetableEntry]]
     conflicts: List[str] = []
-    stats: Dict[str, float] = {}
+    stats: Dict[str, Any] = {}
+    
+class SolveProgress(BaseModel):
+    objective: float
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None  # Relative gap between objective and bound
+    elapsed: float  # Seconds since the solve started
+    solution_count: int
+    timetable: GeneratedTimetable
+    
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"  # Stopped early; keeps the best timetable found so far
+    
+class TimetableJob(BaseModel):
+    id: str
+    status: JobStatus
+    mode: SolveMode
+    time_limit_seconds: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    
+class ChangeType(str, Enum):
+    TEACHER_UNAVAILABLE = "teacher_unavailable"  # Teacher on leave
+    ROOM_UNAVAILABLE = "room_unavailable"  # Room closed
+    
+class TimetableChange(BaseModel):
+    type: ChangeType
+    teacher_id: Optional[str] = None
+    room_id: Optional[str] = None
+    days: List[int] = []  # Affected days; empty means every day
+    slots: List[int] = []  # Affected slot indices; empty means the whole day
     
 class UpdateTimetableRequest(BaseModel):
     timetable_id: str
@@ -85,4 +152,48 @@ class TimetableAnalytics(BaseModel):
     teacher_utilization: Dict[str, float]
     room_utilization: Dict[str, float]
     free_periods_distribution: Dict[str, int]
-    efficiency_score: float 
\ No newline at end of file
+    efficiency_score: float
+    days: int = 0
+    slots_per_day: int = 0
+    class_utilization: Dict[str, float] = {}
+    free_periods_by_slot: Dict[str, int] = {}  # Start time -> free class periods in that slot over the week
+    class_gaps: Dict[str, int] = {}  # Free periods between the first and last lesson of each day, over the week
+    teacher_gaps: Dict[str, int] = {}
+    class_daily_hours: Dict[str, List[int]] = {}  # Lessons per day
+    teacher_daily_hours: Dict[str, List[int]] = {}
+    room_daily_hours: Dict[str, List[int]] = {}
+    class_daily_spread: Dict[str, int] = {}  # Most minus fewest lessons in a day
+    teacher_daily_spread: Dict[str, int] = {}
+    class_room_changes: Dict[str, int] = {}  # Back-to-back lessons in different rooms
+    teacher_room_changes: Dict[str, int] = {}
+    stats: Dict[str, float] = {}
+
+class ViolationType(str, Enum):
+    UNKNOWN_ENTITY = "unknown_entity"  # Entry refers to a class, subject, teacher or room not in the inputs
+    INVALID_TIME = "invalid_time"  # Entry lies outside the days and time slots
+    CLASS_DOUBLE_BOOKED = "class_double_booked"
+    TEACHER_DOUBLE_BOOKED = "teacher_double_booked"
+    ROOM_DOUBLE_BOOKED = "room_double_booked"
+    SUBJECT_HOURS = "subject_hours"  # Weekly hours of a subject differ from hours_per_week
+    TEACHER_DAILY_HOURS = "teacher_daily_hours"
+    TEACHER_NOT_QUALIFIED = "teacher_not_qualified"
+    TEACHER_UNAVAILABLE = "teacher_unavailable"
+    ROOM_CAPACITY = "room_capacity"
+    ROOM_FEATURES = "room_features"
+    ROOM_UNAVAILABLE = "room_unavailable"
+
+class TimetableViolation(BaseModel):
+    type: ViolationType
+    message: str
+    class_id: Optional[str] = None
+    subject_id: Optional[str] = None
+    teacher_id: Optional[str] = None
+    room_id: Optional[str] = None
+    day: Optional[int] = None
+    slot: Optional[int] = None  # Slot index
+
+class TimetableValidation(BaseModel):
+    timetable_id: str
+    valid: bool
+    violations: List[TimetableViolation]
+    stats: Dict[str, float] = {}
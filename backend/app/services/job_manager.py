@@ -0,0 +1,297 @@
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+from ..core.lns import LNSOptimizer
+from ..core.model_cache import model_cache
+from ..core.optimizer import TimetableOptimizer
+from ..core.solve_control import SolveControl
+from ..schemas.timetable import (
+    GeneratedTimetable, TimetableGenerationRequest, SolveMode, JobStatus, TimetableJob
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SharedSolveControl(SolveControl):
+    """
+    Solve control of a job, read from the manager dict shared with the server.
+
+    The server writes (job_id, "cancelled") and (job_id, "time_limit_seconds");
+    the deadline counts from the moment the worker picked the job up.
+    """
+
+    def __init__(self, shared_state, job_id: str, started: float):
+        super().__init__()
+        self.shared_state = shared_state
+        self.job_id = job_id
+        self.started = started
+
+    def poll(self):
+        self.cancelled = self.shared_state.get((self.job_id, "cancelled"), False)
+        self.deadline = self.started + self.shared_state.get((self.job_id, "time_limit_seconds"), 0)
+
+
+def run_solve(
+    job_id: str,
+    request: TimetableGenerationRequest,
+    time_limit_seconds: int,
+    mode: SolveMode,
+    base_timetable: Optional[GeneratedTimetable],
+    shared_state
+) -> GeneratedTimetable:
+    """
+    Solve one generation request inside a worker process.
+
+    Args:
+        job_id: ID of the job being run
+        request: Validated generation request
+        time_limit_seconds: Time limit for the solver
+        mode: Solve mode
+        base_timetable: Timetable to warm-start from, if any
+        shared_state: Manager dict the worker reports its start to and
+            reads cancellation and deadline changes from
+
+    Returns:
+        The generated timetable
+    """
+    started = time.time()
+    shared_state[(job_id, "started")] = started
+    control = SharedSolveControl(shared_state, job_id, started)
+    optimizer_class = LNSOptimizer if mode == SolveMode.LNS else TimetableOptimizer
+    optimizer = optimizer_class(control=control, model_cache=model_cache)
+    return optimizer.solve(
+        teachers=request.teachers,
+        rooms=request.rooms,
+        subjects=request.subjects,
+        classes=request.classes,
+        constraints=request.constraints,
+        time_limit_seconds=time_limit_seconds,
+        mode=mode,
+        solver_parameters=request.solver_parameters,
+        base_timetable=base_timetable,
+        repair_hint=request.hint_repair
+    )
+
+
+class JobManager:
+    """
+    Runs timetable generation jobs in a bounded pool of worker processes.
+
+    Solves are CPU bound and hold the GIL inside CP-SAT's Python callbacks,
+    so they run in separate processes; at most max_workers of them run at
+    once and the rest wait in the pool's queue. The pool and the manager
+    process used to share state with the workers are started on first use.
+
+    Running jobs can be cancelled or given a new time limit: workers poll the
+    shared state and stop CP-SAT's search, keeping the best solution so far.
+
+    Finished jobs, with their requests and timetables, are forgotten once
+    they are older than the TTL or more than max_finished_jobs have finished
+    since; the oldest go first.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_finished_jobs: Optional[int] = None,
+        finished_job_ttl_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            max_workers: Number of concurrent solves. Defaults to the
+                TIMETABLE_JOB_WORKERS environment variable, or the CPU count.
+            max_finished_jobs: Finished jobs to keep. Defaults to the
+                TIMETABLE_MAX_FINISHED_JOBS environment variable, or 1000.
+            finished_job_ttl_seconds: How long a finished job is kept.
+                Defaults to the TIMETABLE_FINISHED_JOB_TTL_SECONDS environment
+                variable, or an hour.
+        """
+        self.max_workers = max_workers or int(os.getenv("TIMETABLE_JOB_WORKERS", os.cpu_count() or 1))
+        self.max_finished_jobs = max_finished_jobs or int(os.getenv("TIMETABLE_MAX_FINISHED_JOBS", 1000))
+        self.finished_job_ttl_seconds = finished_job_ttl_seconds or float(
+            os.getenv("TIMETABLE_FINISHED_JOB_TTL_SECONDS", 3600)
+        )
+        self.jobs: Dict[str, TimetableJob] = {}
+        self.requests: Dict[str, TimetableGenerationRequest] = {}
+        self.results: Dict[str, GeneratedTimetable] = {}
+        self.futures: Dict[str, Future] = {}
+        self.cancel_requested = set()
+        # Finished job IDs, oldest first, with when they finished (time.monotonic())
+        self.finished: "OrderedDict[str, float]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._shared_state = None
+        self._lock = threading.RLock()
+
+    def _start(self):
+        """Start the worker pool and the shared state manager"""
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads and locks
+            context = multiprocessing.get_context("spawn")
+            self._manager = context.Manager()
+            self._shared_state = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+            logger.info(f"Started timetable job pool with {self.max_workers} workers")
+
+    def submit(
+        self,
+        request: TimetableGenerationRequest,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC,
+        base_timetable: Optional[GeneratedTimetable] = None
+    ) -> TimetableJob:
+        """
+        Queue a generation request.
+
+        Args:
+            request: Validated generation request
+            time_limit_seconds: Time limit for the solver
+            mode: Solve mode
+            base_timetable: Timetable to warm-start from, if any
+
+        Returns:
+            The queued job
+        """
+        with self._lock:
+            self._evict_finished()
+            self._start()
+            job = TimetableJob(
+                id=str(uuid.uuid4()),
+                status=JobStatus.QUEUED,
+                mode=mode,
+                time_limit_seconds=time_limit_seconds,
+                created_at=datetime.now()
+            )
+            self.jobs[job.id] = job
+            self.requests[job.id] = request
+            self._shared_state[(job.id, "cancelled")] = False
+            self._shared_state[(job.id, "time_limit_seconds")] = time_limit_seconds
+            future = self._executor.submit(
+                run_solve, job.id, request, time_limit_seconds, mode, base_timetable, self._shared_state
+            )
+            self.futures[job.id] = future
+        future.add_done_callback(lambda done: self._finish(job.id, done))
+        return job
+
+    def _finish(self, job_id: str, future: Future):
+        """Record the outcome of a job once its worker returns"""
+        with self._lock:
+            self._record_outcome(job_id, future)
+
+    def _record_outcome(self, job_id: str, future: Future):
+        job = self.jobs[job_id]
+        job.finished_at = datetime.now()
+        job.started_at = self._started_at(job_id) or job.started_at
+        if future.cancelled():
+            job.status = JobStatus.CANCELLED
+        else:
+            try:
+                timetable = future.result()
+            except Exception as e:
+                logger.error(f"Timetable job {job_id} failed: {str(e)}")
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            else:
+                self.results[job_id] = timetable
+                cancelled = job_id in self.cancel_requested
+                job.status = JobStatus.CANCELLED if cancelled else JobStatus.COMPLETED
+        for key in ("started", "cancelled", "time_limit_seconds"):
+            self._shared_state.pop((job_id, key), None)
+        self.futures.pop(job_id, None)
+        self.finished[job_id] = time.monotonic()
+        self._evict_finished()
+
+    def _evict_finished(self):
+        """Forget finished jobs past the TTL, and the oldest beyond max_finished_jobs"""
+        expired = time.monotonic() - self.finished_job_ttl_seconds
+        while self.finished:
+            job_id, finished = next(iter(self.finished.items()))
+            if finished > expired and len(self.finished) <= self.max_finished_jobs:
+                break
+            self.finished.popitem(last=False)
+            self.jobs.pop(job_id, None)
+            self.requests.pop(job_id, None)
+            self.results.pop(job_id, None)
+            self.cancel_requested.discard(job_id)
+
+    def _started_at(self, job_id: str) -> Optional[datetime]:
+        started = self._shared_state.get((job_id, "started")) if self._shared_state is not None else None
+        return datetime.fromtimestamp(started) if started is not None else None
+
+    def cancel(self, job_id: str) -> Optional[TimetableJob]:
+        """
+        Cancel a job. A queued job never starts; a running job stops its
+        search and keeps the best timetable found so far as its result.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+                return job
+            self.cancel_requested.add(job_id)
+            future = self.futures.get(job_id)
+            if future is not None and not future.cancel() and not future.done():
+                self._shared_state[(job_id, "cancelled")] = True
+            return job
+
+    def set_time_limit(self, job_id: str, time_limit_seconds: int) -> Optional[TimetableJob]:
+        """
+        Extend or shrink the time limit of a queued or running job, counted
+        from when the job started. A limit that has already passed stops the
+        job with its best timetable so far.
+
+        Returns:
+            The job, or None if it does not exist
+        """
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job.status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+                return job
+            job.time_limit_seconds = time_limit_seconds
+            self._shared_state[(job_id, "time_limit_seconds")] = time_limit_seconds
+            return job
+
+    def get(self, job_id: str) -> Optional[TimetableJob]:
+        """Get a job with its current status, or None if it does not exist"""
+        with self._lock:
+            self._evict_finished()
+            job = self.jobs.get(job_id)
+            if job is not None and job.status == JobStatus.QUEUED:
+                started_at = self._started_at(job_id)
+                if started_at is not None:
+                    job.started_at = started_at
+                    job.status = JobStatus.RUNNING
+            return job
+
+    def result(self, job_id: str) -> Optional[GeneratedTimetable]:
+        """Get the timetable of a completed job"""
+        with self._lock:
+            self._evict_finished()
+            return self.results.get(job_id)
+
+    def request(self, job_id: str) -> Optional[TimetableGenerationRequest]:
+        """Get the request a job was submitted with"""
+        with self._lock:
+            return self.requests.get(job_id)
+
+    def shutdown(self):
+        """Stop the worker pool, cancelling queued jobs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._manager.shutdown()
+            self._executor = None
+
+
+# Process-wide job manager shared by all requests
+job_manager = JobManager()
@@ -0,0 +1,96 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import threading
+
+from ..schemas.timetable import GeneratedTimetable, TimetableGenerationRequest, SolveMode
+
+
+def request_key(
+    request: TimetableGenerationRequest,
+    time_limit_seconds: int,
+    mode: SolveMode,
+    split_components: bool = False,
+    base_timetable: Optional[GeneratedTimetable] = None
+) -> str:
+    """
+    Canonical hash of a generation request and the way it is solved.
+
+    The request is serialized with sorted keys, so payloads that differ only
+    in field order share a key; solver parameters, including the seed, are
+    part of the request. The request only names its base timetable, which
+    may be edited under the same ID, so the base's contents are hashed too.
+    """
+    content = {
+        "request": request.model_dump(mode="json"),
+        "base_timetable": base_timetable.model_dump(mode="json") if base_timetable is not None else None,
+        "time_limit_seconds": time_limit_seconds,
+        "mode": SolveMode(mode).value,
+        "split_components": split_components,
+    }
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SolutionCache:
+    """
+    Bounded in-memory cache of generated timetables by request hash.
+
+    Only timetables without conflicts are kept: a request that timed out
+    may still succeed when it is solved again. Timetables are copied on the
+    way in and out, since saved timetables are edited in place.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        """
+        Args:
+            max_entries: Number of timetables kept. Defaults to the
+                TIMETABLE_SOLUTION_CACHE_SIZE environment variable, or 128.
+        """
+        self.max_entries = max_entries or int(os.getenv("TIMETABLE_SOLUTION_CACHE_SIZE", 128))
+        self.timetables: "OrderedDict[str, GeneratedTimetable]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[GeneratedTimetable]:
+        """Get a copy of the timetable cached under a key, or None"""
+        with self._lock:
+            timetable = self.timetables.get(key)
+            if timetable is None:
+                self.misses += 1
+                return None
+            self.timetables.move_to_end(key)
+            self.hits += 1
+            return timetable.model_copy(deep=True)
+
+    def put(self, key: str, timetable: GeneratedTimetable):
+        """Cache a timetable, evicting the least recently used beyond max_entries"""
+        if timetable.conflicts:
+            return
+        with self._lock:
+            self.timetables[key] = timetable.model_copy(deep=True)
+            self.timetables.move_to_end(key)
+            while len(self.timetables) > self.max_entries:
+                self.timetables.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.timetables.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": float(len(self.timetables)),
+                "max_entries": float(self.max_entries),
+                "hits": float(self.hits),
+                "misses": float(self.misses),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide solution cache shared by all requests
+solution_cache = SolutionCache()
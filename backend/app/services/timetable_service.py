@@ -1,80 +1,350 @@
-from typing import List, Dict, Optional
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
+import threading
+import time
 import uuid
 from datetime import datetime
 import os
 
-from ..core.optimizer import TimetableOptimizer
-from ..database.csv_loader import CSVDataLoader
+from ..core.analytics import TimetableAnalyzer
+from ..core.components import ComponentSolver, component_solver
+from ..core.indexed_timetable import IndexedTimetable
+from ..core.lns import LNSOptimizer
+from ..core.model_cache import model_cache
+from ..core.optimizer import SolutionListener, TimetableOptimizer
+from ..core.solve_control import SolveControl
+from ..core.validator import TimetableValidator
+from .job_manager import JobManager, job_manager
+from .solution_cache import SolutionCache, solution_cache, request_key
+from .timetable_store import TimetableStore, timetable_store
+from ..database.csv_loader import CSVDataLoader, DatasetCache
 from ..schemas.timetable import (
     Teacher, Room, Subject, Class, TimeSlot, 
     TimetableConstraints, TimetableEntry, GeneratedTimetable,
-    TimetableGenerationRequest, UpdateTimetableRequest, TimetableAnalytics
+    TimetableGenerationRequest, UpdateTimetableRequest, TimetableAnalytics,
+    SolveMode, TimetableChange, ChangeType, SolveProgress, TimetableJob, TimetableValidation
 )
 
 class TimetableService:
-    """Service layer for timetable operations"""
+    """
+    Service layer for timetable operations.
     
-    def __init__(self):
-        self.optimizer = TimetableOptimizer()
+    One service is shared by all requests (see timetable_service), so every
+    solve gets an optimizer of its own.
+    """
+    
+    def __init__(
+        self,
+        jobs: JobManager = job_manager,
+        solutions: SolutionCache = solution_cache,
+        components: ComponentSolver = component_solver,
+        store: TimetableStore = timetable_store
+    ):
+        self.jobs = jobs
+        self.solutions = solutions
+        self.components = components
+        # Saved timetables with the inputs each was generated from, and the
+        # availability changes applied to it since, so it can be repaired
+        # incrementally
+        self.store = store
         # Set the correct path to the datasets directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
         datasets_dir = os.path.abspath(os.path.join(current_dir, "../../../datasets"))
         self.data_loader = CSVDataLoader(data_dir=datasets_dir)
-        # In a real implementation, this would be a database
-        self.saved_timetables: Dict[str, GeneratedTimetable] = {}
+        # Parsed CSV data, only parsed again when a file changes
+        self.datasets = DatasetCache(self.data_loader)
+        # Updates read, edit and save a stored timetable in worker threads
+        self._update_lock = threading.Lock()
     
     async def load_data(self):
         """Load data from CSV files"""
-        return self.data_loader.load_all_data()
+        return self.datasets.load_all_data()
     
     async def generate_timetable(
-        self, request: TimetableGenerationRequest, time_limit_seconds: int = 60
+        self,
+        request: TimetableGenerationRequest,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC,
+        bypass_cache: bool = False,
+        split_components: bool = False
     ) -> Dict[str, str | GeneratedTimetable]:
         """
         Generate a timetable based on the given constraints and requirements
         
+        An identical request solved before with the same time limit and mode
+        returns its timetable from the solution cache without solving.
+        
         Args:
             request: The timetable generation request
             time_limit_seconds: Time limit for the solver
+            mode: Solve mode passed to the optimizer
+            bypass_cache: Solve again even if the request is cached
+            split_components: Solve groups of classes that share no teachers
+                or rooms as separate models in worker processes
             
         Returns:
             Dictionary containing the timetable ID and the generated timetable
         """
-        # If no data provided, try to load from CSV files
+        # Solve in a worker thread so the event loop keeps serving requests
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._generate_timetable, request, time_limit_seconds, mode, None,
+            bypass_cache, split_components
+        )
+    
+    async def stream_timetable(
+        self,
+        request: TimetableGenerationRequest,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC,
+        bypass_cache: bool = False,
+        split_components: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate a timetable and stream every improving solution as it is found
+        
+        The solver runs in a worker thread and its solutions are passed back
+        to the event loop through a queue.
+        
+        Args:
+            request: The timetable generation request
+            time_limit_seconds: Time limit for the solver
+            mode: Solve mode passed to the optimizer
+            bypass_cache: Solve again even if the request is cached
+            split_components: Solve independent groups of classes separately;
+                their solutions are not streamed, only the merged timetable
+            
+        Yields:
+            ("solution", SolveProgress) for each improving solution, then
+            ("done", {"id": ..., "timetable": ...}) or ("error", {"detail": ...})
+        
+        If the consumer stops listening, e.g. because the client disconnected,
+        the solve is stopped.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        control = SolveControl()
+        
+        def publish(progress: SolveProgress):
+            loop.call_soon_threadsafe(queue.put_nowait, progress)
+        
+        future = loop.run_in_executor(
+            None, self._generate_timetable, request, time_limit_seconds, mode, publish,
+            bypass_cache, split_components, control
+        )
+        future.add_done_callback(lambda _: queue.put_nowait(None))
+        
+        try:
+            while True:
+                progress = await queue.get()
+                if progress is None:
+                    break
+                yield "solution", progress.model_dump()
+            
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e)}
+            if "error" in result:
+                yield "error", {"detail": result["error"]}
+            else:
+                yield "done", result
+        finally:
+            # No-op once the solve has finished
+            control.cancel()
+    
+    def _prepare_request(
+        self, request: TimetableGenerationRequest
+    ) -> Tuple[Optional[GeneratedTimetable], Optional[str]]:
+        """
+        Fill in missing data from the CSV files and validate a generation request
+        
+        Returns:
+            Tuple of (base timetable to warm-start from or None, error message or None)
+        """
+        # If no data provided, try to load from CSV files. The cached entities
+        # are shared, and requests are stored and edited, so each gets copies
         if not request.teachers and not request.rooms and not request.subjects and not request.classes:
-            data = await self.load_data()
-            request.teachers = data['teachers']
-            request.rooms = data['rooms']
-            request.subjects = data['subjects']
-            request.classes = data['classes']
+            data = self.datasets.load_all_data()
+            request.teachers = [teacher.model_copy(deep=True) for teacher in data['teachers']]
+            request.rooms = [room.model_copy(deep=True) for room in data['rooms']]
+            request.subjects = [subject.model_copy(deep=True) for subject in data['subjects']]
+            request.classes = [class_.model_copy(deep=True) for class_ in data['classes']]
             
         # Validate input data
         # This is a basic validation; in a real system, we would do more extensive validation
         if not request.teachers:
-            return {"error": "No teachers provided"}
+            return None, "No teachers provided"
         if not request.rooms:
-            return {"error": "No rooms provided"}
+            return None, "No rooms provided"
         if not request.subjects:
-            return {"error": "No subjects provided"}
+            return None, "No subjects provided"
         if not request.classes:
-            return {"error": "No classes provided"}
+            return None, "No classes provided"
+        
+        # Warm-start from a previous timetable if one was given
+        base_timetable = None
+        if request.base_timetable_id:
+            base_timetable = self.store.get_timetable(request.base_timetable_id)
+            if base_timetable is None:
+                return None, f"Base timetable with ID {request.base_timetable_id} not found"
+        
+        return base_timetable, None
+    
+    def _generate_timetable(
+        self,
+        request: TimetableGenerationRequest,
+        time_limit_seconds: int,
+        mode: SolveMode,
+        on_solution: Optional[SolutionListener] = None,
+        bypass_cache: bool = False,
+        split_components: bool = False,
+        control: Optional[SolveControl] = None
+    ) -> Dict[str, str | GeneratedTimetable]:
+        """
+        Validate the request, solve it unless it is cached, and save the timetable
+        
+        A solve stopped through control saves its best timetable so far but
+        is not cached. Split components run in worker processes and cannot
+        be stopped.
+        """
+        base_timetable, error = self._prepare_request(request)
+        if error:
+            return {"error": error}
+        
+        cache_key = request_key(request, time_limit_seconds, mode, split_components, base_timetable)
+        timetable = None if bypass_cache else self.solutions.get(cache_key)
+        if timetable is not None:
+            timetable.stats["solution_cache_hit"] = 1.0
+            return self._save_generated(request, timetable)
             
-        # Generate the timetable
-        timetable = self.optimizer.solve(
+        # Generate the timetable; independent parts of the request are solved
+        # in worker processes and large neighbourhood search has its own
+        # driver. Optimizers rehydrate models built from identical inputs
+        # from disk
+        optimizer_class = LNSOptimizer if mode == SolveMode.LNS else TimetableOptimizer
+        if split_components:
+            optimizer = self.components
+        else:
+            optimizer = optimizer_class(on_solution=on_solution, control=control, model_cache=model_cache)
+        timetable = optimizer.solve(
             teachers=request.teachers,
             rooms=request.rooms,
             subjects=request.subjects,
             classes=request.classes,
             constraints=request.constraints,
-            time_limit_seconds=time_limit_seconds
+            time_limit_seconds=time_limit_seconds,
+            mode=mode,
+            solver_parameters=request.solver_parameters,
+            base_timetable=base_timetable,
+            repair_hint=request.hint_repair
         )
-        
-        # Save the timetable
+        timetable.stats["solution_cache_hit"] = 0.0
+        # A stopped solve may not have found its best timetable
+        if control is None or not control.cancelled:
+            self.solutions.put(cache_key, timetable)
+        return self._save_generated(request, timetable)
+    
+    def _save_generated(
+        self, request: TimetableGenerationRequest, timetable: GeneratedTimetable
+    ) -> Dict[str, str | GeneratedTimetable]:
+        """Save a generated timetable with the request it came from under a new ID"""
         timetable_id = str(uuid.uuid4())
-        self.saved_timetables[timetable_id] = timetable
+        self.store.put(timetable_id, timetable, request)
         
         return {"id": timetable_id, "timetable": timetable}
     
+    async def get_solution_cache_stats(self) -> Dict[str, float]:
+        """
+        Get the size and hit/miss counters of the solution cache
+        
+        Returns:
+            Dictionary of cache statistics
+        """
+        return self.solutions.stats()
+    
+    async def get_store_stats(self) -> Dict[str, float]:
+        """
+        Get the size and hit/miss counters of the timetable store
+        
+        Returns:
+            Dictionary of store statistics
+        """
+        return self.store.stats()
+    
+    async def submit_job(
+        self,
+        request: TimetableGenerationRequest,
+        time_limit_seconds: int = 60,
+        mode: SolveMode = SolveMode.MONOLITHIC
+    ) -> Dict[str, str | TimetableJob]:
+        """
+        Queue a timetable generation job to run in a worker process
+        
+        Args:
+            request: The timetable generation request
+            time_limit_seconds: Time limit for the solver
+            mode: Solve mode passed to the optimizer
+            
+        Returns:
+            Dictionary containing the job, or an error
+        """
+        base_timetable, error = self._prepare_request(request)
+        if error:
+            return {"error": error}
+        return {"job": self.jobs.submit(request, time_limit_seconds, mode, base_timetable)}
+    
+    async def get_job(self, job_id: str) -> Optional[TimetableJob]:
+        """
+        Get a generation job and its status
+        
+        Args:
+            job_id: The ID of the job
+            
+        Returns:
+            The job if found, None otherwise
+        """
+        return self.jobs.get(job_id)
+    
+    async def cancel_job(self, job_id: str) -> Optional[TimetableJob]:
+        """
+        Cancel a generation job; a running job keeps its best timetable so far
+        
+        Args:
+            job_id: The ID of the job
+            
+        Returns:
+            The job if found, None otherwise
+        """
+        return self.jobs.cancel(job_id)
+    
+    async def set_job_time_limit(self, job_id: str, time_limit_seconds: int) -> Optional[TimetableJob]:
+        """
+        Extend or shrink the time limit of a queued or running job
+        
+        Args:
+            job_id: The ID of the job
+            time_limit_seconds: New time limit, counted from when the job started
+            
+        Returns:
+            The job if found, None otherwise
+        """
+        return self.jobs.set_time_limit(job_id, time_limit_seconds)
+    
+    async def get_job_result(self, job_id: str) -> Optional[GeneratedTimetable]:
+        """
+        Get the timetable of a completed job; it is saved under the job ID
+        
+        Args:
+            job_id: The ID of the job
+            
+        Returns:
+            The timetable if the job completed, None otherwise
+        """
+        timetable = self.jobs.result(job_id)
+        if timetable is not None and job_id not in self.store:
+            self.store.put(job_id, timetable, self.jobs.request(job_id))
+        return timetable
+    
     async def get_timetable(self, timetable_id: str) -> Optional[GeneratedTimetable]:
         """
         Get a previously generated timetable by ID
@@ -85,53 +355,155 @@ class TimetableService:
         Returns:
             The timetable if found, None otherwise
         """
-        return self.saved_timetables.get(timetable_id)
+        return self.store.get_timetable(timetable_id)
     
     async def update_timetable(
-        self, request: UpdateTimetableRequest
+        self, request: UpdateTimetableRequest, time_limit_seconds: float = 10
     ) -> Dict[str, str | GeneratedTimetable]:
         """
         Update a previously generated timetable
         
+        Lessons can be moved to a free cell ({"type": "move_class", "class_id":
+        ..., "from": {"day": ..., "slot": ...}, "to": {...}}) or swapped with
+        another lesson of the class ("swap_classes"), where a slot is an index
+        or a start time such as "09:00". The batch is rejected as a whole if
+        any of them double-books a class, teacher or room.
+        
+        Besides moving entries by hand, updates can mark a teacher or room as
+        unavailable ({"type": "teacher_unavailable", "teacher_id": ..., "days":
+        [...], "slots": [...]}). The timetable is then repaired with as few
+        changed entries as possible, keeping every untouched entry in place.
+        
         Args:
             request: The update request
+            time_limit_seconds: Time limit for repairing availability changes
             
         Returns:
             Dictionary containing the timetable ID and the updated timetable
         """
+        # Repair in a worker thread so the event loop keeps serving requests
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._update_timetable, request, time_limit_seconds
+        )
+    
+    def _update_timetable(
+        self, request: UpdateTimetableRequest, time_limit_seconds: float
+    ) -> Dict[str, str | GeneratedTimetable]:
+        """Apply an update to a saved timetable; updates run one at a time"""
+        with self._update_lock:
+            return self._apply_update(request, time_limit_seconds)
+    
+    def _apply_update(
+        self, request: UpdateTimetableRequest, time_limit_seconds: float
+    ) -> Dict[str, str | GeneratedTimetable]:
         timetable_id = request.timetable_id
-        if timetable_id not in self.saved_timetables:
+        stored = self.store.get(timetable_id)
+        if stored is None:
             return {"error": f"Timetable with ID {timetable_id} not found"}
         
         # Get the existing timetable
-        timetable = self.saved_timetables[timetable_id]
+        timetable = stored.timetable
+        all_changes = stored.changes
+        changes = []
         
-        # Apply updates (this is a simplified version)
-        # In a real system, we would have more complex update logic
-        for update in request.updates:
-            # Example update: {"type": "move_class", "class_id": "c1", "from": {...}, "to": {...}}
-            if update.get("type") == "move_class":
+        # Moves and swaps are applied to an indexed copy, so the saved
+        # timetable is untouched if any of them clashes
+        edits = [update for update in request.updates if update.get("type") in ("move_class", "swap_classes")]
+        if edits:
+            constraints = stored.request.constraints if stored.request is not None else None
+            try:
+                indexed = IndexedTimetable(timetable.model_copy(deep=True), constraints)
+            except ValueError as e:
+                return {"error": f"Timetable {timetable_id} cannot be edited: {str(e)}"}
+            errors = []
+            for update in edits:
                 class_id = update.get("class_id")
-                from_day = update.get("from", {}).get("day")
-                from_slot = update.get("from", {}).get("slot")
-                to_day = update.get("to", {}).get("day")
-                to_slot = update.get("to", {}).get("slot")
-                
-                # Find the entry to move
-                if class_id in timetable.class_timetables:
-                    class_tt = timetable.class_timetables[class_id]
-                    for i, entry in enumerate(class_tt.entries):
-                        if entry.day == from_day and entry.slot == from_slot:
-                            # Update the entry
-                            class_tt.entries[i].day = to_day
-                            class_tt.entries[i].slot = to_slot
-                            break
+                try:
+                    # {"type": "move_class", "class_id": "C001", "from": {"day": 0, "slot": "08:00"}, "to": {"day": 1, "slot": 2}}
+                    entry_idx = indexed.lesson_at(class_id, update.get("from"))
+                    if update["type"] == "move_class":
+                        indexed.move(entry_idx, *indexed.position(update.get("to")))
+                    # {"type": "swap_classes", "class_id": "C001", "from": {...}, "to": {...}}
+                    else:
+                        indexed.swap(entry_idx, indexed.lesson_at(class_id, update.get("to")))
+                except ValueError as e:
+                    errors.append(str(e))
+            if errors:
+                return {"error": "; ".join(errors)}
+            timetable = indexed.timetable
+        
+        # Example update: {"type": "teacher_unavailable", "teacher_id": "T001", "days": [0]}
+        for update in request.updates:
+            if update.get("type") in {change_type.value for change_type in ChangeType}:
+                changes.append(TimetableChange(**update))
+        
+        # Repair the timetable around teachers and rooms that became unavailable
+        if changes:
+            generation_request = stored.request
+            if generation_request is None:
+                return {"error": f"Inputs of timetable {timetable_id} are not available for re-solving"}
+            all_changes = stored.changes + changes
+            try:
+                repaired = TimetableOptimizer().resolve(
+                    teachers=generation_request.teachers,
+                    rooms=generation_request.rooms,
+                    subjects=generation_request.subjects,
+                    classes=generation_request.classes,
+                    constraints=generation_request.constraints,
+                    base_timetable=timetable,
+                    changes=all_changes,
+                    time_limit_seconds=time_limit_seconds,
+                    solver_parameters=generation_request.solver_parameters
+                )
+            except ValueError as e:
+                return {"error": str(e)}
+            if repaired.conflicts:
+                return {"error": "; ".join(repaired.conflicts)}
+            timetable = repaired
         
         # Save the updated timetable
-        self.saved_timetables[timetable_id] = timetable
+        self.store.put(timetable_id, timetable, stored.request, all_changes)
         
         return {"id": timetable_id, "timetable": timetable}
     
+    async def validate_timetable(self, timetable_id: str) -> TimetableValidation:
+        """
+        Check a saved timetable against the hard constraints of the inputs it
+        was generated from and the availability changes applied since
+        
+        Args:
+            timetable_id: The ID of the timetable to validate
+            
+        Returns:
+            TimetableValidation listing every violation found
+            
+        Raises:
+            ValueError: If the timetable or its inputs are not found
+        """
+        stored = self.store.get(timetable_id)
+        if stored is None:
+            raise ValueError(f"Timetable with ID {timetable_id} not found")
+        request = stored.request
+        if request is None:
+            raise ValueError(f"Inputs of timetable {timetable_id} are not available for validation")
+        
+        start_time = time.perf_counter()
+        validator = TimetableValidator(
+            request.teachers, request.rooms, request.subjects, request.classes,
+            request.constraints, stored.changes
+        )
+        violations = validator.validate(stored.timetable)
+        return TimetableValidation(
+            timetable_id=timetable_id,
+            valid=not violations,
+            violations=violations,
+            stats={
+                "entries": float(sum(len(class_tt.entries) for class_tt in stored.timetable.class_timetables.values())),
+                "violations": float(len(violations)),
+                "validation_time": time.perf_counter() - start_time,
+            }
+        )
+    
     async def analyze_timetable(self, timetable_id: str) -> TimetableAnalytics:
         """
         Analyze a timetable and generate statistics
@@ -142,40 +514,25 @@ class TimetableService:
         Returns:
             TimetableAnalytics object with statistics
         """
-        if timetable_id not in self.saved_timetables:
+        stored = self.store.get(timetable_id)
+        if stored is None:
             raise ValueError(f"Timetable with ID {timetable_id} not found")
         
-        timetable = self.saved_timetables[timetable_id]
-        
-        # Calculate teacher utilization
-        teacher_utilization = {}
-        for teacher_id, teacher_tt in timetable.teacher_timetables.items():
-            # Simple utilization: number of classes / total possible slots
-            total_slots = 5 * 8  # Assuming 5 days, 8 hours per day
-            teacher_utilization[teacher_id] = len(teacher_tt.entries) / total_slots
-        
-        # Calculate room utilization
-        room_utilization = {}
-        for room_id, room_entries in timetable.room_allocations.items():
-            total_slots = 5 * 8  # Assuming 5 days, 8 hours per day
-            room_utilization[room_id] = len(room_entries) / total_slots
-        
-        # Calculate free periods distribution
-        free_periods = {}
-        for class_id, class_tt in timetable.class_timetables.items():
-            # Count free periods for each class
-            # This is a simplification - in a real system, we would have more detailed analysis
-            total_slots = 5 * 8  # Assuming 5 days, 8 hours per day
-            free_periods[class_id] = total_slots - len(class_tt.entries)
-        
-        # Calculate overall efficiency score (simple average of utilizations)
-        efficiency_score = (sum(teacher_utilization.values()) + sum(room_utilization.values())) / (
-            len(teacher_utilization) + len(room_utilization)
-        ) if teacher_utilization and room_utilization else 0
-        
-        return TimetableAnalytics(
-            teacher_utilization=teacher_utilization,
-            room_utilization=room_utilization,
-            free_periods_distribution=free_periods,
-            efficiency_score=efficiency_score
-        ) 
\ No newline at end of file
+        # Use the real days and slots, and report idle teachers and rooms too
+        start_time = time.perf_counter()
+        request = stored.request
+        analyzer = TimetableAnalyzer()
+        if request is not None:
+            analyzer = TimetableAnalyzer(
+                constraints=request.constraints,
+                class_ids=[class_.id for class_ in request.classes],
+                teacher_ids=[teacher.id for teacher in request.teachers],
+                room_ids=[room.id for room in request.rooms]
+            )
+        analytics = analyzer.analyze(stored.timetable)
+        analytics.stats["analysis_time"] = time.perf_counter() - start_time
+        return analytics
+
+
+# Process-wide service shared by all routers
+timetable_service = TimetableService()
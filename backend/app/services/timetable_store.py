@@ -0,0 +1,253 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+
+from ..core.private_directory import default_directory, private_directory
+from ..schemas.timetable import GeneratedTimetable, TimetableGenerationRequest, TimetableChange
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class StoredTimetable:
+    """A saved timetable with the request it was generated from and the availability changes applied since"""
+
+    def __init__(
+        self,
+        timetable: GeneratedTimetable,
+        request: Optional[TimetableGenerationRequest] = None,
+        changes: Optional[List[TimetableChange]] = None
+    ):
+        self.timetable = timetable
+        self.request = request
+        self.changes = changes or []
+
+    def to_json(self) -> bytes:
+        return json.dumps({
+            "timetable": self.timetable.model_dump(mode="json"),
+            "request": self.request.model_dump(mode="json") if self.request is not None else None,
+            "changes": [change.model_dump(mode="json") for change in self.changes],
+        }, separators=(",", ":")).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "StoredTimetable":
+        content = json.loads(data)
+        return cls(
+            GeneratedTimetable.model_validate(content["timetable"]),
+            TimetableGenerationRequest.model_validate(content["request"]) if content["request"] is not None else None,
+            [TimetableChange.model_validate(change) for change in content["changes"]]
+        )
+
+
+class TimetableStore:
+    """
+    Process-wide repository of saved timetables.
+
+    Timetables live in an in-memory LRU tier bounded by the size of their
+    serialized JSON, backed by a write-behind tier on disk: saving a
+    timetable only queues its JSON, and a writer thread persists it. A
+    timetable evicted from memory, or saved by an earlier process, is read
+    back from disk on its next use. Timetables are shared, not copied, so
+    an edited timetable must be saved again to be persisted.
+
+    The directory is private to the user running the server: it is created
+    with mode 0700, and a directory owned by another user is neither read
+    nor written.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Args:
+            directory: Where timetables are persisted. Defaults to the
+                TIMETABLE_STORE_DIR environment variable, or a per-user
+                directory under the system temp directory.
+            max_bytes: Size of the in-memory tier. Defaults to the
+                TIMETABLE_STORE_MAX_BYTES environment variable, or 64 MiB.
+        """
+        self.directory = directory or os.getenv("TIMETABLE_STORE_DIR") or default_directory("timetable_store")
+        self.max_bytes = max_bytes or int(os.getenv("TIMETABLE_STORE_MAX_BYTES", 64 * 1024 * 1024))
+        self.entries: "OrderedDict[str, StoredTimetable]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_reads = 0
+        self.disk_writes = 0
+        self._lock = threading.Lock()
+
+        # Latest unwritten JSON per timetable; the queue only carries IDs
+        self._pending: Dict[str, bytes] = {}
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    def _path(self, timetable_id: str) -> str:
+        # IDs are generated UUIDs or job IDs; keep only path-safe characters
+        safe_id = "".join(char for char in timetable_id if char.isalnum() or char in "-_")
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def get(self, timetable_id: str) -> Optional[StoredTimetable]:
+        """Get a saved timetable from memory or disk, or None"""
+        with self._lock:
+            stored = self.entries.get(timetable_id)
+            if stored is not None:
+                self.entries.move_to_end(timetable_id)
+                self.hits += 1
+                return stored
+            pending = self._pending.get(timetable_id)
+
+        # Evicted before the writer got to it, or only on disk
+        data = pending
+        if data is None:
+            if not private_directory(self.directory, create=False):
+                with self._lock:
+                    self.misses += 1
+                return None
+            try:
+                with open(self._path(timetable_id), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                with self._lock:
+                    self.misses += 1
+                return None
+        try:
+            stored = StoredTimetable.from_json(data)
+        except Exception as e:
+            logger.warning(f"Discarding unreadable stored timetable {timetable_id}: {str(e)}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if pending is None:
+                self.disk_reads += 1
+            self.hits += 1
+            self._remember(timetable_id, stored, len(data))
+        return stored
+
+    def get_timetable(self, timetable_id: str) -> Optional[GeneratedTimetable]:
+        stored = self.get(timetable_id)
+        return stored.timetable if stored is not None else None
+
+    def __contains__(self, timetable_id: str) -> bool:
+        return self.get(timetable_id) is not None
+
+    def put(
+        self,
+        timetable_id: str,
+        timetable: GeneratedTimetable,
+        request: Optional[TimetableGenerationRequest] = None,
+        changes: Optional[List[TimetableChange]] = None
+    ):
+        """Save a timetable in memory and queue it to be written to disk"""
+        stored = StoredTimetable(timetable, request, changes)
+        data = stored.to_json()
+        with self._lock:
+            self._remember(timetable_id, stored, len(data))
+            queued = timetable_id in self._pending
+            self._pending[timetable_id] = data
+            self._start_writer()
+        if not queued:
+            self._queue.put(timetable_id)
+
+    def _remember(self, timetable_id: str, stored: StoredTimetable, size: int):
+        """Keep a timetable in memory, evicting the least recently used beyond max_bytes"""
+        self.bytes -= self.sizes.pop(timetable_id, 0)
+        self.entries[timetable_id] = stored
+        self.entries.move_to_end(timetable_id)
+        self.sizes[timetable_id] = size
+        self.bytes += size
+        # The newest timetable stays even if it alone exceeds the budget
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            evicted, _ = self.entries.popitem(last=False)
+            self.bytes -= self.sizes.pop(evicted)
+
+    def _start_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_behind, name="timetable-store-writer", daemon=True)
+            self._writer.start()
+
+    def _write_behind(self):
+        """Persist queued timetables until told to stop"""
+        while True:
+            timetable_id = self._queue.get()
+            try:
+                if timetable_id is None:
+                    return
+                with self._lock:
+                    data = self._pending.get(timetable_id)
+                if data is not None:
+                    self._write(timetable_id, data)
+                    with self._lock:
+                        self.disk_writes += 1
+                        if self._pending.get(timetable_id) is data:
+                            del self._pending[timetable_id]
+                        else:
+                            # Saved again while being written: write the newer one too
+                            self._queue.put(timetable_id)
+            except Exception as e:
+                logger.error(f"Failed to persist timetable {timetable_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, timetable_id: str, data: bytes):
+        if not private_directory(self.directory, create=True):
+            raise PermissionError(f"{self.directory} is not a private directory of this user")
+        # Write to a temporary file first so readers never see half a timetable
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._path(timetable_id))
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def flush(self):
+        """Wait until every saved timetable is on disk"""
+        self._queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+    def clear(self):
+        """Forget every timetable in memory and on disk"""
+        self.flush()
+        with self._lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes = 0
+        if private_directory(self.directory, create=False):
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": float(len(self.entries)),
+                "bytes": float(self.bytes),
+                "max_bytes": float(self.max_bytes),
+                "pending_writes": float(len(self._pending)),
+                "hits": float(self.hits),
+                "misses": float(self.misses),
+                "disk_reads": float(self.disk_reads),
+                "disk_writes": float(self.disk_writes),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide timetable store shared by all requests and routers
+timetable_store = TimetableStore()
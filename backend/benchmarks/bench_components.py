@@ -0,0 +1,55 @@
+"""
+Compare solving a district of independent schools as one model with solving
+each school as a separate component in parallel worker processes, timing
+each until its first full timetable.
+
+Run from the backend directory:
+    python -m benchmarks.bench_components --schools 2 4 8 --classes 10 --mode decomposed
+"""
+import argparse
+import logging
+
+from app.core.components import ComponentSolver
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import SolveMode, SolverParameters
+from benchmarks.instances import build_district
+
+
+def run(schools, classes, workers, mode, time_limit):
+    solver = ComponentSolver(max_workers=workers)
+    parameters = SolverParameters(stop_after_first_solution=True)
+    print(
+        f"{'schools':>7} {'classes':>7} {'single_s':>8} {'single_obj':>10} "
+        f"{'split_s':>8} {'split_obj':>9} {'speedup':>7}"
+    )
+    try:
+        for count in schools:
+            district = build_district(num_schools=count, classes_per_school=classes)
+            mono = TimetableOptimizer().solve(
+                time_limit_seconds=time_limit, mode=mode,
+                solver_parameters=parameters, **district
+            )
+            split = solver.solve(
+                time_limit_seconds=time_limit, mode=mode,
+                solver_parameters=parameters, **district
+            )
+            mono_time, split_time = mono.stats["solve_time"], split.stats["solve_time"]
+            print(
+                f"{count:>7} {len(district['classes']):>7} {mono_time:>8.2f} "
+                f"{mono.stats.get('objective_value') or 0:>10.0f} {split_time:>8.2f} "
+                f"{split.stats['objective_value']:>9.0f} {mono_time / max(split_time, 1e-9):>6.1f}x"
+            )
+    finally:
+        solver.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--schools", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", type=SolveMode, default=SolveMode.DECOMPOSED)
+    parser.add_argument("--time-limit", type=int, default=120)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.schools, args.classes, args.workers, args.mode, args.time_limit)
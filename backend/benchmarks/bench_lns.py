@@ -0,0 +1,43 @@
+"""
+Compare large neighbourhood search with a single decomposed solve on
+synthetic schools: objective reached within the same time limit.
+
+Run from the backend directory:
+    python -m benchmarks.bench_lns --sizes 10 20 --time-limit 30
+"""
+import argparse
+import logging
+
+from app.core.lns import LNSOptimizer
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import SolveMode
+from benchmarks.instances import build_school
+
+
+def run(sizes, time_limit, sub_time_limit):
+    print(f"{'classes':>7} {'solver':>10} {'first':>9} {'objective':>9} {'iterations':>10} {'total_s':>8}  status")
+    for size in sizes:
+        school = build_school(num_classes=size)
+        solvers = [
+            ("decomposed", TimetableOptimizer(), SolveMode.DECOMPOSED),
+            ("lns", LNSOptimizer(sub_time_limit_seconds=sub_time_limit), SolveMode.LNS),
+        ]
+        for label, optimizer, mode in solvers:
+            timetable = optimizer.solve(time_limit_seconds=time_limit, mode=mode, **school)
+            stats = timetable.stats
+            status = "ok" if not timetable.conflicts else "no solution"
+            print(
+                f"{size:>7} {label:>10} {stats.get('lns_initial_objective', stats.get('objective_value', 0)):>9.0f} "
+                f"{stats.get('objective_value', 0):>9.0f} {stats.get('lns_iterations', 0):>10.0f} "
+                f"{stats.get('solve_time', 0):>8.2f}  {status}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20])
+    parser.add_argument("--time-limit", type=int, default=30)
+    parser.add_argument("--sub-time-limit", type=float, default=1.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.sizes, args.time_limit, args.sub_time_limit)
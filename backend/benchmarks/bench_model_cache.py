@@ -0,0 +1,47 @@
+"""
+Measure model build time with and without the on-disk model cache.
+
+Each school is built once to fill the cache and again from it; the model
+is solved until its first solution so the build dominates.
+
+Run from the backend directory:
+    python -m benchmarks.bench_model_cache --sizes 10 20 40
+"""
+import argparse
+import logging
+import tempfile
+
+from app.core.model_cache import ModelCache
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import SolveMode, SolverParameters
+from benchmarks.instances import build_school
+
+
+def run(sizes, time_limit):
+    print(f"{'classes':>7} {'variables':>9} {'cold_build_s':>12} {'cached_build_s':>14} {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ModelCache(directory)
+        parameters = SolverParameters(stop_after_first_solution=True)
+        for size in sizes:
+            school = build_school(num_classes=size)
+            build_times = []
+            for _ in range(2):
+                timetable = TimetableOptimizer(model_cache=cache).solve(
+                    time_limit_seconds=time_limit, mode=SolveMode.MONOLITHIC,
+                    solver_parameters=parameters, **school
+                )
+                build_times.append(timetable.stats["build_time"])
+            cold, cached = build_times
+            print(
+                f"{size:>7} {timetable.stats['num_variables']:>9.0f} {cold:>12.3f} "
+                f"{cached:>14.3f} {cold / max(cached, 1e-9):>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--time-limit", type=int, default=60)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.sizes, args.time_limit)
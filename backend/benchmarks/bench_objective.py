@@ -0,0 +1,41 @@
+"""
+Measure how the room-stickiness objective affects model building and
+solving in monolithic mode on synthetic schools.
+
+Run from the backend directory:
+    python -m benchmarks.bench_objective --sizes 4 5 10 --time-limit 30
+"""
+import argparse
+import logging
+
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import SolveMode, SolverParameters
+from benchmarks.instances import build_school
+
+
+def run(sizes, time_limit, seed):
+    parameters = SolverParameters(random_seed=seed, num_workers=1)
+    print(f"{'classes':>7} {'variables':>10} {'build_s':>8} {'first_s':>8} {'total_s':>8} {'objective':>9} {'bound':>7}  status")
+    for size in sizes:
+        school = build_school(num_classes=size)
+        timetable = TimetableOptimizer().solve(
+            time_limit_seconds=time_limit, mode=SolveMode.MONOLITHIC, solver_parameters=parameters, **school
+        )
+        stats = timetable.stats
+        first = stats.get("first_solution_time")
+        status = "ok" if not timetable.conflicts else "no solution"
+        print(
+            f"{size:>7} {stats.get('num_variables', 0):>10.0f} {stats.get('build_time', 0):>8.2f} "
+            f"{first if first is not None else float('nan'):>8.2f} {stats.get('solve_time', 0):>8.2f} "
+            f"{stats.get('objective_value', 0):>9.0f} {stats.get('solver_best_bound', 0):>7.0f}  {status}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 10])
+    parser.add_argument("--time-limit", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.sizes, args.time_limit, args.seed)
@@ -0,0 +1,48 @@
+"""
+Compare the monolithic and decomposed solve modes, with and without room
+pooling, and the greedy preview on synthetic schools.
+
+Run from the backend directory:
+    python -m benchmarks.bench_solve_modes --sizes 5 10 20 --time-limit 30
+"""
+import argparse
+import logging
+
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import SolveMode
+from benchmarks.instances import build_school
+
+
+# (label, solve keyword arguments)
+CONFIGURATIONS = [
+    ("monolithic", {"mode": SolveMode.MONOLITHIC, "room_pooling": False}),
+    ("pooled", {"mode": SolveMode.MONOLITHIC, "room_pooling": True}),
+    ("decomposed", {"mode": SolveMode.DECOMPOSED}),
+    ("preview", {"mode": SolveMode.PREVIEW}),
+]
+
+
+def run(sizes, time_limit):
+    print(f"{'classes':>7} {'mode':>11} {'variables':>10} {'build_s':>8} {'total_s':>8} {'objective':>9}  status")
+    for size in sizes:
+        school = build_school(num_classes=size)
+        for label, options in CONFIGURATIONS:
+            timetable = TimetableOptimizer().solve(
+                time_limit_seconds=time_limit, **options, **school
+            )
+            stats = timetable.stats
+            status = "ok" if not timetable.conflicts else "no solution"
+            print(
+                f"{size:>7} {label:>11} {stats.get('num_variables', 0):>10.0f} "
+                f"{stats.get('build_time', 0):>8.2f} {stats.get('solve_time', 0):>8.3f} "
+                f"{stats.get('objective_value', 0):>9.0f}  {status}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 20])
+    parser.add_argument("--time-limit", type=int, default=30)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.sizes, args.time_limit)
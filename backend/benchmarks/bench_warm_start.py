@@ -0,0 +1,61 @@
+"""
+Measure time-to-first-feasible when re-solving from a previous timetable.
+
+A base timetable is generated for a synthetic school, then the school is
+changed slightly (one class drops a subject lesson per week, one new room)
+and re-solved cold and warm-started from the base timetable.
+
+Run from the backend directory:
+    python -m benchmarks.bench_warm_start --sizes 4 5 --time-limit 60
+"""
+import argparse
+import logging
+
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import Room, SolveMode, SolverParameters
+from benchmarks.instances import build_school
+
+
+def perturb(school):
+    """Return a copy of the school with small weekly changes"""
+    changed = {key: list(value) if isinstance(value, list) else value for key, value in school.items()}
+    last_subject = changed["subjects"][-1]
+    changed["subjects"][-1] = last_subject.model_copy(update={"hours_per_week": last_subject.hours_per_week - 1})
+    changed["rooms"].append(Room(id="R999", name="Classroom 999", capacity=35, features=["whiteboard"]))
+    return changed
+
+
+def run(sizes, time_limit, mode):
+    first_only = SolverParameters(stop_after_first_solution=True)
+    print(f"{'classes':>7} {'start':>6} {'coverage':>8} {'first_s':>8} {'total_s':>8}  status")
+    for size in sizes:
+        school = build_school(num_classes=size)
+        base = TimetableOptimizer().solve(time_limit_seconds=time_limit, mode=mode, **school)
+        if base.conflicts:
+            print(f"{size:>7} no base timetable within {time_limit} s")
+            continue
+
+        changed = perturb(school)
+        for label, hint in (("cold", None), ("warm", base)):
+            timetable = TimetableOptimizer().solve(
+                time_limit_seconds=time_limit, mode=mode, solver_parameters=first_only,
+                base_timetable=hint, repair_hint=hint is not None, **changed
+            )
+            stats = timetable.stats
+            first = stats.get("first_solution_time")
+            status = "ok" if not timetable.conflicts else "no solution"
+            print(
+                f"{size:>7} {label:>6} {stats.get('hint_coverage', 0):>8.2f} "
+                f"{first if first is not None else float('nan'):>8.2f} "
+                f"{stats.get('solve_time', 0):>8.2f}  {status}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5])
+    parser.add_argument("--time-limit", type=int, default=60)
+    parser.add_argument("--mode", type=SolveMode, default=SolveMode.MONOLITHIC)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    run(args.sizes, args.time_limit, args.mode)
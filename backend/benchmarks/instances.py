@@ -0,0 +1,145 @@
+import math
+import random
+from typing import Dict, List, Any
+
+from app.schemas.timetable import Teacher, Room, Subject, Class, TimetableConstraints
+
+# (name, hours per week, required room features)
+SUBJECT_PROFILES = [
+    ("Mathematics", 4, []),
+    ("English", 4, []),
+    ("History", 3, []),
+    ("Geography", 3, []),
+    ("Economics", 3, []),
+    ("Literature", 3, []),
+    ("Physics", 3, ["lab_equipment"]),
+    ("Chemistry", 3, ["lab_equipment"]),
+    ("Computer Science", 2, ["computers"]),
+    ("Physical Education", 2, ["sports_equipment"]),
+]
+
+
+def build_school(
+    num_classes: int = 10,
+    days_per_week: int = 5,
+    hours_per_day: int = 8,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Build a synthetic, feasible school of the given size for benchmarking.
+
+    Every class takes every subject, and teachers and rooms are scaled with the
+    number of classes so that the instance stays feasible as it grows.
+    """
+    rng = random.Random(seed)
+    subjects: List[Subject] = []
+    teachers: List[Teacher] = []
+
+    for subject_idx, (name, hours, features) in enumerate(SUBJECT_PROFILES, start=1):
+        subject_id = f"S{subject_idx:03d}"
+        # Each teacher takes at most 20 hours a week
+        num_teachers = math.ceil(num_classes * hours / 20)
+        teacher_ids = []
+        for _ in range(num_teachers):
+            teacher_id = f"T{len(teachers) + 1:03d}"
+            teachers.append(Teacher(
+                id=teacher_id,
+                name=f"{name} Teacher {len(teacher_ids) + 1}",
+                subjects=[subject_id],
+                max_hours_per_day=6
+            ))
+            teacher_ids.append(teacher_id)
+        subjects.append(Subject(
+            id=subject_id,
+            name=name,
+            hours_per_week=hours,
+            requires_features=features,
+            preferred_teachers=teacher_ids
+        ))
+
+    slots_per_week = days_per_week * hours_per_day
+    rooms: List[Room] = []
+
+    def add_rooms(count: int, name: str, capacity: int, features: List[str]):
+        for _ in range(count):
+            rooms.append(Room(
+                id=f"R{len(rooms) + 1:03d}",
+                name=f"{name} {len(rooms) + 101}",
+                capacity=capacity,
+                features=features
+            ))
+
+    add_rooms(num_classes, "Classroom", 35, ["whiteboard", "projector"])
+    add_rooms(math.ceil(num_classes * 6 / slots_per_week) + 1, "Science Lab", 35, ["lab_equipment", "whiteboard", "sink"])
+    add_rooms(math.ceil(num_classes * 2 / slots_per_week) + 1, "Computer Lab", 35, ["computers", "projector"])
+    add_rooms(math.ceil(num_classes * 2 / slots_per_week) + 1, "Gymnasium", 60, ["sports_equipment"])
+
+    classes = [
+        Class(
+            id=f"C{class_idx:03d}",
+            name=f"Class {class_idx}",
+            subjects=[subject.id for subject in subjects],
+            students_count=rng.randint(20, 32)
+        )
+        for class_idx in range(1, num_classes + 1)
+    ]
+
+    return {
+        "teachers": teachers,
+        "rooms": rooms,
+        "subjects": subjects,
+        "classes": classes,
+        "constraints": TimetableConstraints(
+            max_hours_per_day=hours_per_day, days_per_week=days_per_week
+        ),
+    }
+
+
+def build_district(
+    num_schools: int = 4,
+    classes_per_school: int = 10,
+    days_per_week: int = 5,
+    hours_per_day: int = 8
+) -> Dict[str, Any]:
+    """
+    Build several independent schools as one request.
+
+    Schools share no teachers and no rooms; their IDs are prefixed with the
+    school number (e.g. "K2-T001") so they do not collide, and every room
+    has a campus feature that the school's subjects require.
+    """
+    district: Dict[str, Any] = {"teachers": [], "rooms": [], "subjects": [], "classes": []}
+    for school_idx in range(1, num_schools + 1):
+        school = build_school(classes_per_school, days_per_week, hours_per_day, seed=school_idx)
+        prefix = f"K{school_idx}-"
+        campus = f"campus_{school_idx}"
+
+        def ids(values: List[str]) -> List[str]:
+            return [prefix + value for value in values]
+
+        district["teachers"] += [
+            teacher.model_copy(update={"id": prefix + teacher.id, "subjects": ids(teacher.subjects)})
+            for teacher in school["teachers"]
+        ]
+        district["rooms"] += [
+            room.model_copy(update={"id": prefix + room.id, "features": room.features + [campus]})
+            for room in school["rooms"]
+        ]
+        district["subjects"] += [
+            subject.model_copy(update={
+                "id": prefix + subject.id,
+                "requires_features": subject.requires_features + [campus],
+                "preferred_teachers": ids(subject.preferred_teachers)
+            })
+            for subject in school["subjects"]
+        ]
+        district["classes"] += [
+            class_.model_copy(update={
+                "id": prefix + class_.id,
+                "name": f"School {school_idx} {class_.name}",
+                "subjects": ids(class_.subjects)
+            })
+            for class_ in school["classes"]
+        ]
+        district["constraints"] = school["constraints"]
+    return district
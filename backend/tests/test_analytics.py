@@ -0,0 +1,104 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.analytics import TimetableAnalyzer
+from app.core.availability import create_time_slots
+from app.schemas.timetable import (
+    ClassTimetable, GeneratedTimetable, TeacherTimetable, TimetableConstraints, TimetableEntry
+)
+from app.services.timetable_service import TimetableService
+from app.services.timetable_store import TimetableStore
+from tests.test_solution_cache import build_request
+
+
+def build_timetable(constraints):
+    """
+    Class C001 has lessons in the first, second and fourth slot of day 0,
+    moving from R001 to R002 after the first
+    """
+    slots = create_time_slots(constraints)
+    entries = [
+        TimetableEntry(day=0, slot=slots[0], subject_id="S001", teacher_id="T001", room_id="R001", class_id="C001"),
+        TimetableEntry(day=0, slot=slots[1], subject_id="S001", teacher_id="T001", room_id="R002", class_id="C001"),
+        TimetableEntry(day=0, slot=slots[3], subject_id="S002", teacher_id="T002", room_id="R002", class_id="C001"),
+    ]
+    return GeneratedTimetable(
+        class_timetables={"C001": ClassTimetable(class_id="C001", class_name="Class 9A", entries=entries)},
+        teacher_timetables={
+            "T001": TeacherTimetable(teacher_id="T001", teacher_name="Math Teacher", entries=entries[:2]),
+            "T002": TeacherTimetable(teacher_id="T002", teacher_name="English Teacher", entries=entries[2:]),
+        },
+        room_allocations={"R001": entries[:1], "R002": entries[1:]}
+    )
+
+
+class TestTimetableAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.constraints = TimetableConstraints(max_hours_per_day=4, days_per_week=2)
+        self.timetable = build_timetable(self.constraints)
+
+    def test_statistics(self):
+        analytics = TimetableAnalyzer(self.constraints, room_ids=["R003"]).analyze(self.timetable)
+
+        self.assertEqual((analytics.days, analytics.slots_per_day), (2, 4))
+        self.assertEqual(analytics.class_utilization, {"C001": 3 / 8})
+        self.assertEqual(analytics.teacher_utilization, {"T001": 2 / 8, "T002": 1 / 8})
+        self.assertEqual(analytics.room_utilization, {"R003": 0.0, "R001": 1 / 8, "R002": 2 / 8})
+        self.assertEqual(analytics.free_periods_distribution, {"C001": 5})
+        self.assertEqual(analytics.free_periods_by_slot, {"08:00": 1, "09:00": 1, "10:00": 2, "11:00": 1})
+        self.assertEqual(analytics.class_gaps, {"C001": 1})
+        self.assertEqual(analytics.teacher_gaps, {"T001": 0, "T002": 0})
+        self.assertEqual(analytics.class_daily_hours, {"C001": [3, 0]})
+        self.assertEqual(analytics.room_daily_hours["R002"], [2, 0])
+        self.assertEqual(analytics.class_daily_spread, {"C001": 3})
+        self.assertEqual(analytics.class_room_changes, {"C001": 1})
+        self.assertEqual(analytics.teacher_room_changes, {"T001": 1, "T002": 0})
+        self.assertAlmostEqual(analytics.efficiency_score, (2 + 1 + 0 + 1 + 2) / 8 / 5)
+
+    def test_grid_follows_the_timetable(self):
+        """Without constraints the default grid is used, grown to fit the entries"""
+        self.timetable.class_timetables["C001"].entries[2].day = 6
+
+        analytics = TimetableAnalyzer().analyze(self.timetable)
+
+        self.assertEqual((analytics.days, analytics.slots_per_day), (7, 8))
+        self.assertEqual(analytics.class_daily_hours["C001"], [2, 0, 0, 0, 0, 0, 1])
+
+    def test_empty_timetable(self):
+        analytics = TimetableAnalyzer(self.constraints).analyze(
+            GeneratedTimetable(class_timetables={}, teacher_timetables={}, room_allocations={})
+        )
+        self.assertEqual(analytics.efficiency_score, 0.0)
+        self.assertEqual(analytics.free_periods_by_slot["08:00"], 0)
+
+
+class TestAnalyzeTimetable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimetableStore(self.directory.name)
+        self.service = TimetableService(store=self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_saved_timetable_uses_its_grid(self):
+        result = asyncio.run(self.service.generate_timetable(build_request(), time_limit_seconds=10, bypass_cache=True))
+        analytics = asyncio.run(self.service.analyze_timetable(result["id"]))
+
+        # Two days of four slots, seven lessons per class
+        self.assertEqual((analytics.days, analytics.slots_per_day), (2, 4))
+        self.assertEqual(analytics.free_periods_distribution, {"C001": 1, "C002": 1})
+        self.assertEqual(analytics.class_utilization, {"C001": 7 / 8, "C002": 7 / 8})
+        self.assertEqual(set(analytics.room_utilization), {"R001", "R002", "R003"})
+        self.assertIn("analysis_time", analytics.stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.compatibility import CompatibilityMatrix
+from app.core.components import ComponentSolver, find_components
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import Teacher, SolveMode
+from tests.test_optimizer import build_small_instance
+
+
+def build_two_schools():
+    """Two copies of the small school that share no teachers or rooms"""
+    teachers, rooms, subjects, classes, constraints = build_small_instance()
+    school = {"teachers": [], "rooms": [], "subjects": [], "classes": [], "constraints": constraints}
+    for prefix in ("A-", "B-"):
+        campus = f"campus_{prefix[0]}"
+
+        def ids(values):
+            return [prefix + value for value in values]
+
+        school["teachers"] += [
+            teacher.model_copy(update={"id": prefix + teacher.id, "subjects": ids(teacher.subjects)})
+            for teacher in teachers
+        ]
+        school["rooms"] += [
+            room.model_copy(update={"id": prefix + room.id, "features": room.features + [campus]})
+            for room in rooms
+        ]
+        school["subjects"] += [
+            subject.model_copy(update={
+                "id": prefix + subject.id,
+                "requires_features": subject.requires_features + [campus],
+                "preferred_teachers": ids(subject.preferred_teachers)
+            })
+            for subject in subjects
+        ]
+        school["classes"] += [
+            class_.model_copy(update={"id": prefix + class_.id, "subjects": ids(class_.subjects)})
+            for class_ in classes
+        ]
+    return school
+
+
+class TestComponents(unittest.TestCase):
+    def setUp(self):
+        self.school = build_two_schools()
+        self.solver = ComponentSolver(max_workers=2)
+
+    def tearDown(self):
+        self.solver.shutdown()
+
+    def _compatibility(self):
+        return CompatibilityMatrix(
+            self.school["teachers"], self.school["rooms"], self.school["subjects"], self.school["classes"]
+        )
+
+    def test_independent_schools_are_separate_components(self):
+        components = find_components(self._compatibility())
+
+        self.assertEqual(len(components), 2)
+        self.assertEqual([c.class_idxs.tolist() for c in components], [[0, 1], [2, 3]])
+        self.assertEqual([c.teacher_idxs.tolist() for c in components], [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual([c.room_idxs.tolist() for c in components], [[0, 1, 2], [3, 4, 5]])
+
+    def test_shared_teacher_joins_components(self):
+        """A teacher who can teach in both schools makes them one component"""
+        self.school["teachers"].append(
+            Teacher(id="T900", name="Visiting Teacher", subjects=["A-S001", "B-S001"], max_hours_per_day=4)
+        )
+        for subject in self.school["subjects"]:
+            if subject.id in ("A-S001", "B-S001"):
+                subject.preferred_teachers.append("T900")
+
+        self.assertEqual(len(find_components(self._compatibility())), 1)
+
+    def test_components_are_solved_and_merged(self):
+        timetable = self.solver.solve(time_limit_seconds=20, mode=SolveMode.MONOLITHIC, **self.school)
+
+        self.assertEqual(timetable.conflicts, [])
+        self.assertEqual(timetable.stats["components"], 2)
+        self.assertEqual(timetable.stats["component_workers"], 2)
+        self.assertEqual(set(timetable.class_timetables), {"A-C001", "A-C002", "B-C001", "B-C002"})
+        self.assertEqual(len(timetable.teacher_timetables), 6)
+        # Every lesson of a class is taught by a teacher of its own school
+        for class_id, class_timetable in timetable.class_timetables.items():
+            for entry in class_timetable.entries:
+                self.assertEqual(entry.teacher_id[:2], class_id[:2])
+
+    def test_split_solve_matches_unsplit_with_unqualified_preferred_teacher(self):
+        """A preferred but unqualified teacher both parts refer to does not break the split"""
+        self.school["teachers"].append(Teacher(id="T900", name="Trainee", subjects=[], max_hours_per_day=4))
+        for subject in self.school["subjects"]:
+            if subject.id in ("A-S002", "B-S002"):
+                subject.preferred_teachers.append("T900")
+
+        split = self.solver.solve(time_limit_seconds=20, mode=SolveMode.MONOLITHIC, **self.school)
+        unsplit = TimetableOptimizer().solve(time_limit_seconds=20, mode=SolveMode.MONOLITHIC, **self.school)
+
+        self.assertEqual(split.stats["components"], 2)
+        self.assertEqual(split.conflicts, unsplit.conflicts)
+        self.assertEqual(split.conflicts, [])
+        self.assertEqual(set(split.class_timetables), set(unsplit.class_timetables))
+
+        def hours(timetable):
+            return {teacher_id: len(teacher_tt.entries) for teacher_id, teacher_tt in timetable.teacher_timetables.items()}
+
+        self.assertEqual(hours(split), hours(unsplit))
+
+
+if __name__ == '__main__':
+    unittest.main()
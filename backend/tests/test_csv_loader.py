@@ -7,7 +7,7 @@ from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from app.database.csv_loader import CSVDataLoader
+from app.database.csv_loader import CSVDataLoader, DatasetCache
 
 
 class TestCSVLoader(unittest.TestCase):
@@ -70,6 +70,7 @@ class TestCSVLoader(unittest.TestCase):
         self.assertEqual(teachers[0].max_hours_per_day, 5)
         self.assertEqual(teachers[0].max_consecutive_classes, 2)
         self.assertEqual(len(teachers[0].unavailable_slots), 2)
+        self.assertEqual([slot.day for slot in teachers[0].unavailable_slots], [0, 4])
         
         # Check second teacher
         self.assertEqual(teachers[1].id, "T002")
@@ -88,6 +89,26 @@ class TestCSVLoader(unittest.TestCase):
         self.assertEqual(rooms[0].capacity, 30)
         self.assertEqual(rooms[0].features, ["projector", "whiteboard"])
     
+    def test_load_time_windows(self):
+        """Windows may omit the day, use one-digit hours, or spill over unquoted"""
+        with open(os.path.join(self.data_dir, "teachers.csv"), 'w') as f:
+            f.write("teacher_id,name,subjects,max_hours_per_day,max_consecutive_classes,unavailable_slots\n")
+            f.write('T001,Test Teacher,Math,5,2,Monday-8:00-9:00,Friday-15:00-16:00\n')
+            f.write('T002,Another Teacher,English,4,3,"12:00-13:00"\n')
+        with open(os.path.join(self.data_dir, "rooms.csv"), 'w') as f:
+            f.write("room_id,name,capacity,features,available_slots\n")
+            f.write('R001,Test Room,30,whiteboard,"Tuesday-09:00-12:00,3-9:00-12:00"\n')
+            f.write('R002,Another Room,25,computer,\n')
+        
+        teachers = self.loader.load_teachers()
+        rooms = self.loader.load_rooms()
+        
+        windows = [(slot.day, slot.start_time.hour, slot.end_time.hour) for slot in teachers[0].unavailable_slots]
+        self.assertEqual(windows, [(0, 8, 9), (4, 15, 16)])
+        self.assertEqual(teachers[1].unavailable_slots[0].day, None)
+        self.assertEqual([slot.day for slot in rooms[0].available_slots], [1, 3])
+        self.assertEqual(rooms[1].available_slots, [])
+    
     def test_load_subjects(self):
         """Test loading subjects from CSV"""
         subjects = self.loader.load_subjects()
@@ -131,6 +152,38 @@ class TestCSVLoader(unittest.TestCase):
         self.assertEqual(len(data['subjects']), 2)
         self.assertEqual(len(data['classes']), 2)
 
+    
+    def test_dataset_cache_shares_parsed_data(self):
+        """Repeated loads return the same immutable objects without parsing again"""
+        cache = DatasetCache(self.loader)
+        data = cache.load_all_data()
+        
+        self.assertIs(cache.load_all_data(), data)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["file_reloads"], 4)
+        self.assertIsInstance(data['teachers'], tuple)
+        with self.assertRaises(TypeError):
+            data['teachers'] = ()
+    
+    def test_dataset_cache_reloads_changed_files_only(self):
+        """Touching a file keeps the cache; changing its content reloads that file alone"""
+        cache = DatasetCache(self.loader)
+        data = cache.load_all_data()
+        rooms_csv = os.path.join(self.data_dir, "rooms.csv")
+        stat = os.stat(rooms_csv)
+        
+        os.utime(rooms_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIs(cache.load_all_data(), data)
+        self.assertEqual(cache.stats()["file_reloads"], 4)
+        
+        with open(rooms_csv, 'a') as f:
+            f.write('R003,New Room,40,"projector"\n')
+        reloaded = cache.load_all_data()
+        
+        self.assertEqual([room.id for room in reloaded['rooms']], ["R001", "R002", "R003"])
+        self.assertIs(reloaded['teachers'], data['teachers'])
+        self.assertEqual(cache.stats()["file_reloads"], 5)
+
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main() 
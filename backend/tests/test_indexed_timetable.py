@@ -0,0 +1,143 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.indexed_timetable import FREE, IndexedTimetable
+from app.core.optimizer import TimetableOptimizer
+from app.schemas.timetable import GeneratedTimetable, UpdateTimetableRequest
+from app.services.timetable_service import TimetableService
+from app.services.timetable_store import TimetableStore
+from tests.test_optimizer import build_small_instance
+from tests.test_solution_cache import build_request
+
+
+def solve_small_instance():
+    teachers, rooms, subjects, classes, constraints = build_small_instance()
+    timetable = TimetableOptimizer().solve(
+        teachers=teachers, rooms=rooms, subjects=subjects, classes=classes,
+        constraints=constraints, time_limit_seconds=10
+    )
+    # As read back from the store: the three views no longer share entries
+    return GeneratedTimetable.model_validate(timetable.model_dump()), constraints
+
+
+def free_cell(indexed, class_id):
+    """The (day, slot) a class has no lesson in"""
+    days, slots = (indexed.class_cells[indexed.class_index[class_id]] == FREE).nonzero()
+    return int(days[0]), int(slots[0])
+
+
+def swappable_pair(indexed, class_id):
+    """Two lessons of a class that can exchange cells without a clash"""
+    entry_idxs = [idx for idx, entry in enumerate(indexed.entries) if entry.class_id == class_id]
+    for first_idx in entry_idxs:
+        for second_idx in entry_idxs:
+            if first_idx < second_idx:
+                try:
+                    indexed.swap(first_idx, second_idx)
+                except ValueError:
+                    continue
+                indexed.swap(first_idx, second_idx)
+                return first_idx, second_idx
+    raise AssertionError(f"No two lessons of {class_id} can be swapped")
+
+
+def position(entry):
+    return {"day": entry.day, "slot": entry.slot.start_time.strftime("%H:%M")}
+
+
+class TestIndexedTimetable(unittest.TestCase):
+    def setUp(self):
+        timetable, constraints = solve_small_instance()
+        self.indexed = IndexedTimetable(timetable, constraints)
+
+    def test_move_updates_every_view(self):
+        day, slot_idx = free_cell(self.indexed, "C001")
+        entry_idx = next(
+            idx for idx, entry in enumerate(self.indexed.entries)
+            if entry.class_id == "C001" and not self.indexed.clashes(idx, day, slot_idx)
+        )
+        entry = self.indexed.entries[entry_idx]
+        old_day, old_slot = entry.day, self.indexed.slot_index[entry.slot.start_time]
+
+        self.indexed.move(entry_idx, day, slot_idx)
+
+        timetable = self.indexed.timetable
+        self.assertIn(entry, timetable.teacher_timetables[entry.teacher_id].entries)
+        self.assertTrue(any(e is entry for e in timetable.room_allocations[entry.room_id]))
+        self.assertEqual((entry.day, entry.slot), (day, self.indexed.time_slots[slot_idx]))
+        self.assertEqual(self.indexed.find("C001", day, slot_idx), entry_idx)
+        self.assertIsNone(self.indexed.find("C001", old_day, old_slot))
+        self.assertEqual(self.indexed.teacher_cells[self.indexed.teacher_index[entry.teacher_id], day, slot_idx], entry_idx)
+
+    def test_clashing_move_is_rejected(self):
+        """A lesson cannot move onto another lesson of its class, but can swap with it"""
+        first_idx, second_idx = swappable_pair(self.indexed, "C001")
+        second = self.indexed.entries[second_idx]
+        target = (second.day, self.indexed.slot_index[second.slot.start_time])
+
+        with self.assertRaisesRegex(ValueError, "Class C001 already has"):
+            self.indexed.move(first_idx, *target)
+        self.assertEqual(self.indexed.find("C001", *target), second_idx)
+
+        self.indexed.swap(first_idx, second_idx)
+        self.assertEqual(self.indexed.find("C001", *target), first_idx)
+
+    def test_double_booked_timetable_is_rejected(self):
+        timetable = self.indexed.timetable
+        class_tt = next(iter(timetable.class_timetables.values()))
+        class_tt.entries.append(class_tt.entries[0].model_copy())
+
+        with self.assertRaisesRegex(ValueError, "already has"):
+            IndexedTimetable(timetable)
+
+
+class TestTimetableEdits(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimetableStore(self.directory.name)
+        self.service = TimetableService(store=self.store)
+        result = asyncio.run(self.service.generate_timetable(build_request(), time_limit_seconds=10, bypass_cache=True))
+        self.timetable_id = result["id"]
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def _update(self, *updates):
+        return asyncio.run(self.service.update_timetable(
+            UpdateTimetableRequest(timetable_id=self.timetable_id, updates=list(updates))
+        ))
+
+    def test_swap_is_applied_to_every_view(self):
+        indexed = IndexedTimetable(self.store.get_timetable(self.timetable_id).model_copy(deep=True))
+        first, second = [indexed.entries[idx] for idx in swappable_pair(indexed, "C001")]
+        result = self._update({"type": "swap_classes", "class_id": "C001", "from": position(first), "to": position(second)})
+
+        updated = result["timetable"]
+        teacher_entries = updated.teacher_timetables[first.teacher_id].entries
+        self.assertIn((second.day, second.slot, first.subject_id), [(e.day, e.slot, e.subject_id) for e in teacher_entries])
+        self.assertIs(self.store.get_timetable(self.timetable_id), updated)
+
+    def test_clashing_batch_leaves_timetable_unchanged(self):
+        timetable = self.store.get_timetable(self.timetable_id)
+        before = timetable.model_dump()
+        first, second = timetable.class_timetables["C001"].entries[:2]
+
+        result = self._update(
+            {"type": "move_class", "class_id": "C001", "from": position(first), "to": {"day": 5, "slot": 0}},
+            {"type": "move_class", "class_id": "C001", "from": position(first), "to": position(second)},
+        )
+
+        self.assertIn("Invalid day 5", result["error"])
+        self.assertIn("Class C001 already has", result["error"])
+        self.assertEqual(self.store.get_timetable(self.timetable_id).model_dump(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
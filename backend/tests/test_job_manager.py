@@ -0,0 +1,95 @@
+import time
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.job_manager import JobManager
+from app.schemas.timetable import TimetableGenerationRequest, JobStatus, SolveMode
+from benchmarks.instances import build_school
+from tests.test_optimizer import build_small_instance
+
+
+class TestJobManager(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobManager(max_workers=1)
+
+    def tearDown(self):
+        self.jobs.shutdown()
+
+    def _wait(self, job_id, timeout=60):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = self.jobs.get(job_id)
+            if job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+                return job
+            time.sleep(0.1)
+        self.fail(f"Job {job_id} did not finish in {timeout} s")
+
+    def test_job_runs_in_worker_process(self):
+        """A submitted job is queued, solved in the pool and its timetable kept"""
+        teachers, rooms, subjects, classes, constraints = build_small_instance()
+        request = TimetableGenerationRequest(
+            teachers=teachers, rooms=rooms, subjects=subjects, classes=classes, constraints=constraints
+        )
+
+        job = self.jobs.submit(request, time_limit_seconds=10)
+        self.assertEqual(job.status, JobStatus.QUEUED)
+        self.assertIsNone(self.jobs.result(job.id))
+
+        job = self._wait(job.id)
+        self.assertEqual(job.status, JobStatus.COMPLETED)
+        self.assertIsNotNone(job.started_at)
+        self.assertLessEqual(job.started_at, job.finished_at)
+        timetable = self.jobs.result(job.id)
+        self.assertEqual(timetable.conflicts, [])
+        self.assertEqual(set(timetable.class_timetables), {"C001", "C002"})
+
+    def test_cancel_running_job_keeps_best_timetable(self):
+        """A cancelled job stops long before its time limit with a usable timetable"""
+        request = TimetableGenerationRequest(**build_school(3))
+
+        job = self.jobs.submit(request, time_limit_seconds=600, mode=SolveMode.LNS)
+        deadline = time.time() + 60
+        while self.jobs.get(job.id).status == JobStatus.QUEUED and time.time() < deadline:
+            time.sleep(0.1)
+        time.sleep(2)
+        self.jobs.cancel(job.id)
+
+        job = self._wait(job.id)
+        self.assertEqual(job.status, JobStatus.CANCELLED)
+        self.assertLess((job.finished_at - job.started_at).total_seconds(), 60)
+        timetable = self.jobs.result(job.id)
+        self.assertEqual(timetable.conflicts, [])
+        self.assertEqual(timetable.stats["solve_cancelled"], 1.0)
+
+    def test_finished_jobs_are_evicted(self):
+        """Only the most recently finished jobs are kept, and only until the TTL"""
+        self.jobs.max_finished_jobs = 1
+        teachers, rooms, subjects, classes, constraints = build_small_instance()
+        request = TimetableGenerationRequest(
+            teachers=teachers, rooms=rooms, subjects=subjects, classes=classes, constraints=constraints
+        )
+
+        first = self.jobs.submit(request, time_limit_seconds=10)
+        self._wait(first.id)
+        second = self.jobs.submit(request, time_limit_seconds=10)
+        self._wait(second.id)
+
+        self.assertIsNone(self.jobs.get(first.id))
+        self.assertIsNone(self.jobs.result(first.id))
+        self.assertIsNone(self.jobs.request(first.id))
+        self.assertIsNotNone(self.jobs.result(second.id))
+
+        self.jobs.finished_job_ttl_seconds = 0
+        self.assertIsNone(self.jobs.get(second.id))
+        self.assertEqual((self.jobs.jobs, self.jobs.requests, self.jobs.results, self.jobs.futures), ({}, {}, {}, {}))
+
+    def test_unknown_job(self):
+        self.assertIsNone(self.jobs.get("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
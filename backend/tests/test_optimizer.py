@@ -0,0 +1,527 @@
+import os
+import stat
+import tempfile
+import time
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.lns import LNSOptimizer
+from app.core.model_cache import ModelCache
+from app.core.optimizer import TimetableOptimizer
+from app.core.room_assignment import match_rooms
+from app.core.solve_control import SolveControl
+from app.schemas.timetable import (
+    Teacher, Room, Subject, Class, TimetableConstraints, SolveMode, SolverParameters,
+    TimetableChange, TimeWindow
+)
+from benchmarks.instances import build_school
+
+
+def build_small_instance():
+    """A small school that is solvable in well under a second"""
+    teachers = [
+        Teacher(id="T001", name="Math Teacher", subjects=["S001"], max_hours_per_day=4),
+        Teacher(id="T002", name="English Teacher", subjects=["S002"], max_hours_per_day=4),
+        Teacher(id="T003", name="Physics Teacher", subjects=["S003"], max_hours_per_day=4),
+    ]
+    rooms = [
+        Room(id="R001", name="Classroom 101", capacity=30, features=["whiteboard"]),
+        Room(id="R002", name="Classroom 102", capacity=30, features=["whiteboard"]),
+        Room(id="R003", name="Science Lab", capacity=30, features=["whiteboard", "lab_equipment"]),
+    ]
+    subjects = [
+        Subject(id="S001", name="Mathematics", hours_per_week=3, preferred_teachers=["T001"]),
+        Subject(id="S002", name="English", hours_per_week=2, preferred_teachers=["T002"]),
+        Subject(id="S003", name="Physics", hours_per_week=2,
+                requires_features=["lab_equipment"], preferred_teachers=["T003"]),
+    ]
+    classes = [
+        Class(id="C001", name="Class 9A", subjects=["S001", "S002", "S003"], students_count=25),
+        Class(id="C002", name="Class 9B", subjects=["S001", "S002", "S003"], students_count=24),
+    ]
+    constraints = TimetableConstraints(max_hours_per_day=4, days_per_week=2)
+    return teachers, rooms, subjects, classes, constraints
+
+
+class TestTimetableOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.teachers, self.rooms, self.subjects, self.classes, self.constraints = build_small_instance()
+        self.optimizer = TimetableOptimizer()
+
+    def _solve(self, **kwargs):
+        return self.optimizer.solve(
+            teachers=self.teachers,
+            rooms=self.rooms,
+            subjects=self.subjects,
+            classes=self.classes,
+            constraints=self.constraints,
+            time_limit_seconds=10,
+            **kwargs
+        )
+
+    def _assert_valid(self, timetable):
+        """Check hard constraints directly on the generated entries"""
+        entries = [e for tt in timetable.class_timetables.values() for e in tt.entries]
+        for attr in ("class_id", "teacher_id", "room_id"):
+            usage = Counter((e.day, e.slot.start_time, getattr(e, attr)) for e in entries)
+            self.assertTrue(all(count == 1 for count in usage.values()), f"double booked {attr}")
+
+        hours = Counter((e.class_id, e.subject_id) for e in entries)
+        for class_obj in self.classes:
+            for subject in self.subjects:
+                if subject.id in class_obj.subjects:
+                    self.assertEqual(hours[(class_obj.id, subject.id)], subject.hours_per_week)
+
+        rooms = {room.id: room for room in self.rooms}
+        subjects = {subject.id: subject for subject in self.subjects}
+        for entry in entries:
+            room = rooms[entry.room_id]
+            for feature in subjects[entry.subject_id].requires_features:
+                self.assertIn(feature, room.features)
+
+    def test_solve_small_instance(self):
+        """The optimizer finds a valid timetable for a small instance"""
+        timetable = self._solve()
+
+        self.assertEqual(timetable.conflicts, [])
+        self.assertEqual(set(timetable.class_timetables), {"C001", "C002"})
+        self._assert_valid(timetable)
+
+    def test_variables_are_indexed_by_integer_tuples(self):
+        """Variables are keyed by integer tuples with matching secondary indexes"""
+        self._solve()
+        store = self.optimizer.variables
+
+        self.assertTrue(len(store) > 0)
+        for key in store:
+            self.assertEqual(len(key), 6)
+            self.assertTrue(all(isinstance(part, int) for part in key))
+
+        indexed = sum(len(v) for v in store.by_day_slot_class.values())
+        self.assertEqual(indexed, len(store))
+
+    def test_incompatible_combinations_are_pruned(self):
+        """No variable is created for undersized rooms or unqualified teachers"""
+        self.rooms.append(Room(id="R004", name="Small Room", capacity=10, features=["whiteboard"]))
+        self.teachers.append(Teacher(id="T004", name="Substitute", subjects=["S002"]))
+        self.subjects[0].preferred_teachers.append("T004")  # not qualified for S001
+
+        timetable = self._solve()
+        self._assert_valid(timetable)
+
+        room_idx = self.optimizer.room_ids.index("R004")
+        teacher_idx = self.optimizer.teacher_ids.index("T004")
+        for key in self.optimizer.variables:
+            self.assertNotEqual(key[5], room_idx)
+            self.assertNotEqual(key[4], teacher_idx)
+        self.assertGreater(timetable.stats["compat_pruning_ratio"], 0.0)
+        self.assertGreater(timetable.stats["compat_room_pruning_ratio"], 0.0)
+        self.assertGreater(timetable.stats["compat_teacher_pruning_ratio"], 0.0)
+
+    def test_room_pooling_shrinks_model(self):
+        """Interchangeable rooms share variables and still get distinct rooms"""
+        self.rooms.append(Room(id="R004", name="Classroom 104", capacity=30, features=["whiteboard"]))
+
+        unpooled = self._solve(room_pooling=False)
+        pooled = self._solve(room_pooling=True)
+
+        self._assert_valid(pooled)
+        self.assertEqual(pooled.stats["room_pools"], 2)
+        self.assertEqual(unpooled.stats["room_pools"], 4)
+        self.assertLess(pooled.stats["num_variables"], unpooled.stats["num_variables"])
+
+    def test_symmetry_breaking(self):
+        """Identical classes are detected and the timetable stays valid"""
+        timetable = self._solve(symmetry_breaking=True)
+
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.stats["symmetry_class_groups"], 1)
+        self.assertGreaterEqual(timetable.stats["symmetry_breaking_constraints"], 1)
+
+        timetable = self._solve(symmetry_breaking=False)
+        self._assert_valid(timetable)
+        self.assertNotIn("symmetry_class_groups", timetable.stats)
+
+    def test_room_stickiness_objective_is_linear(self):
+        """Stay rewards are bounded by both occupancy indicators, without products"""
+        timetable = self._solve(room_pooling=False, symmetry_breaking=False)
+        self._assert_valid(timetable)
+
+        proto = self.optimizer.model.Proto()
+        names = [variable.name for variable in proto.variables]
+        kinds = {constraint.WhichOneof("constraint") for constraint in proto.constraints}
+        self.assertFalse(kinds & {"int_prod", "lin_max", "int_div", "int_mod"})
+
+        # stay <= occupied, once for each of the two slots
+        bounds = {}
+        for constraint in proto.constraints:
+            linear = constraint.linear
+            if constraint.WhichOneof("constraint") != "linear" or len(linear.vars) != 2:
+                continue
+            terms = dict(zip((names[var].split("_")[0] for var in linear.vars), linear.coeffs))
+            if terms == {"stay": 1, "occ": -1} and linear.domain[-1] == 0:
+                stay = next(var for var in linear.vars if names[var].startswith("stay_"))
+                bounds[stay] = bounds.get(stay, 0) + 1
+        stays = [idx for idx, name in enumerate(names) if name.startswith("stay_")]
+        self.assertTrue(stays)
+        self.assertEqual({bounds.get(idx) for idx in stays}, {2})
+
+        # At the optimum the objective counts back-to-back lessons in one room
+        self.assertEqual(timetable.stats["solver_status"], "OPTIMAL")
+        stayed = 0
+        for class_timetable in timetable.class_timetables.values():
+            rooms = {(entry.day, entry.slot.start_time.hour): entry.room_id for entry in class_timetable.entries}
+            stayed += sum(rooms.get((day, hour + 1)) == room_id for (day, hour), room_id in rooms.items())
+        self.assertEqual(timetable.stats["objective_value"], stayed)
+
+    def test_classes_without_subjects_are_not_ordered(self):
+        """Classes with no subjects look identical but must not crash symmetry breaking"""
+        self.classes += [
+            Class(id="C003", name="Class 9C", subjects=[], students_count=20),
+            Class(id="C004", name="Class 9D", subjects=[], students_count=20),
+        ]
+        timetable = self._solve(symmetry_breaking=True)
+
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.stats["symmetry_class_groups"], 1)
+
+    def test_solver_parameters_are_applied_and_echoed(self):
+        """Solver parameters reach CP-SAT and come back in the stats"""
+        parameters = SolverParameters(
+            num_workers=2, random_seed=7, relative_gap_limit=0.1,
+            linearization_level=2, deterministic=True, search_branching="portfolio"
+        )
+        timetable = self._solve(solver_parameters=parameters)
+
+        self._assert_valid(timetable)
+        self.assertEqual(self.optimizer.solver.parameters.num_workers, 2)
+        self.assertTrue(self.optimizer.solver.parameters.interleave_search)
+        self.assertEqual(timetable.stats["solver_num_workers"], 2)
+        self.assertEqual(timetable.stats["solver_random_seed"], 7)
+        self.assertEqual(timetable.stats["solver_linearization_level"], 2)
+        self.assertEqual(timetable.stats["solver_search_branching"], "portfolio")
+        self.assertIn("solver_branches", timetable.stats)
+
+    def test_warm_start_from_base_timetable(self):
+        """A previous timetable is mapped back onto the model as hints"""
+        base = self._solve()
+
+        for mode in (SolveMode.MONOLITHIC, SolveMode.DECOMPOSED):
+            timetable = self._solve(mode=mode, base_timetable=base, repair_hint=True)
+            self._assert_valid(timetable)
+            self.assertEqual(timetable.stats["hint_coverage"], 1.0)
+            self.assertEqual(len(self.optimizer.model.Proto().solution_hint.vars), len(self.optimizer.variables))
+
+    def test_decomposed_solve(self):
+        """Time-then-room decomposition produces a valid timetable"""
+        timetable = self._solve(mode=SolveMode.DECOMPOSED)
+
+        self.assertEqual(timetable.conflicts, [])
+        self._assert_valid(timetable)
+        self.assertGreaterEqual(timetable.stats["decomposition_iterations"], 1)
+
+    def test_greedy_preview(self):
+        """Preview mode builds a valid draft without a model, in milliseconds"""
+        timetable = self._solve(mode=SolveMode.PREVIEW)
+
+        self.assertEqual(timetable.conflicts, [])
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.stats["num_variables"], 0)
+        self.assertEqual(timetable.stats["greedy_placed_hours"], 14)
+        self.assertLess(timetable.stats["solve_time"], 0.1)
+
+    def test_greedy_preview_reports_unplaced_hours(self):
+        """Hours the preview cannot place are reported and the rest is kept"""
+        self.teachers[0].max_hours_per_day = 2  # 4 hours a week for 6 hours of maths
+
+        timetable = self._solve(mode=SolveMode.PREVIEW)
+
+        self.assertEqual(timetable.stats["greedy_unplaced_hours"], 2)
+        self.assertEqual(
+            timetable.conflicts,
+            ["Class 9B (C002): 2 of 3 hours of Mathematics (S001) left unplaced, no free slot"]
+        )
+        entries = [e for tt in timetable.class_timetables.values() for e in tt.entries]
+        self.assertEqual(len(entries), 12)
+        for attr in ("class_id", "teacher_id", "room_id"):
+            usage = Counter((e.day, e.slot.start_time, getattr(e, attr)) for e in entries)
+            self.assertTrue(all(count == 1 for count in usage.values()), f"double booked {attr}")
+
+    def test_improving_solutions_are_published(self):
+        """Every solution the solver finds reaches the listener with its bound and gap"""
+        progress = []
+        self.optimizer = TimetableOptimizer(on_solution=progress.append)
+        timetable = self._solve()
+
+        self.assertEqual(len(progress), timetable.stats["solutions_found"])
+        objectives = [point.objective for point in progress]
+        self.assertEqual(objectives, sorted(objectives))
+        self.assertEqual(objectives[-1], timetable.stats["objective_value"])
+        for point in progress:
+            self._assert_valid(point.timetable)
+            self.assertGreaterEqual(point.best_bound, point.objective)
+            self.assertGreaterEqual(point.gap, 0.0)
+
+    def test_large_neighbourhood_search(self):
+        """LNS improves on its first solution and reports every improvement"""
+        progress = []
+        self.optimizer = LNSOptimizer(sub_time_limit_seconds=0.5, on_solution=progress.append)
+        timetable = self.optimizer.solve(
+            self.teachers, self.rooms, self.subjects, self.classes, self.constraints, time_limit_seconds=2
+        )
+
+        self.assertEqual(timetable.conflicts, [])
+        self._assert_valid(timetable)
+        self.assertGreaterEqual(timetable.stats["lns_iterations"], 1)
+        trace = timetable.stats["lns_objective_trace"]
+        self.assertEqual(trace[-1][1], timetable.stats["objective_value"])
+        self.assertEqual(progress[-1].objective, timetable.stats["objective_value"])
+        for point in progress:
+            self._assert_valid(point.timetable)
+        self.assertGreaterEqual(timetable.stats["objective_value"], timetable.stats["lns_initial_objective"])
+
+    def test_large_neighbourhood_search_keeps_time_for_neighbourhoods(self):
+        """A monolithic first solve stops at its first timetable instead of using the whole budget"""
+        school = build_school(3)
+        self.optimizer = LNSOptimizer(sub_time_limit_seconds=0.5)
+        timetable = self.optimizer.solve(time_limit_seconds=8, mode=SolveMode.MONOLITHIC, **school)
+
+        self.assertEqual(timetable.conflicts, [])
+        self.assertLess(timetable.stats["lns_initial_time"], 6)
+        self.assertGreaterEqual(timetable.stats["lns_iterations"], 1)
+
+    def test_cancelled_solve_returns_best_solution(self):
+        """Cancelling from the first solution stops the search and keeps that solution"""
+        control = SolveControl()
+        self.optimizer = TimetableOptimizer(on_solution=lambda progress: control.cancel(), control=control)
+        started = time.time()
+        timetable = self._solve()
+
+        self.assertLess(time.time() - started, 10)
+        self.assertEqual(timetable.conflicts, [])
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.stats["solve_cancelled"], 1.0)
+
+    def test_infeasible_request_fails_fast(self):
+        """Impossible requests are rejected by the pre-solve screen with diagnostics"""
+        self.subjects[0].hours_per_week = 6  # 10 hours per class, 8 slots
+        self.rooms.pop()  # no lab for physics
+        self.classes[0].subjects.append("S999")
+
+        for mode in (SolveMode.MONOLITHIC, SolveMode.DECOMPOSED):
+            started = time.time()
+            timetable = self._solve(mode=mode)
+
+            self.assertLess(time.time() - started, 1)
+            self.assertEqual(timetable.class_timetables, {})
+            self.assertEqual(timetable.stats["num_variables"], 0)
+            self.assertEqual(timetable.stats["feasibility_problems"], len(timetable.conflicts))
+            conflicts = "\n".join(timetable.conflicts)
+            self.assertIn("unknown subject S999", conflicts)
+            self.assertIn("Class 9A (C001) needs 10 hours a week but has only 8 slots", conflicts)
+            self.assertIn("Physics (S003) for Class 9B (C002) has no room with lab_equipment", conflicts)
+
+    def test_unknown_preferred_teachers_are_reported(self):
+        """Dangling preferred teacher IDs are warnings, unless no known teacher remains"""
+        self.subjects[0].preferred_teachers.append("T900")
+
+        timetable = self._solve()
+
+        self._assert_valid(timetable)
+        self.assertEqual(timetable.stats["feasibility_warnings"], [
+            "Subject Mathematics (S001) has unknown preferred teachers T900"
+        ])
+
+        self.subjects[1].preferred_teachers = ["T901"]
+
+        timetable = self._solve()
+
+        self.assertEqual(timetable.conflicts, [
+            "Subject English (S002) has no teacher: none of its preferred teachers exists"
+        ])
+        self.assertEqual(len(timetable.stats["feasibility_warnings"]), 2)
+
+    def test_overloaded_teacher_fails_fast(self):
+        """A teacher asked for more hours than their daily cap allows is reported"""
+        self.teachers[0].max_hours_per_day = 2  # 4 hours a week for 6 hours of maths
+
+        timetable = self._solve()
+
+        self.assertEqual(timetable.conflicts, [
+            "Teachers T001 can give at most 4 hours a week but lessons of Mathematics (S001) need 6"
+        ])
+
+    def test_infeasibility_is_explained_by_a_core(self):
+        """A request that passes the screen but cannot be solved reports a minimal core"""
+        # Class 9A fills both slots with Physics (lab) and English, so Chemistry
+        # for Class 9B finds either the lab or its teacher busy
+        self.teachers = [
+            Teacher(id="T001", name="Science Teacher", subjects=["S001", "S004"]),
+            Teacher(id="T002", name="Language Teacher", subjects=["S002", "S003"]),
+        ]
+        self.rooms = [
+            Room(id="R001", name="Lab", capacity=30, features=["lab_equipment"]),
+            Room(id="R002", name="Classroom", capacity=30),
+        ]
+        self.subjects = [
+            Subject(id="S001", name="Physics", hours_per_week=1,
+                    requires_features=["lab_equipment"], preferred_teachers=["T001"]),
+            Subject(id="S002", name="English", hours_per_week=1, preferred_teachers=["T002"]),
+            Subject(id="S003", name="Chemistry", hours_per_week=1,
+                    requires_features=["lab_equipment"], preferred_teachers=["T002"]),
+            Subject(id="S004", name="Mathematics", hours_per_week=1, preferred_teachers=["T001"]),
+        ]
+        self.classes = [
+            Class(id="C001", name="Class 9A", subjects=["S001", "S002"], students_count=20),
+            Class(id="C002", name="Class 9B", subjects=["S003", "S004"], students_count=20),
+        ]
+        self.constraints = TimetableConstraints(max_hours_per_day=2, days_per_week=1)
+
+        for mode in (SolveMode.MONOLITHIC, SolveMode.DECOMPOSED):
+            timetable = self._solve(mode=mode)
+
+            self.assertEqual(timetable.stats["feasibility_problems"], 0)
+            self.assertEqual(timetable.conflicts[0], "No feasible solution found with current constraints")
+            self.assertCountEqual(timetable.conflicts[1:], [
+                "Class 9A (C001) takes one lesson at a time",
+                "Teacher Language Teacher (T002) teaches one class at a time",
+                "Room R001 hosts one class at a time",
+                "Class 9A (C001) takes Physics (S001) for 1 hour a week",
+                "Class 9A (C001) takes English (S002) for 1 hour a week",
+                "Class 9B (C002) takes Chemistry (S003) for 1 hour a week",
+            ])
+            self.assertEqual(timetable.stats["infeasibility_core_size"], 6)
+
+    def test_model_cache_rehydrates_identical_inputs(self):
+        """A model built from the same inputs is loaded from disk, and old entries are evicted"""
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ModelCache(directory, max_entries=1)
+            self.optimizer = TimetableOptimizer(model_cache=cache)
+
+            cold = self._solve()
+            cached = self._solve()
+
+            self.assertEqual(cold.stats["model_cache_hit"], 0.0)
+            self.assertEqual(cached.stats["model_cache_hit"], 1.0)
+            self._assert_valid(cached)
+            for entry_stat in ("num_variables", "room_pools", "symmetry_breaking_constraints", "objective_value"):
+                self.assertEqual(cached.stats[entry_stat], cold.stats[entry_stat])
+
+            # Changed inputs miss and push the old model out
+            self.subjects[0].hours_per_week = 2
+            changed = self._solve()
+            self.assertEqual(changed.stats["model_cache_hit"], 0.0)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_model_cache_is_private_and_not_pickled(self):
+        """Entries load without unpickling, in a directory only the user can open"""
+        with tempfile.TemporaryDirectory() as parent:
+            directory = os.path.join(parent, "models")
+            cache = ModelCache(directory)
+            self.optimizer = TimetableOptimizer(model_cache=cache)
+            self._solve()
+
+            self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+            [name] = os.listdir(directory)
+            with np.load(os.path.join(directory, name), allow_pickle=False) as entry:
+                self.assertEqual(set(entry.files), {"model", "keys", "indices", "extra"})
+
+            # A directory owned by someone else is neither read nor written
+            cache.clear()
+            with mock.patch("os.getuid", return_value=os.getuid() + 1):
+                timetable = self._solve()
+            self.assertEqual(timetable.stats["model_cache_hit"], 0.0)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_teacher_and_room_availability_prune_the_model(self):
+        """Unavailable teachers and closed rooms get no variables and no lessons"""
+        unrestricted = self._solve(room_pooling=False, symmetry_breaking=False)
+        self.teachers[0].unavailable_slots = [TimeWindow(day=0, start_time="08:00", end_time="10:00")]
+        self.rooms[2].available_slots = [TimeWindow(day=1, start_time="08:00", end_time="12:00")]
+
+        for mode in (SolveMode.MONOLITHIC, SolveMode.DECOMPOSED, SolveMode.PREVIEW):
+            timetable = self._solve(mode=mode, room_pooling=False, symmetry_breaking=False)
+
+            if mode != SolveMode.PREVIEW:
+                # The greedy preview may leave hours of this tight instance unplaced
+                self.assertEqual(timetable.conflicts, [])
+                self._assert_valid(timetable)
+            self.assertEqual(timetable.stats["teacher_unavailable_slots"], 2)
+            self.assertEqual(timetable.stats["room_unavailable_slots"], 4)
+            entries = [e for tt in timetable.class_timetables.values() for e in tt.entries]
+            self.assertFalse(any(
+                e.teacher_id == "T001" and e.day == 0 and e.slot.start_time.hour < 10 for e in entries
+            ))
+            self.assertTrue(all(e.day == 1 for e in entries if e.room_id == "R003"))
+            if mode == SolveMode.MONOLITHIC:
+                self.assertLess(timetable.stats["num_variables"], unrestricted.stats["num_variables"])
+
+    def test_unavailability_is_screened(self):
+        """A teacher whose availability cannot cover their lessons is reported before solving"""
+        self.teachers[0].unavailable_slots = [TimeWindow(start_time="08:00", end_time="11:00")]
+
+        timetable = self._solve()
+
+        self.assertEqual(timetable.conflicts, [
+            "Teachers T001 can give at most 2 hours a week but lessons of Mathematics (S001) need 6"
+        ])
+
+    def test_resolve_after_availability_changes(self):
+        """Only entries around a teacher's leave and a closed room move"""
+        base = self._solve()
+        base_entries = [e for tt in base.class_timetables.values() for e in tt.entries]
+        leave = next(e for e in base_entries if e.teacher_id == "T001")
+        closed = next(e for e in base_entries if e.room_id == "R003")
+        changes = [
+            TimetableChange(type="teacher_unavailable", teacher_id="T001", days=[leave.day],
+                            slots=[self.optimizer.slot_index[leave.slot.start_time]]),
+            TimetableChange(type="room_unavailable", room_id="R003", days=[closed.day],
+                            slots=[self.optimizer.slot_index[closed.slot.start_time]]),
+        ]
+
+        timetable = self.optimizer.resolve(
+            self.teachers, self.rooms, self.subjects, self.classes, self.constraints,
+            base_timetable=base, changes=changes, time_limit_seconds=10
+        )
+
+        self.assertEqual(timetable.conflicts, [])
+        self._assert_valid(timetable)
+        entries = [e for tt in timetable.class_timetables.values() for e in tt.entries]
+        self.assertFalse(any(
+            e.teacher_id == "T001" and e.day == leave.day and e.slot == leave.slot for e in entries
+        ))
+        self.assertFalse(any(
+            e.room_id == "R003" and e.day == closed.day and e.slot == closed.slot for e in entries
+        ))
+        self.assertGreaterEqual(timetable.stats["changed_entries"], 1)
+        self.assertLessEqual(timetable.stats["changed_entries"], timetable.stats["released_entries"])
+
+        # Entries outside the released neighbourhood stay exactly where they were
+        if timetable.stats["neighbourhood"] == "class_days":
+            touched = {(leave.class_id, leave.day), (closed.class_id, closed.day)}
+            untouched = [e for e in base_entries if (e.class_id, e.day) not in touched]
+            for entry in untouched:
+                self.assertIn(entry, entries)
+
+    def test_match_rooms_reports_hall_violation(self):
+        """Room matching seats every lesson or names an overloaded room set"""
+        rooms, violated = match_rooms([[0, 1], [0], [1, 2]], [1, None, None])
+        self.assertEqual(rooms, [1, 0, 2])
+        self.assertEqual(violated, set())
+
+        rooms, violated = match_rooms([[0], [0, 1], [1]], [None, None, None])
+        self.assertIsNone(rooms)
+        self.assertEqual(violated, {0, 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.services.solution_cache import SolutionCache
+from app.services.timetable_service import TimetableService
+from app.schemas.timetable import TimetableGenerationRequest, SolverParameters
+from tests.test_optimizer import build_small_instance
+
+
+def build_request(**kwargs):
+    teachers, rooms, subjects, classes, constraints = build_small_instance()
+    return TimetableGenerationRequest(
+        teachers=teachers, rooms=rooms, subjects=subjects, classes=classes,
+        constraints=constraints, **kwargs
+    )
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = SolutionCache(max_entries=2)
+        self.service = TimetableService(solutions=self.cache)
+
+    def _generate(self, request, **kwargs):
+        result = asyncio.run(self.service.generate_timetable(request, time_limit_seconds=10, **kwargs))
+        self.assertNotIn("error", result)
+        return result
+
+    def test_identical_request_is_served_from_cache(self):
+        """A repeated request returns the cached timetable under a new ID"""
+        first = self._generate(build_request())
+        second = self._generate(build_request())
+
+        self.assertEqual(first["timetable"].stats["solution_cache_hit"], 0.0)
+        self.assertEqual(second["timetable"].stats["solution_cache_hit"], 1.0)
+        self.assertNotEqual(first["id"], second["id"])
+        self.assertEqual(second["timetable"].class_timetables, first["timetable"].class_timetables)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+        # Editing a returned timetable leaves the cached one intact
+        second["timetable"].class_timetables.clear()
+        third = self._generate(build_request())
+        self.assertEqual(third["timetable"].class_timetables, first["timetable"].class_timetables)
+
+    def test_bypass_and_changed_parameters_solve_again(self):
+        """Different solver parameters miss, and bypassing skips the cache"""
+        self._generate(build_request())
+        seeded = self._generate(build_request(solver_parameters=SolverParameters(random_seed=3)))
+        fresh = self._generate(build_request(), bypass_cache=True)
+
+        self.assertEqual(seeded["timetable"].stats["solution_cache_hit"], 0.0)
+        self.assertEqual(fresh["timetable"].stats["solution_cache_hit"], 0.0)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_edited_base_timetable_misses(self):
+        """Warm starts from the same base ID only hit while the base is unchanged"""
+        base = self._generate(build_request())
+        warm = self._generate(build_request(base_timetable_id=base["id"]))
+        repeated = self._generate(build_request(base_timetable_id=base["id"]))
+        self.assertEqual(warm["timetable"].stats["solution_cache_hit"], 0.0)
+        self.assertEqual(repeated["timetable"].stats["solution_cache_hit"], 1.0)
+
+        self.service.store.get_timetable(base["id"]).class_timetables["C001"].entries.pop()
+        edited = self._generate(build_request(base_timetable_id=base["id"]))
+        self.assertEqual(edited["timetable"].stats["solution_cache_hit"], 0.0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for seed in range(3):
+            self._generate(build_request(solver_parameters=SolverParameters(random_seed=seed)))
+
+        self.assertEqual(self.cache.stats()["entries"], 2)
+        oldest = self._generate(build_request(solver_parameters=SolverParameters(random_seed=0)))
+        self.assertEqual(oldest["timetable"].stats["solution_cache_hit"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.solve_control import SolveControl
+from app.services import timetable_service
+from app.services.solution_cache import SolutionCache
+from app.services.timetable_service import TimetableService
+from app.services.timetable_store import TimetableStore
+from app.schemas.timetable import TimetableGenerationRequest, UpdateTimetableRequest
+from tests.test_solution_cache import build_request
+
+
+class TestStreamTimetable(unittest.TestCase):
+    def setUp(self):
+        self.service = TimetableService(solutions=SolutionCache())
+
+    def _events(self, limit=None):
+        """Events of a streamed solve, closing the stream after limit events"""
+        async def consume():
+            events = []
+            stream = self.service.stream_timetable(build_request(), time_limit_seconds=10, bypass_cache=True)
+            async for event, payload in stream:
+                events.append((event, payload))
+                if len(events) == limit:
+                    break
+            await stream.aclose()
+            return events
+        return asyncio.run(consume())
+
+    def test_failed_solve_ends_with_error_event(self):
+        with mock.patch.object(timetable_service.TimetableOptimizer, "solve", side_effect=RuntimeError("solver crashed")):
+            events = self._events()
+
+        self.assertEqual(events, [("error", {"detail": "solver crashed"})])
+
+    def test_disconnect_stops_the_solve(self):
+        controls = []
+
+        class RecordingControl(SolveControl):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                controls.append(self)
+
+        with mock.patch.object(timetable_service, "SolveControl", RecordingControl):
+            events = self._events(limit=1)
+
+        self.assertEqual(events[0][0], "solution")
+        self.assertEqual(len(controls), 1)
+        self.assertTrue(controls[0].cancelled)
+
+
+class TestSolvesLeaveTheEventLoop(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimetableStore(self.directory.name)
+        self.service = TimetableService(solutions=SolutionCache(), store=self.store)
+        self.threads = []
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def _recorded(self, method):
+        """Patch an optimizer method to record the thread it runs in"""
+        original = getattr(timetable_service.TimetableOptimizer, method)
+
+        def record(optimizer, *args, **kwargs):
+            self.threads.append(threading.current_thread())
+            return original(optimizer, *args, **kwargs)
+
+        return mock.patch.object(timetable_service.TimetableOptimizer, method, autospec=True, side_effect=record)
+
+    def test_generate_and_update_solve_in_worker_threads(self):
+        with self._recorded("solve"):
+            result = asyncio.run(self.service.generate_timetable(build_request(), time_limit_seconds=10))
+        update = UpdateTimetableRequest(
+            timetable_id=result["id"], updates=[{"type": "teacher_unavailable", "teacher_id": "T002", "days": [0]}]
+        )
+        with self._recorded("resolve"):
+            updated = asyncio.run(self.service.update_timetable(update))
+
+        self.assertNotIn("error", updated)
+        self.assertEqual(len(self.threads), 2)
+        self.assertNotIn(threading.main_thread(), self.threads)
+
+
+class TestPrepareRequest(unittest.TestCase):
+    def test_requests_get_their_own_copies_of_the_datasets(self):
+        """Editing the entities of one request leaves the cache and other requests alone"""
+        service = TimetableService()
+        first, second = (
+            TimetableGenerationRequest(teachers=[], rooms=[], subjects=[], classes=[], constraints=build_request().constraints)
+            for _ in range(2)
+        )
+        service._prepare_request(first)
+        service._prepare_request(second)
+        cached = service.datasets.load_all_data()['teachers'][0]
+
+        first.teachers[0].subjects.append("S999")
+        first.teachers[0].max_hours_per_day += 1
+
+        self.assertNotIn("S999", cached.subjects)
+        self.assertEqual(second.teachers[0], cached)
+        self.assertIsNot(second.teachers[0], cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.routes import ml, timetable
+from app.schemas.timetable import TimetableChange, UpdateTimetableRequest
+from app.services.timetable_service import TimetableService
+from app.services.timetable_store import TimetableStore
+from tests.test_solution_cache import build_request
+
+
+class TestTimetableStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimetableStore(self.directory.name)
+        self.service = TimetableService(store=self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def _generate(self):
+        result = asyncio.run(self.service.generate_timetable(build_request(), time_limit_seconds=10, bypass_cache=True))
+        self.assertNotIn("error", result)
+        return result
+
+    def test_saved_timetables_are_persisted_behind_writes(self):
+        """A saved timetable reaches disk and a new store reads it back"""
+        result = self._generate()
+        self.store.flush()
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, f"{result['id']}.json")))
+        reopened = TimetableStore(self.directory.name)
+        stored = reopened.get(result["id"])
+        self.assertEqual(stored.timetable.class_timetables, result["timetable"].class_timetables)
+        self.assertEqual(stored.request, build_request())
+        self.assertEqual(reopened.stats()["disk_reads"], 1)
+
+    def test_directory_is_private(self):
+        """The store directory is created for the user alone, and a foreign one is not used"""
+        directory = os.path.join(self.directory.name, "store")
+        store = TimetableStore(directory)
+        result = self._generate()
+        store.put(result["id"], result["timetable"])
+        store.close()
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertIsNone(TimetableStore(directory).get(result["id"]))
+            foreign = TimetableStore(directory)
+            foreign.put("planted", result["timetable"])
+            foreign.close()
+        self.assertEqual(os.listdir(directory), [f"{result['id']}.json"])
+
+    def test_memory_tier_is_bounded_by_bytes(self):
+        """Least recently used timetables leave memory but are still found on disk"""
+        first = self._generate()
+        size = self.store.stats()["bytes"]
+        self.store.max_bytes = int(size * 2.5)
+        second = self._generate()
+        self.assertIsNotNone(self.store.get(first["id"]))  # first is now the most recent
+        third = self._generate()
+
+        self.assertEqual(list(self.store.entries), [first["id"], third["id"]])
+        self.assertLessEqual(self.store.stats()["bytes"], self.store.max_bytes)
+        self.assertIsNotNone(self.store.get(second["id"]))
+
+    def test_updates_and_changes_are_kept(self):
+        """Availability changes are stored with the timetable they were applied to"""
+        result = self._generate()
+        change = {"type": "teacher_unavailable", "teacher_id": "T002", "days": [0]}
+
+        updated = asyncio.run(self.service.update_timetable(
+            UpdateTimetableRequest(timetable_id=result["id"], updates=[change])
+        ))
+        self.assertNotIn("error", updated)
+        self.store.flush()
+
+        stored = TimetableStore(self.directory.name).get(result["id"])
+        self.assertEqual(stored.changes, [TimetableChange(**change)])
+        self.assertFalse(any(
+            entry.teacher_id == "T002" and entry.day == 0
+            for class_tt in stored.timetable.class_timetables.values() for entry in class_tt.entries
+        ))
+
+    def test_routers_share_one_service(self):
+        self.assertIs(timetable.get_timetable_service(), timetable.get_timetable_service())
+        self.assertIs(timetable.get_timetable_service(), ml.get_timetable_service())
+
+
+if __name__ == '__main__':
+    unittest.main()
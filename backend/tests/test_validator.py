@@ -0,0 +1,113 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+# Adjust the import path to make it work
+import sys
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.core.validator import TimetableValidator
+from app.schemas.timetable import TimetableChange, ViolationType
+from app.services.timetable_service import TimetableService
+from app.services.timetable_store import TimetableStore
+from tests.test_indexed_timetable import solve_small_instance
+from tests.test_optimizer import build_small_instance
+from tests.test_solution_cache import build_request
+
+
+class TestTimetableValidator(unittest.TestCase):
+    def setUp(self):
+        self.timetable, _ = solve_small_instance()
+        self.teachers, self.rooms, self.subjects, self.classes, self.constraints = build_small_instance()
+
+    def _validate(self, changes=None):
+        validator = TimetableValidator(
+            self.teachers, self.rooms, self.subjects, self.classes, self.constraints, changes
+        )
+        return validator.validate(self.timetable)
+
+    def _types(self, violations):
+        return {violation.type for violation in violations}
+
+    def test_solved_timetable_is_valid(self):
+        self.assertEqual(self._validate(), [])
+
+    def test_double_bookings_and_hours(self):
+        """Moving a lesson onto another lesson of its class breaks bookings and nothing else"""
+        first, second = self.timetable.class_timetables["C001"].entries[:2]
+        first.day, first.slot = second.day, second.slot
+
+        violations = self._validate()
+
+        self.assertIn(ViolationType.CLASS_DOUBLE_BOOKED, self._types(violations))
+        booked = next(v for v in violations if v.type == ViolationType.CLASS_DOUBLE_BOOKED)
+        self.assertEqual((booked.class_id, booked.day), ("C001", second.day))
+        self.assertLessEqual(self._types(violations), {
+            ViolationType.CLASS_DOUBLE_BOOKED, ViolationType.TEACHER_DOUBLE_BOOKED,
+            ViolationType.ROOM_DOUBLE_BOOKED, ViolationType.TEACHER_DAILY_HOURS,
+        })
+
+    def test_missing_hours_and_unknown_entities(self):
+        entries = self.timetable.class_timetables["C002"].entries
+        removed = entries.pop()
+        entries[0].room_id = "R999"
+
+        violations = self._validate()
+
+        self.assertEqual(self._types(violations), {ViolationType.SUBJECT_HOURS, ViolationType.UNKNOWN_ENTITY})
+        messages = [v.message for v in violations]
+        self.assertIn("Entry refers to unknown room R999", messages)
+        self.assertTrue(any(
+            v.class_id == "C002" and v.subject_id == removed.subject_id for v in violations
+            if v.type == ViolationType.SUBJECT_HOURS
+        ))
+
+    def test_rooms_teachers_and_availability(self):
+        self.rooms[0].capacity = 10
+        self.subjects[0].requires_features = ["projector"]
+        self.teachers[1].subjects = []
+        entry = self.timetable.class_timetables["C001"].entries[0]
+        change = TimetableChange(type="teacher_unavailable", teacher_id=entry.teacher_id, days=[entry.day])
+
+        types = self._types(self._validate([change]))
+
+        self.assertTrue({
+            ViolationType.ROOM_FEATURES, ViolationType.TEACHER_NOT_QUALIFIED, ViolationType.TEACHER_UNAVAILABLE
+        } <= types)
+        uses_small_room = any(
+            entry.room_id == "R001" for class_tt in self.timetable.class_timetables.values() for entry in class_tt.entries
+        )
+        self.assertEqual(ViolationType.ROOM_CAPACITY in types, uses_small_room)
+
+
+class TestValidateTimetable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = TimetableStore(self.directory.name)
+        self.service = TimetableService(store=self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_saved_timetable_is_validated(self):
+        result = asyncio.run(self.service.generate_timetable(build_request(), time_limit_seconds=10, bypass_cache=True))
+        validation = asyncio.run(self.service.validate_timetable(result["id"]))
+
+        self.assertTrue(validation.valid)
+        self.assertEqual(validation.stats["entries"], 14)
+
+        timetable = self.store.get_timetable(result["id"])
+        timetable.class_timetables["C001"].entries.pop()
+        validation = asyncio.run(self.service.validate_timetable(result["id"]))
+        self.assertFalse(validation.valid)
+        self.assertEqual([v.type for v in validation.violations], [ViolationType.SUBJECT_HOURS])
+
+    def test_unknown_timetable(self):
+        with self.assertRaisesRegex(ValueError, "not found"):
+            asyncio.run(self.service.validate_timetable("missing"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,11 +17,16 @@ export interface TimeSlot {
   end_time: string;
 }
 
+// A time window on one day (0 = first day of the week), or on every day
+export interface TimeWindow extends TimeSlot {
+  day?: number | null;
+}
+
 export interface Teacher {
   id: string;
   name: string;
   subjects: string[];
-  unavailable_slots?: TimeSlot[];
+  unavailable_slots?: TimeWindow[];
   max_hours_per_day?: number;
   max_consecutive_classes?: number;
 }
@@ -30,7 +35,7 @@ export interface Room {
   id: string;
   name: string;
   capacity: number;
-  available_slots?: TimeSlot[];
+  available_slots?: TimeWindow[];
   features?: string[];
 }
 
@@ -56,12 +61,29 @@ export interface TimetableConstraints {
   allow_split_subjects?: boolean;
 }
 
+export interface SolverParameters {
+  num_workers?: number;
+  random_seed?: number;
+  relative_gap_limit?: number;
+  linearization_level?: number;
+  deterministic?: boolean;
+  log_search_progress?: boolean;
+  stop_after_first_solution?: boolean;
+  search_branching?: 'automatic' | 'fixed' | 'portfolio' | 'lp' | 'pseudo_cost' | 'portfolio_with_quick_restart';
+}
+
+// How a timetable is solved; preview is a greedy draft that may leave hours unplaced
+export type SolveMode = 'monolithic' | 'decomposed' | 'lns' | 'preview';
+
 export interface TimetableGenerationRequest {
   teachers: Teacher[];
   rooms: Room[];
   subjects: Subject[];
   classes: Class[];
   constraints: TimetableConstraints;
+  solver_parameters?: SolverParameters;
+  base_timetable_id?: string;
+  hint_repair?: boolean;
 }
 
 export interface TimetableEntry {
@@ -90,6 +112,65 @@ export interface GeneratedTimetable {
   teacher_timetables: Record<string, TeacherTimetable>;
   room_allocations: Record<string, TimetableEntry[]>;
   conflicts: string[];
+  stats: Record<string, unknown>;  // Numbers, strings, lists, objects and nulls, depending on the solve mode
+}
+
+export interface SolveProgress {
+  objective: number;
+  best_bound: number | null;
+  gap: number | null;
+  elapsed: number;
+  solution_count: number;
+  timetable: GeneratedTimetable;
+}
+
+export interface TimetableJob {
+  id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  mode: SolveMode;
+  time_limit_seconds: number;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
+  error?: string;
+}
+
+export interface TimetableViolation {
+  type: string;
+  message: string;
+  class_id?: string;
+  subject_id?: string;
+  teacher_id?: string;
+  room_id?: string;
+  day?: number;
+  slot?: number;
+}
+
+export interface TimetableValidation {
+  timetable_id: string;
+  valid: boolean;
+  violations: TimetableViolation[];
+  stats: Record<string, number>;
+}
+
+export interface TimetableAnalytics {
+  teacher_utilization: Record<string, number>;
+  room_utilization: Record<string, number>;
+  free_periods_distribution: Record<string, number>;
+  efficiency_score: number;
+  days: number;
+  slots_per_day: number;
+  class_utilization: Record<string, number>;
+  free_periods_by_slot: Record<string, number>;  // Start time -> free class periods in that slot over the week
+  class_gaps: Record<string, number>;  // Free periods between the first and last lesson of each day, over the week
+  teacher_gaps: Record<string, number>;
+  class_daily_hours: Record<string, number[]>;  // Lessons per day
+  teacher_daily_hours: Record<string, number[]>;
+  room_daily_hours: Record<string, number[]>;
+  class_daily_spread: Record<string, number>;  // Most minus fewest lessons in a day
+  teacher_daily_spread: Record<string, number>;
+  class_room_changes: Record<string, number>;  // Back-to-back lessons in different rooms
+  teacher_room_changes: Record<string, number>;
   stats: Record<string, number>;
 }
 
@@ -112,10 +193,21 @@ export const timetableApi = {
   },
 
   // Generate a new timetable
-  generateTimetable: async (request: TimetableGenerationRequest, timeLimit: number = 60) => {
+  generateTimetable: async (
+    request: TimetableGenerationRequest,
+    timeLimit: number = 60,
+    bypassCache: boolean = false,
+    splitComponents: boolean = false,
+    mode: SolveMode = 'monolithic'
+  ) => {
     try {
       const response = await api.post('/timetable/generate', request, {
-        params: { time_limit_seconds: timeLimit }
+        params: {
+          time_limit_seconds: timeLimit,
+          mode,
+          bypass_cache: bypassCache,
+          split_components: splitComponents
+        }
       });
       return response.data;
     } catch (error) {
@@ -124,6 +216,113 @@ export const timetableApi = {
     }
   },
 
+  // Generate a new timetable, receiving every improving solution as it is found
+  streamTimetable: async (
+    request: TimetableGenerationRequest,
+    onSolution: (progress: SolveProgress) => void,
+    timeLimit: number = 60,
+    mode: SolveMode = 'monolithic'
+  ) => {
+    const response = await fetch(
+      `${API_BASE_URL}/timetable/generate/stream?time_limit_seconds=${timeLimit}&mode=${mode}`,
+      {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(request),
+      }
+    );
+    if (!response.ok || !response.body) {
+      throw new Error(`Error streaming timetable: ${response.status}`);
+    }
+
+    // Server-sent events are separated by blank lines
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop() || '';
+      for (const event of events) {
+        const type = event.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(event.match(/^data: (.*)$/m)?.[1] || 'null');
+        if (type === 'solution') {
+          onSolution(data);
+        } else if (type === 'done') {
+          return data;
+        } else if (type === 'error') {
+          throw new Error(data.detail);
+        }
+      }
+    }
+    throw new Error('Timetable stream ended without a result');
+  },
+
+  // Queue a timetable generation job
+  submitTimetableJob: async (
+    request: TimetableGenerationRequest,
+    timeLimit: number = 60,
+    mode: SolveMode = 'monolithic'
+  ): Promise<TimetableJob> => {
+    try {
+      const response = await api.post('/timetable/jobs', request, {
+        params: { time_limit_seconds: timeLimit, mode }
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Error submitting timetable job:', error);
+      throw error;
+    }
+  },
+
+  // Get the status of a timetable generation job
+  getTimetableJob: async (jobId: string): Promise<TimetableJob> => {
+    try {
+      const response = await api.get(`/timetable/jobs/${jobId}`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error getting timetable job ${jobId}:`, error);
+      throw error;
+    }
+  },
+
+  // Cancel a timetable generation job, keeping its best timetable so far
+  cancelTimetableJob: async (jobId: string): Promise<TimetableJob> => {
+    try {
+      const response = await api.post(`/timetable/jobs/${jobId}/cancel`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error cancelling timetable job ${jobId}:`, error);
+      throw error;
+    }
+  },
+
+  // Extend or shrink the time limit of a timetable generation job
+  setTimetableJobDeadline: async (jobId: string, timeLimit: number): Promise<TimetableJob> => {
+    try {
+      const response = await api.put(`/timetable/jobs/${jobId}/deadline`, null, {
+        params: { time_limit_seconds: timeLimit }
+      });
+      return response.data;
+    } catch (error) {
+      console.error(`Error setting deadline of timetable job ${jobId}:`, error);
+      throw error;
+    }
+  },
+
+  // Get the timetable of a completed job
+  getTimetableJobResult: async (jobId: string): Promise<GeneratedTimetable> => {
+    try {
+      const response = await api.get(`/timetable/jobs/${jobId}/result`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error getting result of timetable job ${jobId}:`, error);
+      throw error;
+    }
+  },
+
   // Get a timetable by ID
   getTimetable: async (timetableId: string) => {
     try {
@@ -146,8 +345,19 @@ export const timetableApi = {
     }
   },
 
+  // Check a timetable against every hard constraint
+  validateTimetable: async (timetableId: string): Promise<TimetableValidation> => {
+    try {
+      const response = await api.get(`/timetable/${timetableId}/validate`);
+      return response.data;
+    } catch (error) {
+      console.error(`Error validating timetable ${timetableId}:`, error);
+      throw error;
+    }
+  },
+
   // Get analytics for a timetable
-  getTimetableAnalytics: async (timetableId: string) => {
+  getTimetableAnalytics: async (timetableId: string): Promise<TimetableAnalytics> => {
     try {
       const response = await api.get(`/timetable/${timetableId}/analytics`);
       return response.data;